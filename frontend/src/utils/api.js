@@ -62,6 +62,11 @@ export const api = {
     } catch (error) {
       throw new Error(`DELETE ${endpoint}: ${error.message}`)
     }
+  },
+
+  // Поток событий сервера (Server-Sent Events)
+  events(endpoint) {
+    return new EventSource(`${API_BASE_URL}${endpoint}`)
   }
 }
 
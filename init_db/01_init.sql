@@ -106,6 +106,7 @@ CREATE TABLE production_schedules (
     scheduled_end TIMESTAMP NOT NULL,
     setup_time_minutes INTEGER,
     processing_time_minutes INTEGER,
+    order_fingerprint VARCHAR(64),
     
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
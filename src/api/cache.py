@@ -0,0 +1,93 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from datetime import datetime
+from typing import Iterable, Optional
+
+from src.optimization.algorithms import OptimizationResult
+from src.optimization.records import EQUIPMENT_FIELDS, EquipmentRecord, order_fingerprint
+
+
+def task_fingerprint(orders: Iterable, equipment: Iterable, params: dict) -> str:
+    """Устойчивый хэш входных данных оптимизации
+
+    Учитываются поля записей оптимизатора (ORDER_FIELDS, EQUIPMENT_FIELDS) -
+    те же, что выбирает load_planning_data, поэтому сохранение результата
+    (плановые даты и линии заказов) отпечаток не меняет.
+    Порядок строк, возвращаемых базой данных, на отпечаток не влияет.
+    """
+    digest = hashlib.sha256()
+    for order in sorted(orders, key=lambda order: order.id):
+        digest.update(order_fingerprint(order).encode())
+    for eq in sorted(equipment, key=lambda eq: eq.id):
+        record = EquipmentRecord.from_equipment(eq)
+        digest.update(repr(('equipment',) + tuple(getattr(record, name) for name in EQUIPMENT_FIELDS)).encode())
+    digest.update(repr(sorted(params.items())).encode())
+    return digest.hexdigest()
+
+
+class OptimizationResultCache:
+    """LRU-кэш результатов оптимизации по отпечатку задачи
+
+    Записывающие маршруты заказов, оборудования и материалов вызывают invalidate().
+    Результат задания, начатого до сброса, в кэш не попадает: задание запоминает
+    поколение кэша при старте и передает его в put().
+    """
+
+    def __init__(self, max_size: int = 32):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: str, start_time: datetime) -> Optional[OptimizationResult]:
+        """Результат из кэша со сдвигом расписания к новому моменту начала"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+
+        cached_start, result = entry
+        # Расписание строится от момента начала, поэтому сдвиг сохраняет его допустимость
+        shift = start_time - cached_start
+        schedule = [
+            item.model_copy(update={
+                'scheduled_start': item.scheduled_start + shift,
+                'scheduled_end': item.scheduled_end + shift
+            })
+            for item in result.schedule
+        ]
+        return replace(result, schedule=schedule, optimization_time_seconds=0.0)
+
+    def put(self, key: str, start_time: datetime, result: OptimizationResult, generation: int):
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.entries[key] = (start_time, result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self):
+        """Сброс кэша после изменения заказов, оборудования или материалов"""
+        with self.lock:
+            self.entries.clear()
+            self.generation += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            requests = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'generation': self.generation
+            }
@@ -0,0 +1,198 @@
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from src.optimization.parallel import SharedDeadline
+
+
+# Статусы задания
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+# Хранимые события прогресса задания и период отправки лучшего расписания, с
+MAX_PROGRESS_EVENTS = 1000
+PROGRESS_SCHEDULE_INTERVAL = 2.0
+
+
+class QueueFullError(Exception):
+    """Очередь заданий оптимизации заполнена"""
+
+
+@dataclass
+class OptimizationJob:
+    """Задание оптимизации в фоновой очереди"""
+    job_id: str
+    status: str = QUEUED
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Any = None
+    error: Optional[str] = None
+    stop_signal: Optional[SharedDeadline] = None  # создается при запуске; передается оптимизаторам задания
+    cached: bool = False  # результат взят из кэша без запуска оптимизации
+    stop_requested: bool = False  # досрочный останов с сохранением лучшего решения
+    future: Optional[Future] = None
+    events: deque = field(default_factory=lambda: deque(maxlen=MAX_PROGRESS_EVENTS))
+    event_count: int = 0
+    schedule_reported_at: float = 0.0
+    schedule_reported_waste: Optional[float] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.status == CANCELLED
+
+    def report_progress(self, event: dict, best_schedule: Callable[[], list]):
+        """Обработчик прогресса оптимизатора (ProgressCallback)
+
+        Событие получает номер seq; лучшее расписание добавляется не чаще раза
+        в PROGRESS_SCHEDULE_INTERVAL секунд и только если отходы изменились.
+        """
+        now = time.time()
+        event = dict(event, seq=self.event_count + 1)
+        if self.started_at is not None:
+            event['elapsed_seconds'] = (datetime.now() - self.started_at).total_seconds()
+
+        best_waste = event.get('best_waste')
+        if (now - self.schedule_reported_at >= PROGRESS_SCHEDULE_INTERVAL
+                and best_waste != self.schedule_reported_waste):
+            event['best_schedule'] = best_schedule()
+            self.schedule_reported_at = now
+            self.schedule_reported_waste = best_waste
+
+        # Читатели сравнивают seq, поэтому счетчик меняется после добавления события
+        self.events.append(event)
+        self.event_count += 1
+
+
+class OptimizationJobQueue:
+    """Очередь заданий оптимизации с фоновым пулом потоков
+
+    Задание получает идентификатор сразу, выполняется в пуле и хранится
+    в памяти до вытеснения более новыми завершенными заданиями.
+    Отмена выполняющегося задания кооперативная: в stop_signal задания
+    записывается текущее время, и оптимизаторы, созданные с этим сигналом,
+    завершаются на ближайшей проверке ограничений - даже если отмена пришла
+    до их запуска. Результат отмененного задания не сохраняется.
+    """
+
+    def __init__(self, workers: int = 1, max_depth: int = 10, keep_finished: int = 100):
+        self.max_depth = max_depth  # предел заданий в очереди и в работе
+        self.keep_finished = keep_finished
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='optimization')
+        self.jobs = OrderedDict()
+        self.finished = Counter()  # завершенные задания по статусам с запуска очереди
+        self.lock = threading.Lock()
+
+    def submit(self, run: Callable[[OptimizationJob], Any]) -> OptimizationJob:
+        """Постановка задания в очередь; run(job) выполняется в фоновом потоке"""
+        with self.lock:
+            active = sum(job.status in ACTIVE_STATUSES for job in self.jobs.values())
+            if active >= self.max_depth:
+                raise QueueFullError(f"В очереди уже {active} заданий оптимизации")
+
+            job = OptimizationJob(job_id=uuid.uuid4().hex)
+            self.jobs[job.job_id] = job
+            job.future = self.executor.submit(self._execute, job, run)
+            self._prune()
+        return job
+
+    def complete(self, result: Any, cached: bool = False) -> OptimizationJob:
+        """Регистрация уже готового результата как завершенного задания"""
+        now = datetime.now()
+        job = OptimizationJob(
+            job_id=uuid.uuid4().hex, status=COMPLETED, created_at=now,
+            started_at=now, finished_at=now, result=result, cached=cached
+        )
+        with self.lock:
+            self.jobs[job.job_id] = job
+            self.finished[COMPLETED] += 1
+            self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[OptimizationJob]:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[OptimizationJob]:
+        """Отмена задания в очереди или в работе"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.status not in ACTIVE_STATUSES:
+                return job
+
+            if job.status == QUEUED:
+                job.future.cancel()
+                job.finished_at = datetime.now()
+                self.finished[CANCELLED] += 1
+            else:
+                job.stop_signal.set(time.time())
+            job.status = CANCELLED
+            return job
+
+    def stop(self, job_id: str) -> Optional[OptimizationJob]:
+        """Досрочный останов: задание завершается с лучшим найденным решением
+
+        Задание, еще не начатое, отменяется - решения у него нет.
+        """
+        job = self.get(job_id)
+        if job is not None and job.status == QUEUED:
+            return self.cancel(job_id)
+
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.status != RUNNING:
+                return job
+            job.stop_requested = True
+            job.stop_signal.set(time.time())
+            return job
+
+    def status_counts(self) -> Counter:
+        """Число хранимых заданий по статусам"""
+        with self.lock:
+            return Counter(job.status for job in self.jobs.values())
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _execute(self, job: OptimizationJob, run: Callable[[OptimizationJob], Any]):
+        with self.lock:
+            if job.cancelled:
+                return
+            job.status = RUNNING
+            job.started_at = datetime.now()
+            job.stop_signal = SharedDeadline()
+
+        try:
+            result = run(job)
+        except Exception as e:
+            with self.lock:
+                if not job.cancelled:
+                    job.status = FAILED
+                    job.error = str(e)
+        else:
+            with self.lock:
+                if not job.cancelled:
+                    job.status = COMPLETED
+                    job.result = result
+        finally:
+            with self.lock:
+                # После закрытия блока отмена и стоп не действуют: set() ничего не делает
+                job.stop_signal.close()
+                job.finished_at = datetime.now()
+                self.finished[job.status] += 1
+
+    def _prune(self):
+        """Вытеснение самых старых завершенных заданий"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.status not in ACTIVE_STATUSES]
+        for job_id in finished[:max(len(finished) - self.keep_finished, 0)]:
+            del self.jobs[job_id]
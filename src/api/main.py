@@ -1,23 +1,55 @@
+import asyncio
+import json
+import os
+import time
 from datetime import datetime, timedelta
 from typing import List, Optional
 from decimal import Decimal
 
 from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.orm import Session, joinedload
 
-from src.database.connection import get_db
+from src.database.connection import get_db, SessionLocal, upgrade_schema
+from src.api.cache import OptimizationResultCache, task_fingerprint
+from src.api.jobs import ACTIVE_STATUSES, OptimizationJob, OptimizationJobQueue, QueueFullError
+from src.api.metrics import OptimizationMetrics, format_metric
 from src.models.production import (
     Material, Equipment, ProductionOrder, ProductionSchedule, WasteLog,
     MaterialCreate, MaterialResponse, MaterialUpdate,
     EquipmentCreate, EquipmentResponse, EquipmentUpdate,
     ProductionOrderCreate, ProductionOrderResponse, ProductionOrderUpdate,
     ProcessType, OrderStatus, ProductType,
-    OptimizationResult
+    OptimizationResult, ScheduleItem, OptimizationJobResponse
 )
 from src.optimization.algorithms import (
-    HybridOptimizer, OptimizationTask, GeneticAlgorithmOptimizer, BranchAndBoundOptimizer
+    HybridOptimizer, OptimizationTask, GeneticAlgorithmOptimizer, BranchAndBoundOptimizer,
+    IslandGeneticOptimizer, GreedyOptimizer, LocalSearchOptimizer, IncrementalOptimizer,
+    RollingHorizonOptimizer, ArrayGeneticOptimizer
 )
+from src.optimization.records import load_planning_data, order_fingerprint
+
+
+# Число процессов для оценки приспособленности по умолчанию
+OPTIMIZATION_WORKERS = int(os.getenv("OPTIMIZATION_WORKERS", "1"))
+# Число одновременно выполняемых заданий оптимизации и предел очереди
+OPTIMIZATION_JOB_WORKERS = int(os.getenv("OPTIMIZATION_JOB_WORKERS", "1"))
+OPTIMIZATION_QUEUE_DEPTH = int(os.getenv("OPTIMIZATION_QUEUE_DEPTH", "10"))
+# Число результатов оптимизации в кэше (0 - кэш отключен)
+OPTIMIZATION_CACHE_SIZE = int(os.getenv("OPTIMIZATION_CACHE_SIZE", "32"))
+
+optimization_jobs = OptimizationJobQueue(
+    workers=OPTIMIZATION_JOB_WORKERS,
+    max_depth=OPTIMIZATION_QUEUE_DEPTH
+)
+optimization_cache = OptimizationResultCache(max_size=OPTIMIZATION_CACHE_SIZE)
+optimization_metrics = OptimizationMetrics()
+
+# Период проверки новых событий прогресса и поддержания соединения SSE, с
+PROGRESS_POLL_INTERVAL = 0.25
+PROGRESS_KEEPALIVE_INTERVAL = 15
 
 
 app = FastAPI(
@@ -36,6 +68,12 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+def upgrade_database_schema():
+    """Новые столбцы для базы, созданной прежней версией init_db"""
+    upgrade_schema()
+
+
 @app.get("/")
 async def root():
     """Корневой маршрут API"""
@@ -80,6 +118,7 @@ async def create_material(material: MaterialCreate, db: Session = Depends(get_db
     db_material = Material(**material.dict())
     db.add(db_material)
     db.commit()
+    optimization_cache.invalidate()
     db.refresh(db_material)
     return db_material
 
@@ -101,6 +140,7 @@ async def update_material(
         setattr(material, field, value)
     
     db.commit()
+    optimization_cache.invalidate()
     db.refresh(material)
     return material
 
@@ -121,6 +161,7 @@ async def delete_material(material_id: int, db: Session = Depends(get_db)):
     
     db.delete(material)
     db.commit()
+    optimization_cache.invalidate()
     return {"message": "Материал успешно удален"}
 
 
@@ -152,6 +193,7 @@ async def bulk_import_materials(
     
     if created_materials:
         db.commit()
+        optimization_cache.invalidate()
     else:
         db.rollback()
     
@@ -209,6 +251,7 @@ async def create_equipment(equipment: EquipmentCreate, db: Session = Depends(get
     db_equipment = Equipment(**equipment.dict())
     db.add(db_equipment)
     db.commit()
+    optimization_cache.invalidate()
     db.refresh(db_equipment)
     return db_equipment
 
@@ -229,6 +272,7 @@ async def update_equipment(
         setattr(equipment, field, value)
     
     db.commit()
+    optimization_cache.invalidate()
     db.refresh(equipment)
     return equipment
 
@@ -250,6 +294,7 @@ async def delete_equipment(equipment_id: int, db: Session = Depends(get_db)):
     
     db.delete(equipment)
     db.commit()
+    optimization_cache.invalidate()
     return {"message": "Оборудование успешно удалено"}
 
 
@@ -281,6 +326,7 @@ async def bulk_import_equipment(
     
     if created_equipment:
         db.commit()
+        optimization_cache.invalidate()
     else:
         db.rollback()
     
@@ -350,6 +396,7 @@ async def create_order(order: ProductionOrderCreate, db: Session = Depends(get_d
     db_order = ProductionOrder(**order.dict())
     db.add(db_order)
     db.commit()
+    optimization_cache.invalidate()
     db.refresh(db_order)
     return db_order
 
@@ -370,6 +417,7 @@ async def update_order(
         setattr(order, field, value)
     
     db.commit()
+    optimization_cache.invalidate()
     db.refresh(order)
     return order
 
@@ -391,6 +439,7 @@ async def delete_order(order_id: int, db: Session = Depends(get_db)):
 
     db.delete(order)
     db.commit()
+    optimization_cache.invalidate()
     
     return {"message": f"Заказ {order.order_number} успешно удален"}
 
@@ -428,6 +477,7 @@ async def bulk_import_orders(
     
     if created_orders:
         db.commit()
+        optimization_cache.invalidate()
     else:
         db.rollback()
     
@@ -441,63 +491,331 @@ async def bulk_import_orders(
 
 # ===== МАРШРУТЫ ДЛЯ ОПТИМИЗАЦИИ =====
 
-@app.post("/optimize/schedule", response_model=OptimizationResult)
+@app.post("/optimize/schedule", response_model=OptimizationJobResponse, status_code=202)
 async def optimize_schedule(
-    algorithm: str = Query("hybrid", regex="^(genetic|branch_bound|hybrid)$"),
+    algorithm: str = Query("hybrid", regex="^(genetic|island|genetic_array|branch_bound|hybrid|greedy)$"),
     planning_horizon_days: int = Query(30, ge=1, le=90),
-    population_size: int = Query(100, ge=20, le=500),
+    population_size: int = Query(100, ge=20, le=5000),
     generations: int = Query(50, ge=10, le=200),
+    workers: int = Query(OPTIMIZATION_WORKERS, ge=1, le=64),
+    islands: int = Query(4, ge=2, le=32),
+    migration_interval: int = Query(10, ge=1, le=200),
+    time_limit_seconds: Optional[float] = Query(None, gt=0, le=3600),
+    stagnation_generations: Optional[int] = Query(None, ge=1, le=200),
+    stagnation_nodes: Optional[int] = Query(None, ge=1),
+    max_nodes: int = Query(1000000, ge=1, le=100000000),
+    bb_search: str = Query("depth_first", regex="^(depth_first|best_first)$"),
+    max_open_nodes: int = Query(100000, ge=2, le=10000000),
+    local_search: bool = Query(False),
+    local_search_seconds: float = Query(1.0, gt=0, le=600),
+    incremental: bool = Query(False),
+    rolling_window_days: Optional[int] = Query(None, ge=1, le=90),
+    use_cache: bool = Query(True),
     db: Session = Depends(get_db)
 ):
-    """Оптимизация производственного расписания"""
+    """Постановка оптимизации производственного расписания в очередь
 
-    orders = db.query(ProductionOrder).filter(
-        ProductionOrder.status == OrderStatus.PLANNED
-    ).all()
-    
+    Возвращает идентификатор задания; статус и результат - GET /optimize/jobs/{job_id}.
+    Для уже решенной задачи с теми же данными и параметрами задание сразу
+    возвращается завершенным с результатом из кэша.
+    """
+
+    # Популяции больше 500 - только для матричного генетического алгоритма
+    if population_size > 500 and algorithm != "genetic_array":
+        raise HTTPException(status_code=400, detail="Размер популяции больше 500 допустим только для genetic_array")
+
+    orders, equipment = load_planning_data(db)
     if not orders:
         raise HTTPException(status_code=400, detail="Нет заказов для планирования")
     
-    equipment = db.query(Equipment).filter(Equipment.is_available == True).all()
-    
     if not equipment:
         raise HTTPException(status_code=400, detail="Нет доступного оборудования")
 
-    task = OptimizationTask(
-        orders=orders,
-        equipment=equipment,
-        start_time=datetime.now(),
-        planning_horizon_hours=planning_horizon_days * 24
-    )
+    # Параметры, от которых зависит результат; число процессов (workers) влияет только
+    # на скорость и в ключ не входит. Инкрементальный режим зависит еще и от
+    # сохраненного расписания, поэтому не кэшируется
+    params = {
+        'algorithm': algorithm, 'planning_horizon_days': planning_horizon_days,
+        'population_size': population_size, 'generations': generations,
+        'islands': islands, 'migration_interval': migration_interval,
+        'time_limit_seconds': time_limit_seconds, 'stagnation_generations': stagnation_generations,
+        'stagnation_nodes': stagnation_nodes, 'max_nodes': max_nodes, 'bb_search': bb_search,
+        'max_open_nodes': max_open_nodes, 'local_search': local_search,
+        'local_search_seconds': local_search_seconds, 'rolling_window_days': rolling_window_days
+    }
+    cacheable = use_cache and not incremental and optimization_cache.max_size > 0
+
+    if cacheable:
+        result = optimization_cache.get(task_fingerprint(orders, equipment, params), datetime.now())
+        if result is not None:
+            save_optimization_result(result, db, orders)
+            return job_response(optimization_jobs.complete(result, cached=True))
+
+    def create_optimizer(stop_signal):
+        """Оптимизатор выбранного алгоритма, останавливаемый сигналом задания"""
+        if algorithm == "genetic":
+            return GeneticAlgorithmOptimizer(
+                population_size=population_size,
+                generations=generations,
+                n_workers=workers,
+                time_limit_seconds=time_limit_seconds,
+                stagnation_generations=stagnation_generations,
+                stop_signal=stop_signal
+            )
+        elif algorithm == "island":
+            return IslandGeneticOptimizer(
+                population_size=population_size,
+                generations=generations,
+                n_islands=islands,
+                migration_interval=migration_interval,
+                n_workers=workers if workers > 1 else None,
+                time_limit_seconds=time_limit_seconds,
+                stagnation_generations=stagnation_generations,
+                stop_signal=stop_signal
+            )
+        elif algorithm == "genetic_array":
+            return ArrayGeneticOptimizer(
+                population_size=population_size,
+                generations=generations,
+                n_workers=workers,
+                time_limit_seconds=time_limit_seconds,
+                stagnation_generations=stagnation_generations,
+                stop_signal=stop_signal
+            )
+        elif algorithm == "greedy":
+            return GreedyOptimizer()
+        elif algorithm == "branch_bound":
+            return BranchAndBoundOptimizer(
+                max_nodes=max_nodes,
+                time_limit_seconds=time_limit_seconds,
+                stagnation_nodes=stagnation_nodes,
+                search=bb_search,
+                max_open_nodes=max_open_nodes,
+                n_workers=workers,
+                stop_signal=stop_signal
+            )
+        else:  # hybrid
+            return HybridOptimizer(
+                ga_params={
+                    'population_size': population_size,
+                    'generations': generations
+                },
+                bb_max_nodes=max_nodes,
+                n_workers=workers,
+                time_limit_seconds=time_limit_seconds,
+                stagnation_generations=stagnation_generations,
+                stagnation_nodes=stagnation_nodes,
+                bb_search=bb_search,
+                bb_max_open_nodes=max_open_nodes,
+                stop_signal=stop_signal
+            )
 
-    if algorithm == "genetic":
-        optimizer = GeneticAlgorithmOptimizer(
-            population_size=population_size,
-            generations=generations
-        )
-    elif algorithm == "branch_bound":
-        optimizer = BranchAndBoundOptimizer(max_nodes=10000)
-    else:  # hybrid
-        optimizer = HybridOptimizer(
-            ga_params={
-                'population_size': population_size,
-                'generations': generations
-            }
-        )
+    def run(job: OptimizationJob) -> OptimizationResult:
+        """Выполнение задания в фоновом потоке со своей сессией базы данных"""
+        db = SessionLocal()
+        try:
+            # Поколение кэша фиксируется до чтения данных: их изменение во время
+            # оптимизации сбросит кэш, и устаревший результат в него не попадет
+            generation = optimization_cache.generation
+            orders, equipment = load_planning_data(db)
+
+            task = OptimizationTask(
+                orders=orders,
+                equipment=equipment,
+                start_time=datetime.now(),
+                planning_horizon_hours=planning_horizon_days * 24
+            )
+
+            # Инкрементальный режим: текущее расписание дополняется новыми и измененными заказами
+            warm_start = []
+            fingerprints = {}
+            if incremental:
+                for row in db.query(ProductionSchedule).all():
+                    warm_start.append(ScheduleItem(
+                        order_id=row.order_id,
+                        equipment_id=row.equipment_id,
+                        scheduled_start=row.scheduled_start,
+                        scheduled_end=row.scheduled_end,
+                        setup_time_minutes=row.setup_time_minutes or 0,
+                        processing_time_minutes=row.processing_time_minutes or 0
+                    ))
+                    fingerprints[row.order_id] = row.order_fingerprint
+
+            # Метка алгоритма в метриках: выбранный алгоритм и включенные режимы.
+            # Отмена и стоп доходят до оптимизаторов через job.stop_signal, даже если
+            # пришли до начала оптимизации
+            if warm_start:
+                label = 'incremental'
+                optimizer = IncrementalOptimizer(
+                    warm_start, fingerprints, time_limit_seconds=local_search_seconds, stop_signal=job.stop_signal
+                )
+            elif rolling_window_days:
+                # Скользящий горизонт: каждое окно решается новым оптимизатором выбранного алгоритма
+                label = f'{algorithm}+rolling_horizon'
+                optimizer = RollingHorizonOptimizer(
+                    lambda: create_optimizer(job.stop_signal), window_days=rolling_window_days,
+                    stop_signal=job.stop_signal
+                )
+            else:
+                label = algorithm
+                optimizer = create_optimizer(job.stop_signal)
+
+            optimizer.progress_callback = job.report_progress
+            result = optimizer.optimize(task)
+
+            # Дополнительное улучшение последовательностей линий
+            if local_search and not warm_start and not job.cancelled and not job.stop_requested:
+                label += '+local_search'
+                optimizer = LocalSearchOptimizer(time_limit_seconds=local_search_seconds, stop_signal=job.stop_signal)
+                optimizer.progress_callback = job.report_progress
+                result = optimizer.improve(task, result)
+
+            optimization_metrics.record(label, result)
+
+            if not job.cancelled:
+                save_optimization_result(result, db, orders)
+                # Досрочно остановленный запуск не кэшируется: его результат хуже полного
+                if cacheable and not job.stop_requested:
+                    optimization_cache.put(
+                        task_fingerprint(orders, equipment, params), task.start_time, result, generation
+                    )
+
+            return result
+        finally:
+            db.close()
 
-    # Запускаем оптимизацию
     try:
-        result = optimizer.optimize(task)
+        job = optimization_jobs.submit(run)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+    return job_response(job)
+
+
+@app.get("/optimize/jobs/{job_id}", response_model=OptimizationJobResponse)
+async def get_optimization_job(job_id: str):
+    """Статус задания оптимизации и результат после завершения"""
+    job = optimization_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задание оптимизации не найдено")
+    return job_response(job)
+
+
+@app.post("/optimize/jobs/{job_id}/stop", response_model=OptimizationJobResponse)
+async def stop_optimization_job(job_id: str):
+    """Досрочный останов задания с сохранением лучшего найденного решения"""
+    job = optimization_jobs.stop(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задание оптимизации не найдено")
+    return job_response(job)
+
+
+@app.get("/optimize/jobs/{job_id}/events")
+async def stream_optimization_job(job_id: str):
+    """Поток событий прогресса задания (Server-Sent Events)
+
+    События progress - поколения, узлы поиска, ходы локального поиска; последнее
+    событие status содержит задание в том же виде, что GET /optimize/jobs/{job_id}.
+    """
+    job = optimization_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задание оптимизации не найдено")
+
+    async def events():
+        sent = 0
+        keepalive_at = time.time()
+        while True:
+            # Статус читается до событий: события завершенного задания уже все записаны
+            finished = job.status not in ACTIVE_STATUSES
+            for event in list(job.events):
+                if event['seq'] > sent:
+                    sent = event['seq']
+                    yield f"event: progress\ndata: {json.dumps(jsonable_encoder(event))}\n\n"
+                    keepalive_at = time.time()
+
+            if finished:
+                yield f"event: status\ndata: {job_response(job).model_dump_json()}\n\n"
+                return
+
+            if time.time() - keepalive_at >= PROGRESS_KEEPALIVE_INTERVAL:
+                yield ": keepalive\n\n"
+                keepalive_at = time.time()
+            await asyncio.sleep(PROGRESS_POLL_INTERVAL)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-        await save_optimization_result(result, db)
-        
-        return result
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Ошибка оптимизации: {str(e)}")
+
+@app.delete("/optimize/jobs/{job_id}", response_model=OptimizationJobResponse)
+async def cancel_optimization_job(job_id: str):
+    """Отмена задания оптимизации"""
+    job = optimization_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задание оптимизации не найдено")
+    return job_response(job)
+
+
+@app.get("/optimize/cache")
+async def get_optimization_cache_stats():
+    """Статистика кэша результатов оптимизации"""
+    return optimization_cache.stats()
+
+
+@app.delete("/optimize/cache")
+async def clear_optimization_cache():
+    """Сброс кэша результатов оптимизации"""
+    optimization_cache.invalidate()
+    return optimization_cache.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Метрики оптимизации, очереди заданий и кэша в текстовом формате Prometheus"""
+    jobs = optimization_jobs.status_counts()
+    cache = optimization_cache.stats()
+    parts = [
+        optimization_metrics.render(),
+        format_metric(
+            'optimization_jobs', 'gauge', 'Хранимые задания оптимизации по статусам',
+            [({'status': status}, count) for status, count in sorted(jobs.items())]
+        ),
+        format_metric(
+            'optimization_jobs_finished_total', 'counter', 'Завершенные задания оптимизации по статусам',
+            [({'status': status}, count) for status, count in sorted(optimization_jobs.finished.items())]
+        ),
+        format_metric('optimization_result_cache_hits_total', 'counter',
+                      'Попадания кэша результатов оптимизации', [({}, cache['hits'])]),
+        format_metric('optimization_result_cache_misses_total', 'counter',
+                      'Промахи кэша результатов оптимизации', [({}, cache['misses'])]),
+        format_metric('optimization_result_cache_entries', 'gauge',
+                      'Результаты в кэше', [({}, cache['size'])]),
+    ]
+    return PlainTextResponse(''.join(parts), media_type="text/plain; version=0.0.4")
+
+
+def job_response(job: OptimizationJob) -> OptimizationJobResponse:
+    return OptimizationJobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        error=job.error,
+        cached=job.cached,
+        result=vars(job.result) if job.result is not None else None
+    )
 
 
-async def save_optimization_result(result: OptimizationResult, db: Session):
-    """Сохранение результатов оптимизации в базу данных"""
+def save_optimization_result(result: OptimizationResult, db: Session, planned_orders: List):
+    """Сохранение результатов оптимизации в базу данных
+
+    planned_orders - заказы, по которым построено расписание: их отпечатки
+    сохраняются для инкрементальной переоптимизации.
+    """
+    fingerprints = {order.id: order_fingerprint(order) for order in planned_orders}
     try:
         db.query(ProductionSchedule).delete()
         
@@ -509,14 +827,20 @@ async def save_optimization_result(result: OptimizationResult, db: Session):
                 scheduled_start=schedule_item.scheduled_start,
                 scheduled_end=schedule_item.scheduled_end,
                 setup_time_minutes=schedule_item.setup_time_minutes,
-                processing_time_minutes=schedule_item.processing_time_minutes
+                processing_time_minutes=schedule_item.processing_time_minutes,
+                order_fingerprint=fingerprints.get(schedule_item.order_id)
             )
             db.add(db_schedule)
 
+        # Заказы загружаются одним запросом, а не по одному на элемент расписания
+        orders = {
+            order.id: order
+            for order in db.query(ProductionOrder).filter(
+                ProductionOrder.id.in_([item.order_id for item in result.schedule])
+            )
+        }
         for schedule_item in result.schedule:
-            order = db.query(ProductionOrder).filter(
-                ProductionOrder.id == schedule_item.order_id
-            ).first()
+            order = orders.get(schedule_item.order_id)
             
             if order:
                 order.equipment_id = schedule_item.equipment_id
@@ -0,0 +1,106 @@
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Tuple
+
+from src.optimization.algorithms import OptimizationResult
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_metric(name: str, metric_type: str, help_text: str,
+                  samples: Iterable[Tuple[Dict[str, str], float]]) -> str:
+    """Метрика в текстовом формате Prometheus: строки HELP, TYPE и значения"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        if labels:
+            label_text = ','.join(f'{key}="{_escape_label(label)}"' for key, label in sorted(labels.items()))
+            lines.append(f"{name}{{{label_text}}} {value}")
+        else:
+            lines.append(f"{name} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+class OptimizationMetrics:
+    """Метрики завершенных запусков оптимизации, накопленные с запуска API
+
+    Счетчики ведутся по алгоритму (метка algorithm), время этапов - по алгоритму
+    и этапу. Пиковая память - наибольшее значение по всем запускам.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.runs = Counter()  # (алгоритм, причина останова) -> число запусков
+        self.run_seconds = defaultdict(float)
+        self.phase_seconds = defaultdict(float)  # (алгоритм, этап) -> секунды
+        self.evaluations = Counter()
+        self.nodes_explored = Counter()
+        self.nodes_pruned = Counter()
+        self.fitness_cache_hits = Counter()
+        self.fitness_cache_misses = Counter()
+        self.waste_kg = defaultdict(float)
+        self.last_evaluations_per_second = {}
+        self.peak_memory_mb = 0.0
+
+    def record(self, algorithm: str, result: OptimizationResult):
+        """Учет результата завершенного запуска"""
+        with self.lock:
+            self.runs[(algorithm, result.stop_reason)] += 1
+            self.run_seconds[algorithm] += result.optimization_time_seconds
+            for phase, seconds in result.phase_seconds.items():
+                self.phase_seconds[(algorithm, phase)] += seconds
+            self.evaluations[algorithm] += result.evaluations
+            self.nodes_explored[algorithm] += result.nodes_explored
+            self.nodes_pruned[algorithm] += result.nodes_pruned
+            self.fitness_cache_hits[algorithm] += result.fitness_cache_hits
+            self.fitness_cache_misses[algorithm] += result.fitness_cache_misses
+            self.waste_kg[algorithm] += float(result.total_waste_kg)
+            self.last_evaluations_per_second[algorithm] = result.evaluations_per_second
+            self.peak_memory_mb = max(self.peak_memory_mb, result.peak_memory_mb)
+
+    def render(self) -> str:
+        """Метрики в текстовом формате Prometheus"""
+        with self.lock:
+            per_algorithm = [
+                ('optimization_run_seconds_total', self.run_seconds,
+                 'Суммарное время запусков оптимизации, с'),
+                ('optimization_evaluations_total', self.evaluations,
+                 'Оценено решений: индивидуумов, узлов поиска, ходов, назначений'),
+                ('optimization_nodes_explored_total', self.nodes_explored,
+                 'Просмотрено узлов метода ветвей и границ'),
+                ('optimization_nodes_pruned_total', self.nodes_pruned,
+                 'Отсечено узлов метода ветвей и границ'),
+                ('optimization_fitness_cache_hits_total', self.fitness_cache_hits,
+                 'Попадания кэша приспособленности'),
+                ('optimization_fitness_cache_misses_total', self.fitness_cache_misses,
+                 'Промахи кэша приспособленности'),
+                ('optimization_waste_kg_total', self.waste_kg,
+                 'Суммарные отходы найденных расписаний, кг'),
+            ]
+
+            parts = [format_metric(
+                'optimization_runs_total', 'counter', 'Завершенные запуски оптимизации',
+                [({'algorithm': algorithm, 'stop_reason': stop_reason}, count)
+                 for (algorithm, stop_reason), count in sorted(self.runs.items())]
+            )]
+            for name, values, help_text in per_algorithm:
+                parts.append(format_metric(
+                    name, 'counter', help_text,
+                    [({'algorithm': algorithm}, value) for algorithm, value in sorted(values.items())]
+                ))
+            parts.append(format_metric(
+                'optimization_phase_seconds_total', 'counter', 'Время этапов оптимизации, с',
+                [({'algorithm': algorithm, 'phase': phase}, seconds)
+                 for (algorithm, phase), seconds in sorted(self.phase_seconds.items())]
+            ))
+            parts.append(format_metric(
+                'optimization_evaluations_per_second', 'gauge', 'Скорость оценки решений последнего запуска',
+                [({'algorithm': algorithm}, value)
+                 for algorithm, value in sorted(self.last_evaluations_per_second.items())]
+            ))
+            parts.append(format_metric(
+                'optimization_peak_memory_megabytes', 'gauge', 'Наибольший прирост пикового RSS процесса за запуск, МБ',
+                [({}, self.peak_memory_mb)]
+            ))
+            return ''.join(parts)
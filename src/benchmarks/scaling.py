@@ -0,0 +1,214 @@
+import argparse
+import json
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.data_generation.synthetic_data import SyntheticDataGenerator
+from src.models.production import Equipment, ProductionOrder
+from src.optimization.algorithms import (
+    ArrayGeneticOptimizer, BranchAndBoundOptimizer, GeneticAlgorithmOptimizer, HybridOptimizer, OptimizationTask
+)
+from src.optimization.records import EquipmentRecord, OrderRecord
+
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+DEFAULT_SEED = 42
+DEFAULT_TIME_LIMIT = 30.0  # предел времени одного запуска, с
+DEFAULT_TOLERANCE = 0.2  # допустимое относительное ухудшение метрики
+
+# Фиксированные даты: экземпляр задачи зависит только от числа заказов и seed
+BENCHMARK_DATE = date(2025, 1, 1)
+BENCHMARK_START = datetime(2025, 1, 1, 8, 0)
+
+# Время и скорость запусков короче этого порога не сравниваются - слишком велик шум, с
+MIN_COMPARED_SECONDS = 0.1
+TIMING_METRICS = ('wall_seconds', 'evaluations_per_second')
+
+
+ENGINES: Dict[str, Callable[[float], object]] = {
+    'ga': lambda time_limit: GeneticAlgorithmOptimizer(
+        population_size=50, generations=50, time_limit_seconds=time_limit
+    ),
+    'ga_array': lambda time_limit: ArrayGeneticOptimizer(
+        population_size=50, generations=50, time_limit_seconds=time_limit, seed=0
+    ),
+    'bb': lambda time_limit: BranchAndBoundOptimizer(
+        max_nodes=200000, time_limit_seconds=time_limit
+    ),
+    'hybrid': lambda time_limit: HybridOptimizer(
+        ga_params={'population_size': 50, 'generations': 50},
+        bb_max_nodes=200000, time_limit_seconds=time_limit
+    ),
+}
+
+# Сравниваемые метрики: имя -> True, если большее значение лучше
+COMPARED_METRICS = {
+    'wall_seconds': False,
+    'evaluations_per_second': True,
+    'peak_memory_mb': False,
+    'total_waste_kg': False,
+}
+
+
+def generate_instance(n_orders: int, seed: int = DEFAULT_SEED,
+                      n_materials: int = 25) -> Tuple[List[ProductionOrder], List[Equipment]]:
+    """Синтетический экземпляр задачи в памяти с распределениями SyntheticDataGenerator"""
+    generator = SyntheticDataGenerator(seed=seed)
+
+    materials = generator.build_materials(n_materials)
+    for material_id, material in enumerate(materials, 1):
+        material.id = material_id
+
+    equipment = generator.build_equipment()
+    for equipment_id, eq in enumerate(equipment, 1):
+        eq.id = equipment_id
+
+    orders = generator.build_production_orders(materials, n_orders, base_date=BENCHMARK_DATE)
+    for order_id, order in enumerate(orders, 1):
+        order.id = order_id
+
+    return orders, equipment
+
+
+def run_case(engine: str, n_orders: int, seed: int = DEFAULT_SEED,
+             time_limit: float = DEFAULT_TIME_LIMIT) -> dict:
+    """Один запуск оптимизатора на синтетическом экземпляре"""
+    orders, equipment = generate_instance(n_orders, seed)
+    # Оптимизатор получает те же записи, что и в API (load_planning_data)
+    task = OptimizationTask(
+        orders=[OrderRecord.from_order(order) for order in orders],
+        equipment=[EquipmentRecord.from_equipment(eq) for eq in equipment if eq.is_available],
+        start_time=BENCHMARK_START
+    )
+    optimizer = ENGINES[engine](time_limit)
+
+    start = time.perf_counter()
+    result = optimizer.optimize(task)
+    wall_seconds = time.perf_counter() - start
+
+    return {
+        'engine': engine,
+        'orders': n_orders,
+        'wall_seconds': wall_seconds,
+        'evaluations': result.evaluations,
+        'evaluations_per_second': result.evaluations / wall_seconds if wall_seconds > 0 else 0.0,
+        'peak_memory_mb': result.peak_memory_mb,
+        'total_waste_kg': float(result.total_waste_kg),
+        'makespan_hours': result.makespan_hours,
+        'scheduled_orders': len(result.schedule),
+        'stop_reason': result.stop_reason,
+        'optimality_gap': result.optimality_gap,
+        'phase_seconds': result.phase_seconds,
+    }
+
+
+def run_benchmark(sizes: List[int] = DEFAULT_SIZES, engines: Optional[List[str]] = None,
+                  seed: int = DEFAULT_SEED, time_limit: float = DEFAULT_TIME_LIMIT,
+                  isolate: bool = True) -> dict:
+    """Запуск всех оптимизаторов на экземплярах заданных размеров
+
+    При isolate каждый запуск выполняется в отдельном процессе: пиковая память
+    считается как прирост ru_maxrss за запуск, и без изоляции запуск, не
+    превысивший пик предыдущих, показал бы 0.
+    """
+    engines = engines or list(ENGINES)
+    results = []
+    for n_orders in sizes:
+        for engine in engines:
+            if isolate:
+                with ProcessPoolExecutor(max_workers=1) as executor:
+                    case = executor.submit(run_case, engine, n_orders, seed, time_limit).result()
+            else:
+                case = run_case(engine, n_orders, seed, time_limit)
+            print(f"{engine:>7} {n_orders:>6} заказов: {case['wall_seconds']:.2f} с, "
+                  f"{case['evaluations_per_second']:.0f} оценок/с, "
+                  f"{case['peak_memory_mb']:.1f} МБ, отходы {case['total_waste_kg']:.2f} кг")
+            results.append(case)
+
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'time_limit_seconds': time_limit,
+        'results': results,
+    }
+
+
+def compare_results(current: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> List[dict]:
+    """Регрессии текущих результатов относительно базовых
+
+    Метрика считается ухудшившейся, если изменилась в худшую сторону больше
+    чем на долю tolerance. Сравниваются только запуски, которые есть в обоих файлах.
+    """
+    baseline_cases = {(case['engine'], case['orders']): case for case in baseline['results']}
+    regressions = []
+    for case in current['results']:
+        base_case = baseline_cases.get((case['engine'], case['orders']))
+        if base_case is None:
+            continue
+
+        short_run = max(case['wall_seconds'], base_case['wall_seconds']) < MIN_COMPARED_SECONDS
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            value, base_value = case.get(metric), base_case.get(metric)
+            if value is None or base_value is None or (short_run and metric in TIMING_METRICS):
+                continue
+
+            if higher_is_better:
+                worse = value < base_value * (1 - tolerance)
+            else:
+                worse = value > base_value * (1 + tolerance) and value - base_value > 1e-9
+            if worse:
+                regressions.append({
+                    'engine': case['engine'],
+                    'orders': case['orders'],
+                    'metric': metric,
+                    'baseline': base_value,
+                    'current': value,
+                    'change': (value - base_value) / base_value if base_value else None,
+                })
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк масштабируемости оптимизаторов")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Числа заказов")
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES))
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--time-limit', type=float, default=DEFAULT_TIME_LIMIT,
+                        help="Предел времени одного запуска, с")
+    parser.add_argument('--output', default='benchmark_results.json', help="Файл результатов")
+    parser.add_argument('--compare', metavar='BASELINE', help="Базовый файл результатов для сравнения")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Допустимое относительное ухудшение метрики")
+    args = parser.parse_args(argv)
+
+    current = run_benchmark(args.sizes, args.engines, args.seed, args.time_limit)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(current, f, ensure_ascii=False, indent=2)
+    print(f"Результаты сохранены в {args.output}")
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare_results(current, baseline, args.tolerance)
+    if not regressions:
+        print(f"Регрессий относительно {args.compare} не найдено")
+        return 0
+
+    print(f"Регрессии относительно {args.compare}:")
+    for regression in regressions:
+        change = f"{regression['change']:+.1%}" if regression['change'] is not None else "н/д"
+        print(f"  {regression['engine']} {regression['orders']} заказов, {regression['metric']}: "
+              f"{regression['baseline']:.4g} -> {regression['current']:.4g} ({change})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,7 @@ import random
 import uuid
 from datetime import datetime, date, timedelta
 from decimal import Decimal
-from typing import List
+from typing import List, Optional
 from sqlalchemy.orm import Session
 
 from src.models.production import (
@@ -14,7 +14,8 @@ from src.models.production import (
 class SyntheticDataGenerator:
     """Генератор синтетических данных для имитации реального производства"""
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)  # seed - воспроизводимые данные (бенчмарки)
         self.material_types = [
             "LDPE", "HDPE", "PP", "PVC", "PA", "EVOH"
         ]
@@ -47,31 +48,43 @@ class SyntheticDataGenerator:
     
     def generate_materials(self, db: Session, count: int = 20) -> List[Material]:
         """Генерация материалов"""
+        materials = self.build_materials(count)
+        db.add_all(materials)
+        db.commit()
+        return materials
+    
+    def build_materials(self, count: int = 20) -> List[Material]:
+        """Материалы без сохранения в базу данных"""
         materials = []
         
         for i in range(count):
-            material_type = random.choice(self.material_types)
-            color = random.choice(self.colors) if random.random() > 0.3 else None
+            material_type = self.rng.choice(self.material_types)
+            color = self.rng.choice(self.colors) if self.rng.random() > 0.3 else None
             
             material = Material(
                 name=f"{material_type}{'_' + color if color else ''}_{i+1:03d}",
                 type=material_type,
                 color=color,
-                density=Decimal(str(round(random.uniform(0.85, 1.45), 3))),
-                cost_per_kg=Decimal(str(round(random.uniform(45, 180), 2))),
-                available_quantity=Decimal(str(round(random.uniform(500, 5000), 2))),
-                minimum_stock=Decimal(str(round(random.uniform(100, 500), 2))),
-                supplier=random.choice(self.suppliers)
+                density=Decimal(str(round(self.rng.uniform(0.85, 1.45), 3))),
+                cost_per_kg=Decimal(str(round(self.rng.uniform(45, 180), 2))),
+                available_quantity=Decimal(str(round(self.rng.uniform(500, 5000), 2))),
+                minimum_stock=Decimal(str(round(self.rng.uniform(100, 500), 2))),
+                supplier=self.rng.choice(self.suppliers)
             )
             
-            db.add(material)
             materials.append(material)
         
-        db.commit()
         return materials
     
     def generate_equipment(self, db: Session) -> List[Equipment]:
         """Генерация оборудования"""
+        equipment_list = self.build_equipment()
+        db.add_all(equipment_list)
+        db.commit()
+        return equipment_list
+    
+    def build_equipment(self) -> List[Equipment]:
+        """Оборудование без сохранения в базу данных"""
         equipment_list = []
         
         for process_type in ProcessType:
@@ -79,31 +92,29 @@ class SyntheticDataGenerator:
             
             for name in names:
                 if process_type == ProcessType.EXTRUSION:
-                    capacity = round(random.uniform(50, 200), 2)
-                    setup_time = random.randint(30, 120)
+                    capacity = round(self.rng.uniform(50, 200), 2)
+                    setup_time = self.rng.randint(30, 120)
                 elif process_type == ProcessType.RINGING:
-                    capacity = round(random.uniform(80, 150), 2)
-                    setup_time = random.randint(15, 60)
+                    capacity = round(self.rng.uniform(80, 150), 2)
+                    setup_time = self.rng.randint(15, 60)
                 else:  # Гофрирование
-                    capacity = round(random.uniform(60, 120), 2)
-                    setup_time = random.randint(20, 90)
+                    capacity = round(self.rng.uniform(60, 120), 2)
+                    setup_time = self.rng.randint(20, 90)
                 
                 equipment = Equipment(
                     name=name,
                     process_type=process_type,
                     capacity_per_hour=Decimal(str(capacity)),
                     setup_time_minutes=setup_time,
-                    is_available=random.random() > 0.1,  # 90% доступности
+                    is_available=self.rng.random() > 0.1,  # 90% доступности
                     maintenance_schedule=datetime.now() + timedelta(
-                        days=random.randint(1, 90)
-                    ) if random.random() > 0.7 else None,
+                        days=self.rng.randint(1, 90)
+                    ) if self.rng.random() > 0.7 else None,
                     specifications='{"max_width": 1200, "max_thickness": 5.0}'
                 )
                 
-                db.add(equipment)
                 equipment_list.append(equipment)
         
-        db.commit()
         return equipment_list
     
     def generate_production_orders(
@@ -113,51 +124,61 @@ class SyntheticDataGenerator:
         count: int = 100
     ) -> List[ProductionOrder]:
         """Генерация производственных заказов"""
+        orders = self.build_production_orders(materials, count)
+        db.add_all(orders)
+        db.commit()
+        return orders
+    
+    def build_production_orders(
+        self,
+        materials: List[Material],
+        count: int = 100,
+        base_date: Optional[date] = None
+    ) -> List[ProductionOrder]:
+        """Производственные заказы без сохранения в базу данных"""
         orders = []
-        base_date = date.today()
+        base_date = base_date or date.today()
         
         for i in range(count):
-            product_type = random.choice(list(ProductType))
+            product_type = self.rng.choice(list(ProductType))
 
             if product_type == ProductType.SHELL:
-                process_type = random.choice([
+                process_type = self.rng.choice([
                     ProcessType.EXTRUSION, ProcessType.RINGING, 
                     ProcessType.CORRUGATION_SOFT, ProcessType.CORRUGATION_HARD
                 ])
             elif product_type == ProductType.FILM:
-                process_type = random.choice([
+                process_type = self.rng.choice([
                     ProcessType.EXTRUSION, ProcessType.CORRUGATION_SOFT
                 ])
             else:
                 process_type = ProcessType.EXTRUSION
             
-            material = random.choice(materials)
+            material = self.rng.choice(materials)
             
             # Генерация характеристик заказа
-            order_date = base_date - timedelta(days=random.randint(0, 30))
-            delivery_date = order_date + timedelta(days=random.randint(3, 21))
+            order_date = base_date - timedelta(days=self.rng.randint(0, 30))
+            delivery_date = order_date + timedelta(days=self.rng.randint(3, 21))
             
             order = ProductionOrder(
-                order_number=f"ORD-{datetime.now().year}-{i+1:05d}",
+                order_number=f"ORD-{base_date.year}-{i+1:05d}",
                 product_type=product_type,
                 process_type=process_type,
                 material_id=material.id,
-                quantity_kg=Decimal(str(round(random.uniform(50, 2000), 2))),
-                width_mm=random.randint(200, 1200) if random.random() > 0.3 else None,
-                thickness_mm=Decimal(str(round(random.uniform(0.05, 3.0), 2))) if random.random() > 0.3 else None,
-                color=random.choice(self.colors) if random.random() > 0.4 else None,
-                caliber=f"D{random.randint(50, 500)}" if process_type == ProcessType.RINGING else None,
+                quantity_kg=Decimal(str(round(self.rng.uniform(50, 2000), 2))),
+                width_mm=self.rng.randint(200, 1200) if self.rng.random() > 0.3 else None,
+                thickness_mm=Decimal(str(round(self.rng.uniform(0.05, 3.0), 2))) if self.rng.random() > 0.3 else None,
+                color=self.rng.choice(self.colors) if self.rng.random() > 0.4 else None,
+                caliber=f"D{self.rng.randint(50, 500)}" if process_type == ProcessType.RINGING else None,
                 order_date=order_date,
                 delivery_date=delivery_date,
-                priority=random.randint(1, 5),
-                status=random.choice([OrderStatus.PLANNED, OrderStatus.IN_PROGRESS]) 
-                    if random.random() > 0.8 else OrderStatus.PLANNED
+                priority=self.rng.randint(1, 5),
+                status=self.rng.choice([OrderStatus.PLANNED, OrderStatus.IN_PROGRESS]) 
+                    if self.rng.random() > 0.8 else OrderStatus.PLANNED
             )
             
-            db.add(order)
             orders.append(order)
         
-        db.commit()
         return orders
     
     def generate_waste_logs(
@@ -175,23 +196,23 @@ class SyntheticDataGenerator:
         waste_logs = []
         
         for _ in range(count):
-            order = random.choice(orders)
+            order = self.rng.choice(orders)
 
             if order.process_type == ProcessType.EXTRUSION:
-                waste_kg = round(random.uniform(1, 50), 2)
+                waste_kg = round(self.rng.uniform(1, 50), 2)
             elif order.process_type == ProcessType.RINGING:
-                waste_kg = round(random.uniform(0.5, 30), 2)
+                waste_kg = round(self.rng.uniform(0.5, 30), 2)
             else:  # Гофрирование
-                waste_kg = round(random.uniform(2, 40), 2)
+                waste_kg = round(self.rng.uniform(2, 40), 2)
             
             waste_log = WasteLog(
                 order_id=order.id,
                 process_type=order.process_type,
-                waste_type=random.choice(waste_types),
+                waste_type=self.rng.choice(waste_types),
                 quantity_kg=Decimal(str(waste_kg)),
-                reason=f"Причина отходов: {random.choice(waste_types)}",
+                reason=f"Причина отходов: {self.rng.choice(waste_types)}",
                 recorded_at=datetime.now() - timedelta(
-                    hours=random.randint(1, 720)
+                    hours=self.rng.randint(1, 720)
                 )
             )
             
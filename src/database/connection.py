@@ -1,5 +1,5 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from src.models.production import Base
@@ -21,10 +21,31 @@ else:
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+# Столбцы, добавленные в существующие таблицы после первой версии схемы
+ADDED_COLUMNS = [
+    ('production_schedules', 'order_fingerprint', 'VARCHAR(64)'),
+]
+
+
 def create_tables():
     Base.metadata.create_all(bind=engine)
 
 
+def upgrade_schema(bind=engine):
+    """Добавление новых столбцов в базу, созданную прежней версией схемы
+
+    Скрипты init_db выполняются только при создании базы, а create_all
+    не изменяет существующие таблицы.
+    """
+    inspector = inspect(bind)
+    with bind.begin() as connection:
+        for table, column, column_type in ADDED_COLUMNS:
+            if not inspector.has_table(table):
+                continue
+            if column not in {existing['name'] for existing in inspector.get_columns(table)}:
+                connection.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}'))
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -35,4 +56,5 @@ def get_db():
 
 def init_database():
     create_tables()
+    upgrade_schema()
     print("Database initialized successfully!") 
\ No newline at end of file
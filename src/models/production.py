@@ -112,6 +112,7 @@ class ProductionSchedule(Base):
     scheduled_end = Column(DateTime, nullable=False)
     setup_time_minutes = Column(Integer)
     processing_time_minutes = Column(Integer)
+    order_fingerprint = Column(String(64))  # отпечаток заказа, по которому построено расписание
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -251,4 +252,25 @@ class OptimizationResult(BaseModel):
     equipment_utilization: dict[int, float]
     waste_reduction_percentage: float
     makespan_hours: float
-    optimization_time_seconds: float 
\ No newline at end of file
+    optimization_time_seconds: float
+    fitness_cache_hits: int = 0
+    fitness_cache_misses: int = 0
+    stop_reason: str = "completed"
+    nodes_explored: int = 0
+    nodes_pruned: int = 0
+    optimality_gap: Optional[float] = None
+    phase_seconds: dict[str, float] = {}
+    evaluations: int = 0
+    evaluations_per_second: float = 0.0
+    peak_memory_mb: float = 0.0
+
+
+class OptimizationJobResponse(BaseModel):
+    job_id: str
+    status: str  # queued | running | completed | failed | cancelled
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    cached: bool = False
+    result: Optional[OptimizationResult] = None
\ No newline at end of file
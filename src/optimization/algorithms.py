@@ -1,13 +1,29 @@
+import heapq
+import os
 import random
+import sys
 import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import List, Tuple, Dict, Optional, Any
-from dataclasses import dataclass
+from typing import List, Tuple, Dict, Optional, Any, Callable
+from dataclasses import dataclass, field
 import numpy as np
-from deap import base, creator, tools, algorithms
+from deap import base, tools, algorithms
 
 from src.models.production import ProductionOrder, Equipment, ProcessType, ScheduleItem
+from src.optimization.records import order_fingerprint
+
+try:
+    import resource
+except ImportError:  # Windows: пиковая память процесса не измеряется
+    resource = None
+
+# Обработчик прогресса: событие и функция, строящая лучшее расписание на текущий момент.
+# Функция вызывается только внутри обработчика - пока состояние оптимизатора не изменилось
+ProgressCallback = Callable[[dict, Callable[[], List[ScheduleItem]]], None]
 
 
 @dataclass
@@ -17,6 +33,17 @@ class OptimizationTask:
     equipment: List[Equipment]
     start_time: datetime
     planning_horizon_hours: int = 720  # 30 дней
+    _compiled: Optional['CompiledTask'] = field(default=None, init=False, repr=False, compare=False)
+
+    def compile(self) -> 'CompiledTask':
+        """Скомпилированная форма задачи (строится один раз и переиспользуется)"""
+        if self._compiled is None:
+            self._compiled = CompiledTask.from_task(self)
+        return self._compiled
+
+    def transition_matrices(self) -> 'TransitionMatrices':
+        """Матрицы переходов задачи"""
+        return self.compile().matrices
 
 
 @dataclass
@@ -29,6 +56,125 @@ class OptimizationResult:
     waste_reduction_percentage: float
     makespan_hours: float
     optimization_time_seconds: float
+    fitness_cache_hits: int = 0
+    fitness_cache_misses: int = 0
+    stop_reason: str = 'completed'  # completed | time_limit | stagnation | node_limit | beam_truncated
+    nodes_explored: int = 0
+    nodes_pruned: int = 0
+    optimality_gap: Optional[float] = None  # относительный разрыв с нижней границей (None - не оценен)
+    phase_seconds: Dict[str, float] = field(default_factory=dict)  # время по этапам оптимизации
+    evaluations: int = 0  # оценено решений: индивидуумов, узлов поиска, ходов, назначений
+    evaluations_per_second: float = 0.0
+    peak_memory_mb: float = 0.0  # прирост пикового RSS процесса за запуск, МБ
+
+
+class PhaseTimer:
+    """Накопление времени по этапам оптимизации
+
+    Создается в начале запуска и запоминает пиковый RSS процесса на этот момент.
+    """
+    
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.peak_memory_start_mb = _peak_memory_mb()
+    
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+    
+    def add(self, name: str, seconds: float):
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+    
+    def merge(self, phase_seconds: Dict[str, float]):
+        for name, seconds in phase_seconds.items():
+            self.add(name, seconds)
+
+
+def _peak_memory_mb() -> float:
+    """Пиковый объем памяти процесса за время его работы, МБ"""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux возвращает килобайты, macOS - байты
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _instrument(result: OptimizationResult, timer: PhaseTimer, evaluations: int) -> OptimizationResult:
+    """Запись времени этапов, числа оценок и пиковой памяти в результат
+
+    ru_maxrss - пик за все время жизни процесса, поэтому в результат пишется его
+    прирост с начала запуска: иначе каждый запуск в процессе API показывал бы пик
+    самого тяжелого из предыдущих. Запуск, не превысивший прежний пик, дает 0.
+    """
+    timer.merge(result.phase_seconds)
+    result.phase_seconds = timer.seconds
+    result.evaluations += evaluations
+    if result.optimization_time_seconds > 0:
+        result.evaluations_per_second = result.evaluations / result.optimization_time_seconds
+    result.peak_memory_mb = max(result.peak_memory_mb, _peak_memory_mb() - timer.peak_memory_start_mb)
+    return result
+
+
+PROCESS_CODES = {process_type: code for code, process_type in enumerate(ProcessType)}
+
+
+@dataclass
+class TransitionMatrices:
+    """Предвычисленные коэффициенты отходов и времени переналадки для задачи
+
+    Коэффициент перехода зависит только от типа процесса и технологических
+    признаков заказа (материал/цвет, калибр, толщина), поэтому заказы
+    группируются в классы перехода, а матрица хранится для классов.
+    Полная матрица N×N заказов доступна через waste_factors.
+    """
+    order_index: Dict[int, int]      # id заказа -> индекс
+    equipment_index: Dict[int, int]  # id оборудования -> индекс
+    order_class: np.ndarray          # (N,) класс перехода заказа
+    order_process: np.ndarray        # (N,) код типа процесса заказа
+    class_factors: np.ndarray        # (K, K) коэффициенты отходов между классами
+    base_setup: np.ndarray           # (E,) базовое время переналадки, мин
+
+    @property
+    def waste_factors(self) -> np.ndarray:
+        """Полная матрица коэффициентов отходов N×N (предыдущий, следующий)"""
+        return self.class_factors[np.ix_(self.order_class, self.order_class)]
+
+    def transition_factor(self, prev: int, order: int) -> float:
+        """Коэффициент отходов при переходе между заказами по индексам"""
+        return float(self.class_factors[self.order_class[prev], self.order_class[order]])
+
+    def transition_factors(self, prev: np.ndarray, order: np.ndarray) -> np.ndarray:
+        """Векторный расчет коэффициентов отходов для пар заказов"""
+        return self.class_factors[self.order_class[prev], self.order_class[order]]
+
+    def setup_time(self, equipment: int, order: int, prev: int = -1) -> int:
+        """Время переналадки в минутах по индексам (prev = -1 - первый заказ)"""
+        base_setup_time = int(self.base_setup[equipment])
+
+        if prev < 0:
+            return base_setup_time
+
+        if self.order_process[prev] != self.order_process[order]:
+            return base_setup_time * 2
+
+        return base_setup_time + int(base_setup_time * self.transition_factor(prev, order))
+
+    def setup_times(self, equipment: np.ndarray, order: np.ndarray, prev: np.ndarray) -> np.ndarray:
+        """Векторный расчет времени переналадки (prev = -1 - первый заказ)"""
+        base_setup_time = self.base_setup[equipment]
+        factors = self.transition_factors(prev, order)
+        same_process = self.order_process[prev] == self.order_process[order]
+
+        setup = np.where(
+            same_process,
+            base_setup_time + (base_setup_time * factors).astype(np.int64),
+            base_setup_time * 2
+        )
+        return np.where(prev < 0, base_setup_time, setup)
 
 
 class WasteCalculator:
@@ -59,11 +205,14 @@ class WasteCalculator:
         }
     }
     
+    CROSS_PROCESS_WASTE_FACTOR = 0.15
+    DEFAULT_WASTE_FACTOR = 0.05
+    
     @staticmethod
     def calculate_transition_waste(order1: ProductionOrder, order2: ProductionOrder) -> float:
         """Расчет отходов при переходе между заказами"""
         if order1.process_type != order2.process_type:
-            return 0.15
+            return WasteCalculator.CROSS_PROCESS_WASTE_FACTOR
         
         process_factors = WasteCalculator.TRANSITION_WASTE_FACTORS.get(
             (order1.process_type, order2.process_type), {}
@@ -97,7 +246,7 @@ class WasteCalculator:
                     else:
                         return process_factors.get('diff_caliber_large', 0.06)
                 except:
-                    return 0.05
+                    return WasteCalculator.DEFAULT_WASTE_FACTOR
                     
         elif order1.process_type in [ProcessType.CORRUGATION_SOFT, ProcessType.CORRUGATION_HARD]:
 
@@ -113,9 +262,9 @@ class WasteCalculator:
                     else:
                         return process_factors.get('diff_thickness_large', 0.07)
                 else:
-                    return 0.05
+                    return WasteCalculator.DEFAULT_WASTE_FACTOR
         
-        return 0.05
+        return WasteCalculator.DEFAULT_WASTE_FACTOR
     
     @staticmethod
     def calculate_setup_time(order: ProductionOrder, equipment: Equipment, prev_order: Optional[ProductionOrder] = None) -> int:
@@ -132,567 +281,2717 @@ class WasteCalculator:
         additional_time = int(base_setup_time * transition_factor)
         
         return base_setup_time + additional_time
+    
+    @staticmethod
+    def build_matrices(orders: List[ProductionOrder], equipment: List[Equipment]) -> TransitionMatrices:
+        """Построение матриц переходов для набора заказов и оборудования"""
+        class_index = {}
+        representatives = []
+        order_class = np.empty(len(orders), dtype=np.int64)
+        
+        # Группируем заказы в классы перехода
+        for i, order in enumerate(orders):
+            key = WasteCalculator._transition_class_key(order)
+            if key not in class_index:
+                class_index[key] = len(representatives)
+                representatives.append(order)
+            order_class[i] = class_index[key]
+        
+        n_classes = len(representatives)
+        class_process = np.array(
+            [PROCESS_CODES[order.process_type] for order in representatives], dtype=np.int64
+        )
+        class_factors = np.full(
+            (n_classes, n_classes), WasteCalculator.CROSS_PROCESS_WASTE_FACTOR, dtype=np.float64
+        )
+        
+        # Переходы внутри одного процесса считаем блоками
+        for process_type, code in PROCESS_CODES.items():
+            members = np.flatnonzero(class_process == code)
+            if members.size == 0:
+                continue
+            
+            block = WasteCalculator._process_block_factors(
+                process_type, [representatives[m] for m in members]
+            )
+            class_factors[np.ix_(members, members)] = block
+        
+        return TransitionMatrices(
+            order_index={order.id: i for i, order in enumerate(orders)},
+            equipment_index={eq.id: i for i, eq in enumerate(equipment)},
+            order_class=order_class,
+            order_process=class_process[order_class],
+            class_factors=class_factors,
+            base_setup=np.array([eq.setup_time_minutes or 30 for eq in equipment], dtype=np.int64)
+        )
+    
+    @staticmethod
+    def _transition_class_key(order: ProductionOrder) -> tuple:
+        """Признаки заказа, от которых зависит коэффициент отходов"""
+        if order.process_type == ProcessType.EXTRUSION:
+            return (order.process_type, order.material_id, order.color)
+        elif order.process_type == ProcessType.RINGING:
+            return (order.process_type, order.caliber)
+        elif order.process_type in [ProcessType.CORRUGATION_SOFT, ProcessType.CORRUGATION_HARD]:
+            return (order.process_type, order.thickness_mm)
+        return (order.process_type,)
+    
+    @staticmethod
+    def _process_block_factors(process_type: ProcessType, orders: List[ProductionOrder]) -> np.ndarray:
+        """Матрица коэффициентов отходов для классов одного процесса"""
+        process_factors = WasteCalculator.TRANSITION_WASTE_FACTORS.get((process_type, process_type), {})
+        
+        if process_type == ProcessType.EXTRUSION:
+            material = _categorical_codes([order.material_id for order in orders])
+            color = _categorical_codes([order.color for order in orders])
+            same_material = material[:, None] == material[None, :]
+            same_color = color[:, None] == color[None, :]
+            
+            return np.where(
+                same_material & same_color, process_factors.get('same_material_same_color', 0.03),
+                np.where(
+                    same_material, process_factors.get('same_material_diff_color', 0.05),
+                    np.where(
+                        same_color, process_factors.get('diff_material_same_color', 0.08),
+                        process_factors.get('diff_material_diff_color', 0.12)
+                    )
+                )
+            )
+        
+        elif process_type == ProcessType.RINGING:
+            caliber = _categorical_codes([order.caliber for order in orders])
+            values = np.zeros(len(orders), dtype=np.int64)
+            parsed = np.ones(len(orders), dtype=bool)
+            
+            for i, order in enumerate(orders):
+                try:
+                    values[i] = int(order.caliber.replace('D', '')) if order.caliber else 0
+                except (ValueError, AttributeError):
+                    parsed[i] = False
+            
+            diff = np.abs(values[:, None] - values[None, :])
+            
+            return np.where(
+                caliber[:, None] == caliber[None, :], process_factors.get('same_caliber', 0.015),
+                np.where(
+                    ~(parsed[:, None] & parsed[None, :]), WasteCalculator.DEFAULT_WASTE_FACTOR,
+                    np.where(
+                        diff <= 50,
+                        process_factors.get('diff_caliber_small', 0.03),
+                        process_factors.get('diff_caliber_large', 0.06)
+                    )
+                )
+            )
+        
+        elif process_type in [ProcessType.CORRUGATION_SOFT, ProcessType.CORRUGATION_HARD]:
+            thickness = _categorical_codes([order.thickness_mm for order in orders])
+            present = np.array([bool(order.thickness_mm) for order in orders])
+            values = np.array(
+                [float(order.thickness_mm) if order.thickness_mm else 0.0 for order in orders]
+            )
+            diff = np.abs(values[:, None] - values[None, :])
+            
+            return np.where(
+                thickness[:, None] == thickness[None, :], process_factors.get('same_thickness', 0.025),
+                np.where(
+                    present[:, None] & present[None, :],
+                    np.where(
+                        diff <= 0.5,
+                        process_factors.get('diff_thickness_small', 0.04),
+                        process_factors.get('diff_thickness_large', 0.07)
+                    ),
+                    WasteCalculator.DEFAULT_WASTE_FACTOR
+                )
+            )
+        
+        return np.full((len(orders), len(orders)), WasteCalculator.DEFAULT_WASTE_FACTOR)
+
+
+def _categorical_codes(values: List[Any]) -> np.ndarray:
+    """Целочисленные коды категориальных значений (None - отдельная категория)"""
+    codes = {}
+    return np.array([codes.setdefault(value, len(codes)) for value in values], dtype=np.int64)
+
+
+@dataclass
+class CompiledTask:
+    """Скомпилированная задача: плотные индексы и массивы NumPy вместо ORM-объектов
+
+    Заказы и оборудование нумеруются в порядке task.orders и task.equipment.
+    Объект не ссылается на ORM-сущности и может передаваться в другие процессы.
+    """
+    order_ids: np.ndarray                # (N,) id заказов
+    equipment_ids: np.ndarray            # (E,) id оборудования
+    quantity: np.ndarray                 # (N,) объем заказа, кг
+    priority: np.ndarray                 # (N,) приоритет заказа
+    delivery_date: np.ndarray            # (N,) срок поставки (порядковый номер дня)
+    capacity: np.ndarray                 # (E,) производительность, кг/час (0 - не задана)
+    equipment_process: np.ndarray        # (E,) код типа процесса оборудования
+    equipment_available: np.ndarray      # (E,) доступность оборудования
+    processing_minutes: np.ndarray       # (N, E) время производства заказа на оборудовании
+    eligible_by_process: List[np.ndarray]  # код процесса -> индексы доступного оборудования
+    fallback_equipment: int              # первое доступное оборудование (-1 - нет)
+    dispatch_order: np.ndarray           # (N,) порядок запуска: приоритет, срок поставки
+    matrices: TransitionMatrices
+    start_time: datetime
+    planning_horizon_hours: int
+
+    @classmethod
+    def from_task(cls, task: OptimizationTask) -> 'CompiledTask':
+        """Компиляция задачи оптимизации"""
+        orders, equipment = task.orders, task.equipment
+        matrices = WasteCalculator.build_matrices(orders, equipment)
+        
+        quantity = np.array([float(order.quantity_kg) for order in orders], dtype=np.float64)
+        priority = np.array(
+            [order.priority if order.priority is not None else 1 for order in orders], dtype=np.int64
+        )
+        delivery_date = np.array([order.delivery_date.toordinal() for order in orders], dtype=np.int64)
+        
+        capacity = np.array(
+            [float(eq.capacity_per_hour) if eq.capacity_per_hour else 0.0 for eq in equipment],
+            dtype=np.float64
+        )
+        equipment_process = np.array([PROCESS_CODES[eq.process_type] for eq in equipment], dtype=np.int64)
+        equipment_available = np.array([bool(eq.is_available) for eq in equipment], dtype=bool)
+        
+        # Время производства: объем / производительность, либо базовые 60 минут
+        with np.errstate(divide='ignore', invalid='ignore'):
+            processing_minutes = np.where(
+                capacity[None, :] > 0,
+                (quantity[:, None] / np.where(capacity > 0, capacity, 1.0)[None, :]) * 60,
+                60
+            ).astype(np.int64)
+        
+        eligible_by_process, fallback_equipment = cls._eligibility(equipment_process, equipment_available)
+        
+        return cls(
+            order_ids=np.array([order.id for order in orders], dtype=np.int64),
+            equipment_ids=np.array([eq.id for eq in equipment], dtype=np.int64),
+            quantity=quantity,
+            priority=priority,
+            delivery_date=delivery_date,
+            capacity=capacity,
+            equipment_process=equipment_process,
+            equipment_available=equipment_available,
+            processing_minutes=processing_minutes,
+            eligible_by_process=eligible_by_process,
+            fallback_equipment=fallback_equipment,
+            dispatch_order=np.lexsort((delivery_date, priority)),
+            matrices=matrices,
+            start_time=task.start_time,
+            planning_horizon_hours=task.planning_horizon_hours
+        )
+    
+    @staticmethod
+    def _eligibility(equipment_process: np.ndarray,
+                     equipment_available: np.ndarray) -> Tuple[List[np.ndarray], int]:
+        """Доступное оборудование по типам процесса и оборудование по умолчанию"""
+        eligible_by_process = [
+            np.flatnonzero(equipment_available & (equipment_process == code))
+            for code in range(len(PROCESS_CODES))
+        ]
+        available = np.flatnonzero(equipment_available)
+        return eligible_by_process, int(available[0]) if available.size else -1
+    
+    def subset(self, orders: np.ndarray, equipment: np.ndarray) -> 'CompiledTask':
+        """Подзадача из части заказов и оборудования (индексы исходной задачи)"""
+        orders = np.asarray(orders, dtype=np.int64)
+        equipment = np.asarray(equipment, dtype=np.int64)
+        order_ids = self.order_ids[orders]
+        equipment_ids = self.equipment_ids[equipment]
+        
+        matrices = TransitionMatrices(
+            order_index={int(order_id): i for i, order_id in enumerate(order_ids)},
+            equipment_index={int(eq_id): i for i, eq_id in enumerate(equipment_ids)},
+            order_class=self.matrices.order_class[orders],
+            order_process=self.matrices.order_process[orders],
+            class_factors=self.matrices.class_factors,
+            base_setup=self.matrices.base_setup[equipment]
+        )
+        
+        priority = self.priority[orders]
+        delivery_date = self.delivery_date[orders]
+        equipment_process = self.equipment_process[equipment]
+        equipment_available = self.equipment_available[equipment]
+        eligible_by_process, fallback_equipment = self._eligibility(equipment_process, equipment_available)
+        
+        return CompiledTask(
+            order_ids=order_ids,
+            equipment_ids=equipment_ids,
+            quantity=self.quantity[orders],
+            priority=priority,
+            delivery_date=delivery_date,
+            capacity=self.capacity[equipment],
+            equipment_process=equipment_process,
+            equipment_available=equipment_available,
+            processing_minutes=self.processing_minutes[np.ix_(orders, equipment)],
+            eligible_by_process=eligible_by_process,
+            fallback_equipment=fallback_equipment,
+            dispatch_order=np.lexsort((delivery_date, priority)),
+            matrices=matrices,
+            start_time=self.start_time,
+            planning_horizon_hours=self.planning_horizon_hours
+        )
+    
+    def components(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Независимые подзадачи: заказы и оборудование одного типа процесса
+        
+        Заказ назначается только на оборудование своего типа процесса,
+        поэтому подзадачи разных типов не влияют друг на друга.
+        """
+        components = []
+        for code in range(len(PROCESS_CODES)):
+            orders = np.flatnonzero(self.matrices.order_process == code)
+            if orders.size:
+                components.append((orders, np.flatnonzero(self.equipment_process == code)))
+        return components
+    
+    @property
+    def n_orders(self) -> int:
+        return len(self.order_ids)
+    
+    @property
+    def n_equipment(self) -> int:
+        return len(self.equipment_ids)
+    
+    @property
+    def order_index(self) -> Dict[int, int]:
+        return self.matrices.order_index
+    
+    @property
+    def equipment_index(self) -> Dict[int, int]:
+        return self.matrices.equipment_index
+    
+    def compile(self) -> 'CompiledTask':
+        """Задача уже скомпилирована"""
+        return self
+    
+    def eligible_for(self, order: int) -> np.ndarray:
+        """Индексы доступного оборудования, подходящего для заказа"""
+        return self.eligible_by_process[self.matrices.order_process[order]]
+    
+    def evaluate_genomes(self, genomes: np.ndarray, chunk_size: int = 256) -> Tuple[np.ndarray, np.ndarray]:
+        """Векторная оценка популяции геномов
+
+        genomes - матрица (P, N): строка - индивидуум, столбец - индекс оборудования
+        для заказа (-1 - заказ не планируется). Возвращает массивы отходов (кг)
+        и суммарного времени обработки (ч) для каждого индивидуума.
+        """
+        genomes = np.asarray(genomes)  # int32 и int64 - без копии всей популяции
+        n_population = genomes.shape[0]
+        total_waste = np.zeros(n_population, dtype=np.float64)
+        total_time = np.zeros(n_population, dtype=np.float64)
+        
+        if n_population == 0 or self.n_orders == 0:
+            return total_waste, total_time
+        
+        order_class = self.matrices.order_class
+        class_factors = self.matrices.class_factors
+        order_range = np.arange(self.n_orders)
+        # Для коротких целых стабильная сортировка NumPy выполняется поразрядно (за линейное время)
+        lane_dtype = np.int16 if self.n_equipment < np.iinfo(np.int16).max else np.int64
+        
+        # Оцениваем блоками, чтобы ограничить размер временных массивов
+        for start in range(0, n_population, chunk_size):
+            chunk = genomes[start:start + chunk_size]
+            
+            # Оборудование заказов в порядке запуска; стабильная сортировка по оборудованию
+            # группирует заказы по линиям, сохраняя порядок запуска внутри линии
+            lanes = chunk[:, self.dispatch_order].astype(lane_dtype)
+            permutation = np.argsort(lanes, axis=1, kind='stable')
+            lane_sorted = np.take_along_axis(lanes, permutation, axis=1)
+            orders_sorted = self.dispatch_order[permutation]
+            
+            # Переход есть между соседними заказами одной линии
+            prev_orders = orders_sorted[:, :-1]
+            next_orders = orders_sorted[:, 1:]
+            same_lane = (lane_sorted[:, 1:] == lane_sorted[:, :-1]) & (lane_sorted[:, 1:] >= 0)
+            factors = class_factors[order_class[prev_orders], order_class[next_orders]]
+            total_waste[start:start + chunk_size] = np.sum(
+                self.quantity[next_orders] * factors * same_lane, axis=1
+            )
+            
+            # Суммарное время обработки не зависит от последовательности на линии
+            assigned = chunk >= 0
+            minutes = self.processing_minutes[order_range[None, :], np.where(assigned, chunk, 0)]
+            total_time[start:start + chunk_size] = np.sum(minutes * assigned, axis=1) / 60
+        
+        return total_waste, total_time
+    
+    def lane_costs(self, genomes: np.ndarray, lanes_mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Отходы (кг) и время обработки (мин) по линиям оборудования
+
+        Возвращает матрицы (P, E). Если задана маска lanes_mask (P, E), считаются
+        только отмеченные линии индивидуумов, остальные остаются нулевыми.
+        Работа пропорциональна числу заказов на отмеченных линиях.
+        """
+        genomes = np.asarray(genomes)
+        n_population, n_equipment = genomes.shape[0], self.n_equipment
+        lane_waste = np.zeros(n_population * n_equipment, dtype=np.float64)
+        lane_minutes = np.zeros(n_population * n_equipment, dtype=np.float64)
+        
+        if n_population == 0 or self.n_orders == 0 or n_equipment == 0:
+            return lane_waste.reshape(n_population, n_equipment), lane_minutes.reshape(n_population, n_equipment)
+        
+        order_class = self.matrices.order_class
+        class_factors = self.matrices.class_factors
+        # Ключ линии (строка блока, оборудование) укладывается в int16 - сортировка поразрядная
+        chunk_size = max(np.iinfo(np.int16).max // n_equipment - 1, 1)
+        key_dtype = np.int16 if chunk_size > 1 else np.int64
+        
+        for start in range(0, n_population, chunk_size):
+            chunk = genomes[start:start + chunk_size][:, self.dispatch_order]
+            selected = chunk >= 0
+            if lanes_mask is not None:
+                rows = np.arange(start, start + len(chunk))[:, None]
+                selected &= lanes_mask[rows, np.where(selected, chunk, 0)]
+            
+            # Гены отмеченных линий в построчном порядке - внутри индивидуума в порядке запуска
+            rows, ranks = np.nonzero(selected)
+            lanes = chunk[rows, ranks]
+            orders = self.dispatch_order[ranks]
+            keys = (rows * n_equipment + lanes).astype(key_dtype)
+            
+            permutation = np.argsort(keys, kind='stable')
+            keys_sorted = keys[permutation]
+            orders_sorted = orders[permutation]
+            
+            same_lane = keys_sorted[1:] == keys_sorted[:-1]
+            factors = class_factors[order_class[orders_sorted[:-1]], order_class[orders_sorted[1:]]]
+            offset = start * n_equipment
+            size = len(chunk) * n_equipment
+            lane_waste[offset:offset + size] = np.bincount(
+                keys_sorted[1:], weights=self.quantity[orders_sorted[1:]] * factors * same_lane, minlength=size
+            )
+            lane_minutes[offset:offset + size] = np.bincount(
+                keys, weights=self.processing_minutes[orders, lanes], minlength=size
+            )
+        
+        return lane_waste.reshape(n_population, n_equipment), lane_minutes.reshape(n_population, n_equipment)
+
+
+class FitnessCache:
+    """Ограниченный кэш приспособленности с вытеснением давно не использованных (LRU)
+
+    Ключ - 128-битный хэш генома, так что повторяющиеся индивидуумы оцениваются один раз.
+    Значение - приспособленность (отходы, время) или, у ArrayGeneticOptimizer
+    с reuse_lanes, матрица стоимостей линий генома.
+    """
+    
+    def __init__(self, max_size: int = 10000, seed: int = 0):
+        self.max_size = max_size
+        self.seed = seed
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._weights = None
+    
+    def genome_keys(self, genomes: np.ndarray) -> List[bytes]:
+        """Ключи геномов: два независимых случайных линейных хэша по модулю 2^64"""
+        genomes = np.asarray(genomes)
+        if self._weights is None or len(self._weights) != genomes.shape[1]:
+            rng = np.random.default_rng(self.seed)
+            self._weights = rng.integers(
+                0, np.iinfo(np.uint64).max, size=(genomes.shape[1], 2), dtype=np.uint64, endpoint=True
+            )
+        
+        # Блоками строк: копия популяции в uint64 не создается целиком
+        keys = []
+        for start in range(0, len(genomes), 256):
+            hashes = genomes[start:start + 256].astype(np.uint64) @ self._weights
+            keys.extend(row.tobytes() for row in hashes)
+        return keys
+    
+    def get(self, key: bytes) -> Optional[Any]:
+        values = self.entries.get(key)
+        if values is None:
+            self.misses += 1
+            return None
+        
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return values
+    
+    def put(self, key: bytes, values: Any):
+        self.entries[key] = values
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+    
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class GenomeFitness(base.Fitness):
+    """Приспособленность индивидуума: отходы и время обработки, оба минимизируются"""
+    weights = (-1.0, -1.0)
+
+
+class GenomeIndividual(list):
+    """Индивидуум: i-й ген - индекс оборудования i-го заказа задачи
+    
+    Тип определен в модуле, а не через deap.creator: типы creator глобальны
+    и пересоздавались каждым запуском, что ломало одновременные запуски
+    в потоках одного процесса. Классы модуля также передаются в pickle.
+    """
+    
+    def __init__(self, genes=()):
+        super().__init__(genes)
+        self.fitness = GenomeFitness()
 
 
 class GeneticAlgorithmOptimizer:
     """Генетический алгоритм для оптимизации планирования"""
     
-    def __init__(self, population_size=100, generations=50, mutation_rate=0.1, crossover_rate=0.8):
+    def __init__(self, population_size=100, generations=50, mutation_rate=0.1, crossover_rate=0.8, n_workers=1,
+                 fitness_cache_size=10000, time_limit_seconds=None, stagnation_generations=None, stop_signal=None):
         self.population_size = population_size
         self.generations = generations
         self.mutation_rate = mutation_rate
         self.crossover_rate = crossover_rate
+        self.n_workers = n_workers  # > 1 - оценка приспособленности в пуле процессов
+        self.fitness_cache_size = fitness_cache_size  # 0 - без кэша приспособленности
+        self.time_limit_seconds = time_limit_seconds  # None - без ограничения времени
+        self.stagnation_generations = stagnation_generations  # останов без улучшения N поколений
+        self.stop_signal = stop_signal  # SharedDeadline: отмена или стоп задания, в том числе из другого процесса
+        self.individual_type = GenomeIndividual
         self.toolbox = None
+        self.evaluator = None
+        self.fitness_cache = None
+        self.hall_of_fame = None
+        self.deadline = None
+        self.stop_reason = 'completed'
+        self.progress_callback: Optional[ProgressCallback] = None
+        self.timer = PhaseTimer()
+        self.evaluations = 0
     
     def _setup_deap(self):
-
-        if hasattr(creator, "FitnessMin"):
-            del creator.FitnessMin
-        if hasattr(creator, "Individual"):
-            del creator.Individual
-            
-        creator.create("FitnessMin", base.Fitness, weights=(-1.0, -1.0))
-        creator.create("Individual", list, fitness=creator.FitnessMin)
-        
+        """Свой toolbox для запуска; глобальные типы deap.creator не используются"""
         self.toolbox = base.Toolbox()
     
     def create_individual(self, task: OptimizationTask) -> Any:
         """Создание индивидуума (расписания)"""
-        # Индивидуум представляется как список пар (order_id, equipment_id)
+        # Индивидуум - список индексов оборудования, i-й ген соответствует i-му заказу задачи
+        compiled = task.compile()
         individual = []
         
-        for order in task.orders:
+        for i in range(compiled.n_orders):
             # Выбираем подходящее оборудование для заказа
-            suitable_equipment = [
-                eq for eq in task.equipment 
-                if eq.process_type == order.process_type and eq.is_available
-            ]
+            suitable_equipment = compiled.eligible_for(i)
             
-            if suitable_equipment:
-                selected_equipment = random.choice(suitable_equipment)
-                individual.append((order.id, selected_equipment.id))
+            if suitable_equipment.size:
+                individual.append(int(random.choice(suitable_equipment)))
             else:
-                # Если нет подходящего оборудования, берем первое доступное
-                available_equipment = [eq for eq in task.equipment if eq.is_available]
-                if available_equipment:
-                    individual.append((order.id, available_equipment[0].id))
+                # Если нет подходящего оборудования, берем первое доступное (-1 - заказ не планируется)
+                individual.append(compiled.fallback_equipment)
         
-        return creator.Individual(individual)
+        return self.individual_type(individual)
     
-    def evaluate_individual(self, individual: List[Tuple[int, int]], task: OptimizationTask) -> Tuple[float, float]:
+    def evaluate_individual(self, individual: List[int], task: OptimizationTask) -> Tuple[float, float]:
         """Оценка качества индивидуума"""
-        schedule = self.decode_individual(individual, task)
-        
-        total_waste = 0.0
-        total_time = 0.0
-        
-        # Группируем по оборудованию
-        equipment_schedules = {}
-        for item in schedule:
-            if item.equipment_id not in equipment_schedules:
-                equipment_schedules[item.equipment_id] = []
-            equipment_schedules[item.equipment_id].append(item)
-        
-        # Рассчитываем метрики для каждого оборудования
-        for eq_id, eq_schedule in equipment_schedules.items():
-            eq_schedule.sort(key=lambda x: x.scheduled_start)
-            
-            prev_order = None
-            for i, item in enumerate(eq_schedule):
-                order = next(o for o in task.orders if o.id == item.order_id)
-                
-                # Рассчитываем отходы
-                if prev_order:
-                    waste_factor = WasteCalculator.calculate_transition_waste(prev_order, order)
-                    waste = float(order.quantity_kg) * waste_factor
-                    total_waste += waste
-                
-                # Рассчитываем общее время
-                duration = (item.scheduled_end - item.scheduled_start).total_seconds() / 3600
-                total_time += duration
-                
-                prev_order = order
-        
-        return total_waste, total_time
+        compiled = task.compile()
+        plan = self.decode_plan(individual, task)
+        total_time = sum(processing_minutes for *_, processing_minutes in plan) / 60
+        return _plan_waste(compiled, plan), total_time
     
-    def decode_individual(self, individual: List[Tuple[int, int]], task: OptimizationTask) -> List[ScheduleItem]:
-        """Декодирование индивидуума в расписание"""
-        schedule = []
-        equipment_last_time = {}  # Последнее время окончания для каждого оборудования
-        
-        # Сортируем заказы по приоритету и срокам
-        order_equipment_pairs = []
-        for order_id, equipment_id in individual:
-            order = next(o for o in task.orders if o.id == order_id)
-            order_equipment_pairs.append((order, equipment_id))
-        
-        order_equipment_pairs.sort(key=lambda x: (x[0].priority, x[0].delivery_date))
-        
-        for order, equipment_id in order_equipment_pairs:
-            equipment = next(eq for eq in task.equipment if eq.id == equipment_id)
-            
-            # Определяем время начала
-            last_end_time = equipment_last_time.get(equipment_id, task.start_time)
-            
-            # Получаем предыдущий заказ на этом оборудовании
-            prev_orders = [s for s in schedule if s.equipment_id == equipment_id]
-            prev_order = None
-            if prev_orders:
-                last_item = max(prev_orders, key=lambda x: x.scheduled_end)
-                prev_order = next(o for o in task.orders if o.id == last_item.order_id)
-            
-            # Рассчитываем время переналадки
-            setup_time = WasteCalculator.calculate_setup_time(order, equipment, prev_order)
+    def decode_plan(self, individual: List[int], task: OptimizationTask) -> List[Tuple[int, int, int, int, int, int]]:
+        """Декодирование индивидуума в план: минуты от начала планирования, индексы заказов и оборудования
+        
+        Элемент плана: (заказ, оборудование, начало, окончание, переналадка, производство).
+        """
+        compiled = task.compile()
+        matrices = compiled.matrices
+        processing = compiled.processing_minutes
+        plan = []
+        equipment_last_time = {}   # Последнее время окончания для каждого оборудования, мин
+        equipment_last_order = {}  # Последний заказ на каждом оборудовании
+        
+        # Заказы запускаются по приоритету и срокам
+        for order_index in compiled.dispatch_order.tolist():
+            equipment_index = individual[order_index]
+            if equipment_index < 0:
+                continue
             
-            # Рассчитываем время производства
-            if equipment.capacity_per_hour and equipment.capacity_per_hour > 0:
-                processing_minutes = int((float(order.quantity_kg) / float(equipment.capacity_per_hour)) * 60)
-            else:
-                processing_minutes = 60  # Базовое время
+            # Рассчитываем время переналадки и производства
+            prev_index = equipment_last_order.get(equipment_index, -1)
+            setup_time = matrices.setup_time(equipment_index, order_index, prev_index)
+            processing_minutes = int(processing[order_index, equipment_index])
             
             # Определяем временные рамки
-            scheduled_start = last_end_time + timedelta(minutes=setup_time)
-            scheduled_end = scheduled_start + timedelta(minutes=processing_minutes)
-            
-            schedule_item = ScheduleItem(
-                order_id=order.id,
-                equipment_id=equipment_id,
-                scheduled_start=scheduled_start,
-                scheduled_end=scheduled_end,
-                setup_time_minutes=setup_time,
-                processing_time_minutes=processing_minutes
-            )
+            scheduled_start = equipment_last_time.get(equipment_index, 0) + setup_time
+            scheduled_end = scheduled_start + processing_minutes
             
-            schedule.append(schedule_item)
-            equipment_last_time[equipment_id] = scheduled_end
+            plan.append((order_index, equipment_index, scheduled_start, scheduled_end, setup_time, processing_minutes))
+            equipment_last_time[equipment_index] = scheduled_end
+            equipment_last_order[equipment_index] = order_index
         
-        return schedule
+        return plan
+    
+    def decode_individual(self, individual: List[int], task: OptimizationTask) -> List[ScheduleItem]:
+        """Декодирование индивидуума в расписание"""
+        return _schedule_items(task.compile(), self.decode_plan(individual, task))
     
     def crossover(self, ind1: Any, ind2: Any) -> Tuple[Any, Any]:
         """Операция скрещивания"""
-        if len(ind1) != len(ind2):
+        if len(ind1) != len(ind2) or len(ind1) < 2:
             return ind1, ind2
         
         # Точка скрещивания
         cx_point = random.randint(1, len(ind1) - 1)
         
         # Создаем потомков
-        offspring1 = creator.Individual(ind1[:cx_point] + ind2[cx_point:])
-        offspring2 = creator.Individual(ind2[:cx_point] + ind1[cx_point:])
+        offspring1 = self.individual_type(ind1[:cx_point] + ind2[cx_point:])
+        offspring2 = self.individual_type(ind2[:cx_point] + ind1[cx_point:])
         
         return offspring1, offspring2
     
     def mutate(self, individual: Any, task: OptimizationTask) -> Tuple[Any]:
         """Операция мутации"""
-        mutated = creator.Individual(individual[:])
+        compiled = task.compile()
+        mutated = self.individual_type(individual[:])
         
         for i in range(len(mutated)):
             if random.random() < self.mutation_rate:
-                order_id, _ = mutated[i]
-                order = next(o for o in task.orders if o.id == order_id)
-                
                 # Выбираем новое подходящее оборудование
-                suitable_equipment = [
-                    eq for eq in task.equipment 
-                    if eq.process_type == order.process_type and eq.is_available
-                ]
+                suitable_equipment = compiled.eligible_for(i)
                 
-                if suitable_equipment:
-                    new_equipment = random.choice(suitable_equipment)
-                    mutated[i] = (order_id, new_equipment.id)
+                if suitable_equipment.size:
+                    mutated[i] = int(random.choice(suitable_equipment))
         
         return mutated,
     
-    def optimize(self, task: OptimizationTask) -> OptimizationResult:
-        """Основной метод оптимизации"""
-        start_time = time.time()
+    def clone_individual(self, individual: Any) -> Any:
+        """Копирование индивидуума (гены - целые числа, глубокое копирование не нужно)"""
+        clone = self.individual_type(individual)
+        if individual.fitness.valid:
+            clone.fitness.values = individual.fitness.values
+        return clone
+    
+    def population_from_genomes(self, genomes: np.ndarray, fitness: np.ndarray) -> List[Any]:
+        """Популяция DEAP из матрицы геномов и массива приспособленности (P, 2)"""
+        population = []
+        for genome, values in zip(genomes.tolist(), fitness.tolist()):
+            individual = self.individual_type(genome)
+            individual.fitness.values = tuple(values)
+            population.append(individual)
+        return population
+    
+    @staticmethod
+    def population_to_genomes(population: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Матрица геномов (int32) и массив приспособленности оцененной популяции"""
+        genomes = np.array(population, dtype=np.int32)
+        fitness = np.array([ind.fitness.values for ind in population], dtype=np.float64)
+        return genomes, fitness
+    
+    def evaluate_population(self, individuals: List[Any], task: OptimizationTask):
+        """Пакетная оценка индивидуумов с записью приспособленности"""
+        if not individuals:
+            return
+        
+        self.evaluations += len(individuals)
+        with self.timer.phase('evaluate'):
+            self._evaluate_population(individuals, task)
+    
+    def _evaluate_population(self, individuals: List[Any], task: OptimizationTask):
+        genomes = np.array(individuals, dtype=np.int64)
+        if self.fitness_cache is None:
+            self._evaluate_genomes(individuals, genomes, task)
+            return
+        
+        # Одинаковые геномы оцениваются один раз: из кэша или одним представителем в пакете
+        pending = {}
+        for row, (ind, key) in enumerate(zip(individuals, self.fitness_cache.genome_keys(genomes))):
+            if key in pending:
+                pending[key].append(row)
+                self.fitness_cache.hits += 1
+                continue
+            
+            values = self.fitness_cache.get(key)
+            if values is None:
+                pending[key] = [row]
+            else:
+                ind.fitness.values = values
+        
+        if not pending:
+            return
         
-        # Настройка DEAP
+        representatives = [rows[0] for rows in pending.values()]
+        self._evaluate_genomes([individuals[row] for row in representatives], genomes[representatives], task)
+        
+        for key, rows in pending.items():
+            values = individuals[rows[0]].fitness.values
+            self.fitness_cache.put(key, values)
+            for row in rows[1:]:
+                individuals[row].fitness.values = values
+    
+    def _evaluate_genomes(self, individuals: List[Any], genomes: np.ndarray, task: OptimizationTask):
+        """Пакетная оценка индивидуумов: в пуле процессов или в текущем процессе"""
+        evaluator = self.evaluator or task.compile()
+        total_waste, total_time = evaluator.evaluate_genomes(genomes)
+        
+        for ind, waste, processing_time in zip(individuals, total_waste.tolist(), total_time.tolist()):
+            ind.fitness.values = (waste, processing_time)
+    
+    def _evolve(self, population: List[Any], task: OptimizationTask, stats: tools.Statistics) -> Tuple[List[Any], tools.Logbook]:
+        """Эволюционный цикл (как algorithms.eaSimple) с пакетной оценкой поколения"""
+        logbook = tools.Logbook()
+        logbook.header = ['gen', 'nevals'] + stats.fields
+        
+        invalid_individuals = [ind for ind in population if not ind.fitness.valid]
+        self.evaluate_population(invalid_individuals, task)
+        logbook.record(gen=0, nevals=len(invalid_individuals), **stats.compile(population))
+        
+        # Лучшее найденное решение сохраняется, даже если потом выпадет из популяции
+        self.hall_of_fame = tools.HallOfFame(1)
+        self.hall_of_fame.update(population)
+        last_improvement = 0
+        self._report_generation(logbook, task)
+        
+        for gen in range(1, self.generations + 1):
+            if self._deadline_reached():
+                self.stop_reason = 'time_limit'
+                break
+            
+            # Селекция и изменчивость
+            with self.timer.phase('selection'):
+                offspring = self.toolbox.select(population, len(population))
+            with self.timer.phase('variation'):
+                offspring = algorithms.varAnd(offspring, self.toolbox, self.crossover_rate, self.mutation_rate)
+            
+            # Оцениваем только изменившихся индивидуумов, всех сразу
+            invalid_individuals = [ind for ind in offspring if not ind.fitness.valid]
+            self.evaluate_population(invalid_individuals, task)
+            
+            population[:] = offspring
+            logbook.record(gen=gen, nevals=len(invalid_individuals), **stats.compile(population))
+            
+            best_fitness = self.hall_of_fame[0].fitness.wvalues
+            self.hall_of_fame.update(population)
+            if self.hall_of_fame[0].fitness.wvalues > best_fitness:
+                last_improvement = gen
+            elif self.stagnation_generations and gen - last_improvement >= self.stagnation_generations:
+                self.stop_reason = 'stagnation'
+                break
+            self._report_generation(logbook, task)
+        
+        return population, logbook
+    
+    def _report_generation(self, logbook: tools.Logbook, task: OptimizationTask):
+        """Событие прогресса по последней записи журнала поколений"""
+        if self.progress_callback is None:
+            return
+        record = logbook[-1]
+        best = self.hall_of_fame[0]
+        self.progress_callback({
+            'phase': 'genetic',
+            'generation': record['gen'],
+            'generations': self.generations,
+            'progress': record['gen'] / self.generations if self.generations else 1.0,
+            'avg_waste': float(record['avg'][0]),
+            'min_waste': float(record['min'][0]),
+            'avg_time': float(record['avg'][1]),
+            'min_time': float(record['min'][1]),
+            'best_waste': float(best.fitness.values[0])
+        }, lambda: self.decode_individual(best, task))
+    
+    def _deadline_reached(self) -> bool:
+        """Истек бюджет времени запуска или наступил срок stop_signal"""
+        if self.stop_signal is not None and self.stop_signal.reached():
+            return True
+        return self.deadline is not None and time.time() >= self.deadline
+    
+    def _start_budget(self, start_time: float):
+        """Начало отсчета бюджета времени запуска"""
+        self.deadline = start_time + self.time_limit_seconds if self.time_limit_seconds else None
+        self.stop_reason = 'completed'
+        self.timer = PhaseTimer()
+        self.evaluations = 0
+    
+    def _register_operators(self, task: OptimizationTask):
+        """Настройка DEAP и регистрация операторов для задачи"""
         self._setup_deap()
         
-        # Настройка инструментов DEAP
         self.toolbox.register("individual", self.create_individual, task)
         self.toolbox.register("population", tools.initRepeat, list, self.toolbox.individual)
         self.toolbox.register("evaluate", self.evaluate_individual, task=task)
         self.toolbox.register("mate", self.crossover)
         self.toolbox.register("mutate", self.mutate, task=task)
         self.toolbox.register("select", tools.selTournament, tournsize=3)
+        self.toolbox.register("clone", self.clone_individual)
+    
+    @staticmethod
+    def _create_stats() -> tools.Statistics:
+        """Статистика поколений"""
+        stats = tools.Statistics(lambda ind: ind.fitness.values)
+        stats.register("avg", np.mean, axis=0)
+        stats.register("min", np.min, axis=0)
+        return stats
+    
+    def optimize(self, task: OptimizationTask) -> OptimizationResult:
+        """Основной метод оптимизации"""
+        start_time = time.time()
+        self._start_budget(start_time)
         
-        # Создание начальной популяции
-        population = self.toolbox.population(n=self.population_size)
+        # Компиляция задачи выполняется один раз для всего запуска
+        with self.timer.phase('compile'):
+            task.compile()
+        self.fitness_cache = FitnessCache(self.fitness_cache_size) if self.fitness_cache_size else None
+        
+        # Настройка инструментов DEAP
+        self._register_operators(task)
         
-        # Оценка начальной популяции
-        fitnesses = list(map(self.toolbox.evaluate, population))
-        for ind, fit in zip(population, fitnesses):
-            ind.fitness.values = fit
+        # Создание начальной популяции
+        with self.timer.phase('initialization'):
+            population = self.toolbox.population(n=self.population_size)
         
         # Статистика
-        stats = tools.Statistics(lambda ind: ind.fitness.values)
-        stats.register("avg", np.mean, axis=0)
-        stats.register("min", np.min, axis=0)
+        stats = self._create_stats()
         
         # Запуск алгоритма
-        population, logbook = algorithms.eaSimple(
-            population, self.toolbox,
-            cxpb=self.crossover_rate,
-            mutpb=self.mutation_rate,
-            ngen=self.generations,
-            stats=stats,
-            verbose=False
-        )
+        if self.n_workers > 1:
+            from src.optimization.parallel import ParallelEvaluator
+            
+            with ParallelEvaluator(task.compile(), self.n_workers) as self.evaluator:
+                try:
+                    population, logbook = self._evolve(population, task, stats)
+                finally:
+                    self.evaluator = None
+        else:
+            population, logbook = self._evolve(population, task, stats)
         
-        # Получение лучшего решения
-        best_individual = tools.selBest(population, 1)[0]
-        best_schedule = self.decode_individual(best_individual, task)
+        # Получение лучшего найденного решения
+        best_individual = self.hall_of_fame[0]
         
-        # Расчет метрик
-        total_waste, total_time = self.evaluate_individual(best_individual, task)
+        return _instrument(self._create_result(best_individual, task, start_time), self.timer, self.evaluations)
+    
+    def _create_result(self, best_individual: Any, task: OptimizationTask, start_time: float) -> OptimizationResult:
+        """Создание результата оптимизации по лучшему индивидууму"""
+        with self.timer.phase('decode'):
+            plan = self.decode_plan(best_individual, task)
         
-        # Расчет загрузки оборудования
-        equipment_utilization = {}
-        equipment_schedules = {}
-        
-        for item in best_schedule:
-            if item.equipment_id not in equipment_schedules:
-                equipment_schedules[item.equipment_id] = []
-            equipment_schedules[item.equipment_id].append(item)
-        
-        for eq_id, eq_schedule in equipment_schedules.items():
-            if eq_schedule:
-                total_working_time = sum(
-                    (item.scheduled_end - item.scheduled_start).total_seconds() / 3600
-                    for item in eq_schedule
-                )
-                planning_horizon = task.planning_horizon_hours
-                equipment_utilization[eq_id] = min(total_working_time / planning_horizon, 1.0)
-            else:
-                equipment_utilization[eq_id] = 0.0
+        with self.timer.phase('result'):
+            return self._build_result(plan, task, start_time)
+    
+    def _build_result(self, plan: List[Tuple[int, int, int, int, int, int]], task: OptimizationTask,
+                      start_time: float) -> OptimizationResult:
+        """Расписание, метрики и загрузка оборудования по плану лучшего индивидуума"""
+        compiled = task.compile()
+        result = _plan_result(compiled, plan, _plan_waste(compiled, plan), start_time)
+        result.fitness_cache_hits = self.fitness_cache.hits if self.fitness_cache else 0
+        result.fitness_cache_misses = self.fitness_cache.misses if self.fitness_cache else 0
+        result.stop_reason = self.stop_reason
+        return result
+
+
+class IslandGeneticOptimizer(GeneticAlgorithmOptimizer):
+    """Островная модель генетического алгоритма
+
+    Несколько независимых популяций развиваются в отдельных процессах;
+    каждые migration_interval поколений лучшие индивидуумы острова замещают
+    худших на следующем острове (кольцевая топология).
+    """
+    
+    def __init__(self, population_size=100, generations=50, mutation_rate=0.1, crossover_rate=0.8,
+                 n_islands=4, migration_interval=10, migration_size=2, n_workers=None,
+                 fitness_cache_size=10000, time_limit_seconds=None, stagnation_generations=None, stop_signal=None):
+        super().__init__(population_size, generations, mutation_rate, crossover_rate,
+                         fitness_cache_size=fitness_cache_size, time_limit_seconds=time_limit_seconds,
+                         stagnation_generations=stagnation_generations, stop_signal=stop_signal)
+        self.n_islands = n_islands
+        self.migration_interval = migration_interval
+        self.migration_size = migration_size
+        # Процессов не больше, чем островов и ядер
+        self.island_workers = n_workers or min(n_islands, os.cpu_count() or 1)
+    
+    def optimize(self, task: OptimizationTask) -> OptimizationResult:
+        """Оптимизация островной моделью"""
+        from src.optimization.parallel import SharedTaskPool, evolve_island
         
-        # Расчет makespan
-        if best_schedule:
-            makespan = max(item.scheduled_end for item in best_schedule) - task.start_time
-            makespan_hours = makespan.total_seconds() / 3600
+        start_time = time.time()
+        self._start_budget(start_time)
+        with self.timer.phase('compile'):
+            compiled = task.compile()
+        self._register_operators(task)
+        self.fitness_cache = FitnessCache(self.fitness_cache_size) if self.fitness_cache_size else None
+        
+        # Начальные популяции островов оцениваются одним пакетом
+        with self.timer.phase('initialization'):
+            populations = [self.toolbox.population(n=self.population_size) for _ in range(self.n_islands)]
+        self.evaluate_population([ind for population in populations for ind in population], task)
+        islands = [self.population_to_genomes(population) for population in populations]
+        self.hall_of_fame = tools.HallOfFame(1)
+        self.hall_of_fame.update([ind for population in populations for ind in population])
+        
+        params = {
+            'population_size': self.population_size,
+            'mutation_rate': self.mutation_rate,
+            'crossover_rate': self.crossover_rate,
+            'fitness_cache_size': self.fitness_cache_size
+        }
+        
+        # Острова подключаются к stop_signal по имени и прерывают эпоху после текущего поколения
+        stop_name = self.stop_signal.name if self.stop_signal is not None else None
+        
+        generations_done = 0
+        last_improvement = 0
+        with SharedTaskPool(compiled, self.island_workers) as pool:
+            while generations_done < self.generations:
+                if self._deadline_reached():
+                    self.stop_reason = 'time_limit'
+                    break
+                
+                # Острова получают остаток бюджета времени; застой оценивается здесь, по эпохам
+                epoch = min(self.migration_interval, self.generations - generations_done)
+                epoch_params = dict(params, generations=epoch)
+                if self.deadline is not None:
+                    epoch_params['time_limit_seconds'] = max(self.deadline - time.time(), 1e-3)
+                
+                epoch_start = time.perf_counter()
+                futures = [
+                    pool.submit(
+                        evolve_island, genomes, fitness, epoch_params, random.getrandbits(32), stop_name
+                    )
+                    for genomes, fitness in islands
+                ]
+                islands = []
+                for future in futures:
+                    genomes, fitness, (hits, misses, evaluations), stop_reason = future.result()
+                    islands.append((genomes, fitness))
+                    # Острова прерывают эпоху по бюджету времени или stop_signal
+                    if stop_reason == 'time_limit':
+                        self.stop_reason = stop_reason
+                    # Кэши островов живут в рабочих процессах, счетчики суммируются
+                    if self.fitness_cache is not None:
+                        self.fitness_cache.hits += hits
+                        self.fitness_cache.misses += misses
+                    self.evaluations += evaluations
+                self.timer.add('evolution', time.perf_counter() - epoch_start)
+                generations_done += epoch
+                
+                best_fitness = self.hall_of_fame[0].fitness.wvalues
+                for genomes, fitness in islands:
+                    self.hall_of_fame.update(self.population_from_genomes(genomes, fitness))
+                if self.hall_of_fame[0].fitness.wvalues > best_fitness:
+                    last_improvement = generations_done
+                elif self.stagnation_generations and generations_done - last_improvement >= self.stagnation_generations:
+                    self.stop_reason = 'stagnation'
+                    break
+                
+                if self.progress_callback is not None:
+                    fitness = np.concatenate([fitness for _, fitness in islands])
+                    best = self.hall_of_fame[0]
+                    self.progress_callback({
+                        'phase': 'island',
+                        'generation': generations_done,
+                        'generations': self.generations,
+                        'progress': generations_done / self.generations,
+                        'avg_waste': float(fitness[:, 0].mean()),
+                        'min_waste': float(fitness[:, 0].min()),
+                        'avg_time': float(fitness[:, 1].mean()),
+                        'min_time': float(fitness[:, 1].min()),
+                        'best_waste': float(best.fitness.values[0])
+                    }, lambda: self.decode_individual(best, task))
+                
+                if self.stop_reason == 'time_limit':
+                    break
+                if generations_done < self.generations:
+                    with self.timer.phase('migration'):
+                        islands = self._migrate(islands)
+        
+        # Лучший индивидуум по всем островам
+        return _instrument(self._create_result(self.hall_of_fame[0], task, start_time), self.timer, self.evaluations)
+    
+    def _migrate(self, islands: List[Tuple[np.ndarray, np.ndarray]]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Миграция по кольцу: лучшие особи острова замещают худших на следующем"""
+        migration_size = min(self.migration_size, min(len(genomes) for genomes, _ in islands))
+        if migration_size <= 0 or len(islands) < 2:
+            return islands
+        
+        # Ранжирование лексикографическое, как у DEAP: сначала отходы, затем время
+        rankings = [np.lexsort((fitness[:, 1], fitness[:, 0])) for _, fitness in islands]
+        migrants = [
+            (genomes[ranking[:migration_size]].copy(), fitness[ranking[:migration_size]].copy())
+            for (genomes, fitness), ranking in zip(islands, rankings)
+        ]
+        
+        migrated = []
+        for i, (genomes, fitness) in enumerate(islands):
+            genomes, fitness = genomes.copy(), fitness.copy()
+            worst = rankings[i][-migration_size:]
+            source_genomes, source_fitness = migrants[i - 1]
+            genomes[worst] = source_genomes
+            fitness[worst] = source_fitness
+            migrated.append((genomes, fitness))
+        
+        return migrated
+
+
+class ArrayGeneticOptimizer(GeneticAlgorithmOptimizer):
+    """Генетический алгоритм на матрице геномов NumPy для больших популяций и портфелей
+    
+    Популяция - заранее выделенная матрица int32 (строка - индивидуум, столбец -
+    индекс оборудования заказа), родители и потомки - два буфера, меняющиеся
+    местами каждое поколение. Турнирная селекция, одноточечное скрещивание и
+    мутация выполняются векторно по всей популяции, как algorithms.varAnd
+    у GeneticAlgorithmOptimizer, но без объектов DEAP и клонирования списков.
+    
+    При reuse_lanes индивидуум хранит отходы и время по линиям оборудования.
+    Потомок наследует их от победителя турнира, из которого получен, и
+    пересчитываются только линии, на которые пришли или с которых ушли
+    измененные гены (CompiledTask.lane_costs). По умолчанию (None) так
+    оцениваются только без кэша приспособленности: кэш уже отвечает за
+    потомков, мало отличающихся от родителей, а у его промахов меняется
+    большая часть линий, и пересчет по линиям медленнее пакетного ядра.
+    """
+    
+    def __init__(self, population_size=100, generations=50, mutation_rate=0.1, crossover_rate=0.8, n_workers=1,
+                 fitness_cache_size=10000, time_limit_seconds=None, stagnation_generations=None,
+                 tournament_size=3, seed=None, stop_signal=None, reuse_lanes=None):
+        super().__init__(population_size, generations, mutation_rate, crossover_rate, n_workers,
+                         fitness_cache_size=fitness_cache_size, time_limit_seconds=time_limit_seconds,
+                         stagnation_generations=stagnation_generations, stop_signal=stop_signal)
+        self.tournament_size = tournament_size
+        self.seed = seed  # None - случайная инициализация генератора
+        self.reuse_lanes = reuse_lanes  # пересчет только изменившихся линий; None - если кэш отключен
+        self.rng = None
+        self.options = None       # (процессы, K) индексы подходящего оборудования по типам процесса
+        self.gene_process = None  # (N,) код типа процесса заказа
+        self.gene_choices = None  # (N,) число подходящих линий заказа
+        self.best_genome = None
+        self.best_fitness = None
+    
+    def optimize(self, task: OptimizationTask) -> OptimizationResult:
+        """Основной метод оптимизации"""
+        start_time = time.time()
+        self._start_budget(start_time)
+        with self.timer.phase('compile'):
+            compiled = task.compile()
+        self.rng = np.random.default_rng(self.seed)
+        self.fitness_cache = FitnessCache(self.fitness_cache_size) if self.fitness_cache_size else None
+        self._init_genes(compiled)
+        
+        if self.n_workers > 1:
+            from src.optimization.parallel import ParallelEvaluator
+            
+            with ParallelEvaluator(compiled, self.n_workers) as self.evaluator:
+                try:
+                    self._evolve_arrays(task)
+                finally:
+                    self.evaluator = None
         else:
-            makespan_hours = 0.0
+            self._evolve_arrays(task)
         
-        optimization_time = time.time() - start_time
+        return _instrument(
+            self._create_result(self.best_genome.tolist(), task, start_time), self.timer, self.evaluations
+        )
+    
+    def _init_genes(self, compiled: CompiledTask):
+        """Таблица допустимых значений генов по типам процесса"""
+        eligible = compiled.eligible_by_process
+        width = max([len(equipment) for equipment in eligible] + [1])
+        # Заказ без подходящего оборудования получает оборудование по умолчанию, как в create_individual
+        self.options = np.full((len(eligible), width), compiled.fallback_equipment, dtype=np.int32)
+        for code, equipment in enumerate(eligible):
+            self.options[code, :len(equipment)] = equipment
+        
+        self.gene_process = compiled.matrices.order_process
+        self.gene_choices = np.array([len(equipment) for equipment in eligible], dtype=np.int64)[self.gene_process]
+    
+    def _random_genes(self, orders: np.ndarray, shape) -> np.ndarray:
+        """Случайное подходящее оборудование для заказов (массив orders задает столбцы)"""
+        choice = self.rng.integers(0, np.maximum(self.gene_choices[orders], 1), size=shape)
+        return self.options[self.gene_process[orders], choice]
+    
+    def _evolve_arrays(self, task: OptimizationTask):
+        """Эволюционный цикл на двух буферах популяции"""
+        compiled = task.compile()
+        n_population, n_orders = self.population_size, compiled.n_orders
+        order_range = np.arange(n_orders)
+        
+        parents = np.empty((n_population, n_orders), dtype=np.int32)
+        offspring = np.empty_like(parents)
+        parent_fitness = np.empty((n_population, 2), dtype=np.float64)
+        offspring_fitness = np.empty_like(parent_fitness)
+        # Отходы (кг) и время (мин) по линиям; NaN - линия не оценивалась
+        parent_lanes = offspring_lanes = None
+        reuse_lanes = not self.fitness_cache_size if self.reuse_lanes is None else self.reuse_lanes
+        # Пул процессов оценивает геномы целиком
+        if reuse_lanes and self.evaluator is None:
+            parent_lanes = np.full((n_population, 2, compiled.n_equipment), np.nan)
+            offspring_lanes = np.empty_like(parent_lanes)
+        
+        # Буферы скрещивания пар (первый и второй родитель - соседние строки)
+        n_pairs = n_population // 2
+        swap_mask = np.empty((n_pairs, n_orders), dtype=bool)
+        swap_buffer = np.empty((n_pairs, n_orders), dtype=np.int32)
+        changed = np.empty(n_population, dtype=bool)
+        
+        with self.timer.phase('initialization'):
+            for start in range(0, n_population, 256):
+                rows = parents[start:start + 256]
+                rows[:] = self._random_genes(order_range, rows.shape)
+        self._evaluate_rows(parents, parent_fitness, np.arange(n_population), task, parent_lanes)
+        
+        self.best_genome = np.empty(n_orders, dtype=np.int32)
+        self.best_fitness = None
+        self._update_best(parents, parent_fitness)
+        last_improvement = 0
+        self._report_arrays(0, parent_fitness, task)
+        
+        for gen in range(1, self.generations + 1):
+            if self._deadline_reached():
+                self.stop_reason = 'time_limit'
+                break
+            
+            with self.timer.phase('selection'):
+                winners = self._tournament(parent_fitness)
+                np.take(parents, winners, axis=0, out=offspring)
+                np.take(parent_fitness, winners, axis=0, out=offspring_fitness)
+                if parent_lanes is not None:
+                    np.take(parent_lanes, winners, axis=0, out=offspring_lanes)
+            
+            with self.timer.phase('variation'):
+                changed[:] = False
+                first, second = offspring[0:2 * n_pairs:2], offspring[1:2 * n_pairs:2]
+                mated = self.rng.random(n_pairs) < self.crossover_rate
+                if n_orders >= 2 and mated.any():
+                    cut = self.rng.integers(1, n_orders, size=n_pairs)
+                    np.greater_equal(order_range, cut[:, None], out=swap_mask)
+                    swap_mask &= mated[:, None]
+                    np.copyto(swap_buffer, first, where=swap_mask)
+                    np.copyto(first, second, where=swap_mask)
+                    np.copyto(second, swap_buffer, where=swap_mask)
+                    changed[0:2 * n_pairs:2] |= mated
+                    changed[1:2 * n_pairs:2] |= mated
+                
+                # Мутирует доля mutation_rate индивидуумов, в каждом - в среднем такая же доля генов
+                mutants = np.flatnonzero(self.rng.random(n_population) < self.mutation_rate)
+                n_genes = self.rng.binomial(n_orders, self.mutation_rate, size=len(mutants))
+                rows = np.repeat(mutants, n_genes)
+                orders = self.rng.integers(0, n_orders, size=rows.size)
+                offspring[rows, orders] = self._random_genes(orders, orders.shape)
+                changed[mutants[n_genes > 0]] = True
+            
+            # Оцениваются только измененные потомки; до обмена буферов parents[winners] - их родители
+            rows = np.flatnonzero(changed)
+            reference = parents[winners[rows]] if offspring_lanes is not None else None
+            self._evaluate_rows(offspring, offspring_fitness, rows, task, offspring_lanes, reference)
+            parents, offspring = offspring, parents
+            parent_fitness, offspring_fitness = offspring_fitness, parent_fitness
+            parent_lanes, offspring_lanes = offspring_lanes, parent_lanes
+            
+            if self._update_best(parents, parent_fitness):
+                last_improvement = gen
+            elif self.stagnation_generations and gen - last_improvement >= self.stagnation_generations:
+                self.stop_reason = 'stagnation'
+                break
+            self._report_arrays(gen, parent_fitness, task)
+    
+    def _tournament(self, fitness: np.ndarray) -> np.ndarray:
+        """Турнирная селекция: индексы победителей для всей популяции"""
+        n_population = len(fitness)
+        # Ранг - лексикографическое сравнение (отходы, время), как у приспособленности DEAP
+        rank = np.empty(n_population, dtype=np.int64)
+        rank[np.lexsort((fitness[:, 1], fitness[:, 0]))] = np.arange(n_population)
+        candidates = self.rng.integers(0, n_population, size=(n_population, self.tournament_size))
+        return candidates[np.arange(n_population), np.argmin(rank[candidates], axis=1)]
+    
+    def _evaluate_rows(self, genomes: np.ndarray, fitness: np.ndarray, rows: np.ndarray, task: OptimizationTask,
+                       lanes: Optional[np.ndarray] = None, reference: Optional[np.ndarray] = None):
+        """Оценка строк rows матрицы геномов с записью приспособленности в fitness
+        
+        lanes - стоимости линий (P, 2, E), унаследованные строками от родителей,
+        reference - геномы этих родителей по строкам rows (None - родителей нет).
+        Без lanes строки оцениваются пакетным ядром целиком.
+        """
+        if not rows.size:
+            return
         
-        return OptimizationResult(
-            schedule=best_schedule,
-            total_waste_kg=Decimal(str(total_waste)),
-            total_processing_time_hours=Decimal(str(total_time)),
-            equipment_utilization=equipment_utilization,
-            waste_reduction_percentage=0.0,  # Будет рассчитано позже
-            makespan_hours=makespan_hours,
-            optimization_time_seconds=optimization_time
+        self.evaluations += len(rows)
+        with self.timer.phase('evaluate'):
+            evaluator = self.evaluator or task.compile()
+            if lanes is not None:
+                self._evaluate_lanes(genomes, fitness, rows, evaluator, lanes, reference)
+                return
+            
+            if self.fitness_cache is None:
+                total_waste, total_time = evaluator.evaluate_genomes(genomes[rows])
+                fitness[rows, 0] = total_waste
+                fitness[rows, 1] = total_time
+                return
+            
+            # Одинаковые геномы оцениваются один раз: из кэша или одним представителем в пакете
+            pending = {}
+            for row, key in zip(rows.tolist(), self.fitness_cache.genome_keys(genomes[rows])):
+                if key in pending:
+                    pending[key].append(row)
+                    self.fitness_cache.hits += 1
+                    continue
+                
+                values = self.fitness_cache.get(key)
+                if values is None:
+                    pending[key] = [row]
+                else:
+                    fitness[row] = values
+            
+            if not pending:
+                return
+            
+            total_waste, total_time = evaluator.evaluate_genomes(genomes[[group[0] for group in pending.values()]])
+            for (key, group), values in zip(pending.items(), zip(total_waste.tolist(), total_time.tolist())):
+                self.fitness_cache.put(key, values)
+                fitness[group] = values
+    
+    def _evaluate_lanes(self, genomes: np.ndarray, fitness: np.ndarray, rows: np.ndarray, evaluator: CompiledTask,
+                        lanes: np.ndarray, reference: Optional[np.ndarray]):
+        """Оценка по линиям: пересчитываются только линии, измененные относительно родителя
+        
+        Кэш приспособленности хранит стоимости всех линий генома, поэтому
+        геном из кэша не теряет их для своих потомков.
+        """
+        changed = self._changed_lanes(genomes[rows], reference, lanes[rows])
+        positions = np.arange(len(rows))
+        pending = {}
+        if self.fitness_cache is not None:
+            # Одинаковые геномы: стоимости линий из кэша или от одного представителя в пакете
+            leaders = []
+            for position, (row, key) in enumerate(zip(rows.tolist(), self.fitness_cache.genome_keys(genomes[rows]))):
+                if key in pending:
+                    pending[key].append(row)
+                    self.fitness_cache.hits += 1
+                    continue
+                
+                values = self.fitness_cache.get(key)
+                if values is None:
+                    pending[key] = [row]
+                    leaders.append(position)
+                else:
+                    lanes[row] = values
+            positions = np.array(leaders, dtype=np.int64)
+        
+        if positions.size:
+            computed = rows[positions]
+            lane_waste, lane_minutes = evaluator.lane_costs(genomes[computed], changed[positions])
+            selected = lanes[computed]
+            np.copyto(selected[:, 0], lane_waste, where=changed[positions])
+            np.copyto(selected[:, 1], lane_minutes, where=changed[positions])
+            lanes[computed] = selected
+        
+        for key, group in pending.items():
+            self.fitness_cache.put(key, lanes[group[0]].copy())
+            lanes[group[1:]] = lanes[group[0]]
+        
+        fitness[rows, 0] = lanes[rows, 0].sum(axis=1)
+        fitness[rows, 1] = lanes[rows, 1].sum(axis=1) / 60
+    
+    def _changed_lanes(self, genomes: np.ndarray, reference: Optional[np.ndarray], inherited: np.ndarray) -> np.ndarray:
+        """Маска (R, E) линий, состав которых отличается от родительского или не оценивался"""
+        changed = np.isnan(inherited[:, 0])
+        if reference is None:
+            return changed
+        
+        # Измененный ген меняет состав и линии, с которой ушел заказ, и линии, на которую пришел
+        rows, orders = np.nonzero(genomes != reference)
+        for genes in (genomes, reference):
+            equipment = genes[rows, orders]
+            assigned = equipment >= 0
+            changed[rows[assigned], equipment[assigned]] = True
+        return changed
+    
+    def _update_best(self, genomes: np.ndarray, fitness: np.ndarray) -> bool:
+        """Обновление лучшего найденного решения; True - если оно улучшилось"""
+        best = int(np.lexsort((fitness[:, 1], fitness[:, 0]))[0])
+        values = (float(fitness[best, 0]), float(fitness[best, 1]))
+        if self.best_fitness is not None and values >= self.best_fitness:
+            return False
+        self.best_fitness = values
+        np.copyto(self.best_genome, genomes[best])
+        return True
+    
+    def _report_arrays(self, generation: int, fitness: np.ndarray, task: OptimizationTask):
+        """Событие прогресса поколения"""
+        if self.progress_callback is None:
+            return
+        best = self.best_genome.tolist()
+        self.progress_callback({
+            'phase': 'genetic',
+            'generation': generation,
+            'generations': self.generations,
+            'progress': generation / self.generations if self.generations else 1.0,
+            'avg_waste': float(fitness[:, 0].mean()),
+            'min_waste': float(fitness[:, 0].min()),
+            'avg_time': float(fitness[:, 1].mean()),
+            'min_time': float(fitness[:, 1].min()),
+            'best_waste': self.best_fitness[0]
+        }, lambda: self.decode_individual(best, task))
+
+
+def _schedule_items(compiled: CompiledTask, plan: List[Tuple[int, int, int, int, int, int]]) -> List[ScheduleItem]:
+    """Расписание по плану в минутах от начала планирования
+    
+    Оптимизаторы работают с планами из целых чисел; элементы ScheduleItem
+    с датами создаются только здесь - для результата и событий прогресса.
+    """
+    order_ids = compiled.order_ids.tolist()
+    equipment_ids = compiled.equipment_ids.tolist()
+    origin = compiled.start_time
+    return [
+        ScheduleItem(
+            order_id=order_ids[order],
+            equipment_id=equipment_ids[equipment],
+            scheduled_start=origin + timedelta(minutes=start),
+            scheduled_end=origin + timedelta(minutes=end),
+            setup_time_minutes=setup_time,
+            processing_time_minutes=processing_minutes
         )
+        for order, equipment, start, end, setup_time, processing_minutes in plan
+    ]
+
+
+def _plan_waste(compiled: CompiledTask, plan: List[Tuple[int, int, int, int, int, int]]) -> float:
+    """Отходы переходов плана (заказы каждой линии в плане идут по времени)"""
+    matrices = compiled.matrices
+    lane_last = {}
+    total_waste = 0.0
+    for order, equipment, *_ in plan:
+        prev_order = lane_last.get(equipment, -1)
+        if prev_order >= 0:
+            total_waste += compiled.quantity[order] * matrices.transition_factor(prev_order, order)
+        lane_last[equipment] = order
+    return float(total_waste)
+
+
+def _plan_result(compiled: CompiledTask, plan: List[Tuple[int, int, int, int, int, int]],
+                 total_waste: float, start_time: float) -> OptimizationResult:
+    """Результат оптимизации по плану в минутах от начала планирования
+
+    Элемент плана: (заказ, оборудование, начало, окончание, переналадка, производство).
+    """
+    equipment_ids = compiled.equipment_ids.tolist()
+    lane_busy = [0] * compiled.n_equipment  # время производства на линии, мин
+    for _, equipment, _, _, _, processing_minutes in plan:
+        lane_busy[equipment] += processing_minutes
+    
+    horizon_minutes = compiled.planning_horizon_hours * 60
+    equipment_utilization = {
+        equipment_ids[equipment]: min(lane_busy[equipment] / horizon_minutes, 1.0)
+        for equipment in np.flatnonzero(compiled.equipment_available).tolist()
+    }
+    
+    return OptimizationResult(
+        schedule=_schedule_items(compiled, plan),
+        total_waste_kg=Decimal(str(float(total_waste))),
+        total_processing_time_hours=Decimal(str(sum(lane_busy) / 60)),
+        equipment_utilization=equipment_utilization,
+        waste_reduction_percentage=0.0,
+        makespan_hours=max((end for _, _, _, end, _, _ in plan), default=0) / 60,
+        optimization_time_seconds=time.time() - start_time
+    )
+
+
+class GreedyOptimizer:
+    """Жадный диспетчер для больших портфелей заказов
+
+    Заказы берутся по приоритету и срокам и ставятся на оборудование своего типа
+    процесса, освобождающееся раньше всех. Моменты освобождения хранятся в куче
+    по типам процесса, последний заказ линии - в массиве, поэтому заказ планируется
+    за O(log E). При waste_aware среди линий, освобождающихся не позже
+    tie_window_minutes после самой ранней, выбирается переход с наименьшими отходами.
+    """
+    
+    def __init__(self, waste_aware=True, tie_window_minutes=60):
+        self.waste_aware = waste_aware
+        self.tie_window_minutes = tie_window_minutes
+    
+    def optimize(self, task: OptimizationTask) -> OptimizationResult:
+        """Построение расписания диспетчеризацией"""
+        start_time = time.time()
+        timer = PhaseTimer()
+        with timer.phase('compile'):
+            compiled = task.compile()
+        with timer.phase('dispatch'):
+            plan, total_waste = self._dispatch(compiled)
+        with timer.phase('result'):
+            result = _plan_result(compiled, plan, total_waste, start_time)
+        return _instrument(result, timer, len(plan))
+    
+    def _dispatch(self, compiled: CompiledTask) -> Tuple[List[Tuple[int, int, int, int, int, int]], float]:
+        """План диспетчеризации в минутах и его отходы"""
+        matrices = compiled.matrices
+        
+        order_class = matrices.order_class.tolist()
+        order_process = matrices.order_process.tolist()
+        class_factors = matrices.class_factors.tolist()
+        base_setup = matrices.base_setup.tolist()
+        quantity = compiled.quantity.tolist()
+        processing = compiled.processing_minutes
+        
+        # Кучи (момент освобождения, оборудование) по типам процесса; время - минуты от начала.
+        # Индексы оборудования возрастают, поэтому исходные списки уже являются кучами
+        heaps = [[(0, equipment) for equipment in eligible.tolist()] for eligible in compiled.eligible_by_process]
+        lane_last = [-1] * compiled.n_equipment
+        
+        plan = []  # (заказ, оборудование, начало, окончание, переналадка, производство)
+        total_waste = 0.0
+        
+        for order in compiled.dispatch_order.tolist():
+            heap = heaps[order_process[order]]
+            if not heap:
+                continue
+            
+            free_at, equipment = heapq.heappop(heap)
+            if self.waste_aware and heap and heap[0][0] <= free_at + self.tie_window_minutes:
+                # Линии, освобождающиеся почти одновременно: выбираем переход с наименьшими отходами
+                lanes = [(free_at, equipment)]
+                while heap and heap[0][0] <= free_at + self.tie_window_minutes:
+                    lanes.append(heapq.heappop(heap))
+                row = order_class[order]
+                best = min(
+                    range(len(lanes)),
+                    key=lambda i: (
+                        class_factors[order_class[lane_last[lanes[i][1]]]][row]
+                        if lane_last[lanes[i][1]] >= 0 else 0.0,
+                        lanes[i]
+                    )
+                )
+                free_at, equipment = lanes.pop(best)
+                for lane in lanes:
+                    heapq.heappush(heap, lane)
+            
+            # Переналадка и отходы зависят только от последнего заказа линии
+            prev_order = lane_last[equipment]
+            setup_time = base_setup[equipment]
+            if prev_order >= 0:
+                factor = class_factors[order_class[prev_order]][order_class[order]]
+                total_waste += quantity[order] * factor
+                setup_time += int(base_setup[equipment] * factor)
+            
+            processing_minutes = int(processing[order, equipment])
+            start = free_at + setup_time
+            end = start + processing_minutes
+            heapq.heappush(heap, (end, equipment))
+            
+            lane_last[equipment] = order
+            plan.append((order, equipment, start, end, setup_time, processing_minutes))
+        
+        return plan, total_waste
+
+
+class LocalSearchOptimizer:
+    """Улучшение готового расписания локальным поиском
+
+    Последовательности линий улучшаются перемещением заказа (relocate), обменом
+    двух заказов (swap) и разворотом участка линии (2-opt). Изменение отходов
+    и времени окончания линий считается за O(1): по соседям затронутых позиций,
+    для разворота - по префиксным суммам прямых и обратных переходов линии.
+    Принимаются только улучшающие ходы (отходы, затем суммарное время окончания
+    линий), которые не увеличивают makespan исходного расписания и не сдвигают
+    окончание заказа за срок поставки (а просроченный заказ - за исходное окончание).
+    Сроки проверяются за длину измененного участка линии: заказы после него
+    сдвигаются на одно время и сравниваются с наименьшим запасом до срока на
+    хвосте линии. Принятый ход пересчитывает линию за O(длины линии).
+    """
+    
+    MOVES = ('relocate', 'swap', 'two_opt')
+    
+    def __init__(self, time_limit_seconds=1.0, stagnation_moves=20000, seed=None, stop_signal=None):
+        self.time_limit_seconds = time_limit_seconds
+        self.stagnation_moves = stagnation_moves  # останов после M неулучшающих ходов подряд
+        self.random = random.Random(seed)
+        self.stop_signal = stop_signal  # SharedDeadline: отмена или стоп задания
+        self.moves_tried = 0
+        self.moves_applied = 0
+        self.deadline = None
+        self.stop_reason = 'completed'
+        self.progress_callback: Optional[ProgressCallback] = None
+    
+    def optimize(self, task: OptimizationTask) -> OptimizationResult:
+        """Жадное расписание, улучшенное локальным поиском"""
+        return self.improve(task, GreedyOptimizer().optimize(task))
+    
+    def improve(self, task: OptimizationTask, result: OptimizationResult) -> OptimizationResult:
+        """Улучшение результата любого оптимизатора"""
+        start_time = time.time()
+        timer = PhaseTimer()
+        compiled = task.compile()
+        with timer.phase('local_search'):
+            self._init_lanes(compiled, result.schedule)
+            self.deadline = start_time + self.time_limit_seconds
+            self._search()
+        
+        with timer.phase('result'):
+            improved = _plan_result(compiled, self._plan(), self.total_waste, start_time)
+        improved.optimization_time_seconds += result.optimization_time_seconds
+        improved.fitness_cache_hits = result.fitness_cache_hits
+        improved.fitness_cache_misses = result.fitness_cache_misses
+        # Прерванный по времени или остановом локальный поиск сообщает свою причину
+        improved.stop_reason = self.stop_reason if self.stop_reason == 'time_limit' else result.stop_reason
+        improved.nodes_explored = result.nodes_explored
+        improved.nodes_pruned = result.nodes_pruned
+        improved.phase_seconds = dict(result.phase_seconds)
+        improved.evaluations = result.evaluations
+        improved.peak_memory_mb = result.peak_memory_mb
+        _instrument(improved, timer, self.moves_tried)
+        
+        # Нижняя граница исходного оптимизатора остается верной для улучшенного решения
+        if result.optimality_gap is not None:
+            lower_bound = float(result.total_waste_kg) * (1 - result.optimality_gap)
+            improved.optimality_gap = max(1 - lower_bound / self.total_waste, 0.0) if self.total_waste > 0 else 0.0
+        return improved
+    
+    def _init_lanes(self, compiled: CompiledTask, schedule: List[ScheduleItem]):
+        """Последовательности линий из расписания и таблицы задачи в виде списков Python"""
+        self.compiled = compiled
+        self.quantity = compiled.quantity.tolist()
+        self.order_class = compiled.matrices.order_class.tolist()
+        self.order_process = compiled.matrices.order_process.tolist()
+        self.class_factors = compiled.matrices.class_factors.tolist()
+        self.base_setup = compiled.matrices.base_setup.tolist()
+        self.lane_process = compiled.equipment_process.tolist()
+        self.processing = compiled.processing_minutes.tolist()
+        self.eligible = [eligible.tolist() for eligible in compiled.eligible_by_process]
+        
+        lanes = {equipment: [] for equipment in np.flatnonzero(compiled.equipment_available).tolist()}
+        for item in sorted(schedule, key=lambda item: item.scheduled_start):
+            lanes.setdefault(compiled.equipment_index[item.equipment_id], []).append(
+                compiled.order_index[item.order_id]
+            )
+        self.lanes = lanes
+        self.lane_list = list(lanes)
+        
+        # Срок заказа в минутах от начала планирования: конец дня срока поставки
+        start = compiled.start_time
+        self.due = [
+            int((datetime.fromordinal(day + 1) - start).total_seconds() // 60)
+            for day in compiled.delivery_date.tolist()
+        ]
+        self.end_limit = list(self.due)
+        
+        self.finish = {}
+        self.prefix = {}
+        self.ends = {}
+        self.slack = {}
+        for lane in lanes:
+            self._rebuild(lane)
+        self.total_waste = sum(self.prefix[lane][0][-1] for lane in lanes)
+        self._set_limits()
+    
+    def _set_limits(self):
+        """Ограничения ходов по текущему расписанию: makespan и окончание каждого заказа"""
+        self.finish_limit = max(self.finish.values(), default=0)
+        self.end_limit = list(self.due)
+        for lane, sequence in self.lanes.items():
+            for order, end in zip(sequence, self.ends[lane]):
+                self.end_limit[order] = max(self.end_limit[order], end)
+        for lane in self.lanes:
+            self._update_slack(lane)
+    
+    def _update_slack(self, lane: int):
+        """Наименьший запас до ограничения окончания на каждом хвосте линии"""
+        sequence, ends = self.lanes[lane], self.ends[lane]
+        slack = [float('inf')] * (len(sequence) + 1)
+        for position in range(len(sequence) - 1, -1, -1):
+            slack[position] = min(slack[position + 1], self.end_limit[sequence[position]] - ends[position])
+        self.slack[lane] = slack
+    
+    def _fits(self, lane: int, first: int, changed: List[int], resume: int, shift: int) -> bool:
+        """Соблюдение сроков после хода
+        
+        С позиции first линии идут заказы changed, затем неизмененный хвост линии
+        с позиции resume, сдвинутый на shift минут.
+        """
+        sequence = self.lanes[lane]
+        end = self.ends[lane][first - 1] if first > 0 else 0
+        prev = sequence[first - 1] if first > 0 else -1
+        for order in changed:
+            end += self._setup(lane, prev, order) + self.processing[order][lane]
+            if end > self.end_limit[order]:
+                return False
+            prev = order
+        return shift <= self.slack[lane][resume]
+    
+    def _waste(self, prev: int, order: int) -> float:
+        """Отходы перехода (prev, order); -1 - нет заказа"""
+        if prev < 0 or order < 0:
+            return 0.0
+        return self.quantity[order] * self.class_factors[self.order_class[prev]][self.order_class[order]]
+    
+    def _setup(self, equipment: int, prev: int, order: int) -> int:
+        """Переналадка перед order на оборудовании, как в TransitionMatrices.setup_time"""
+        if order < 0:
+            return 0
+        base_setup_time = self.base_setup[equipment]
+        if prev < 0:
+            return base_setup_time
+        if self.order_process[prev] != self.order_process[order]:
+            return base_setup_time * 2
+        factor = self.class_factors[self.order_class[prev]][self.order_class[order]]
+        return base_setup_time + int(base_setup_time * factor)
+    
+    def _rebuild(self, lane: int):
+        """Префиксные суммы переходов линии (прямых и обратных), окончания заказов и линии"""
+        sequence = self.lanes[lane]
+        forward_waste, backward_waste = [0.0], [0.0]
+        forward_setup, backward_setup = [0], [0]
+        for prev, order in zip(sequence, sequence[1:]):
+            forward_waste.append(forward_waste[-1] + self._waste(prev, order))
+            backward_waste.append(backward_waste[-1] + self._waste(order, prev))
+            forward_setup.append(forward_setup[-1] + self._setup(lane, prev, order))
+            backward_setup.append(backward_setup[-1] + self._setup(lane, order, prev))
+        self.prefix[lane] = (forward_waste, backward_waste, forward_setup, backward_setup)
+        
+        # Окончание каждого заказа: первая переналадка, переходы и производство до него включительно
+        first_setup = self._setup(lane, -1, sequence[0]) if sequence else 0
+        processed = 0
+        ends = []
+        for order, setup in zip(sequence, forward_setup):
+            processed += self.processing[order][lane]
+            ends.append(first_setup + setup + processed)
+        self.ends[lane] = ends
+        self.finish[lane] = ends[-1] if ends else 0
+        self._update_slack(lane)
+    
+    @staticmethod
+    def _improves(delta_waste: float, delta_finish: int) -> bool:
+        return delta_waste < -1e-9 or (delta_waste <= 1e-9 and delta_finish < 0)
+    
+    def _search(self):
+        """Случайные ходы с принятием улучшений до исчерпания времени или застоя"""
+        self.moves_tried = 0
+        self.moves_applied = 0
+        self.stop_reason = 'completed'
+        moves = [self._try_relocate, self._try_swap, self._try_two_opt]
+        since_improvement = 0
+        
+        while self.lane_list:
+            if time.time() >= self.deadline or (self.stop_signal is not None and self.stop_signal.reached()):
+                self.stop_reason = 'time_limit'
+                break
+            if self.stagnation_moves and since_improvement >= self.stagnation_moves:
+                self.stop_reason = 'stagnation'
+                break
+            
+            lane = self.random.choice(self.lane_list)
+            if not self.lanes[lane]:
+                since_improvement += 1
+                continue
+            
+            self.moves_tried += 1
+            if self.random.choice(moves)(lane, self.random.randrange(len(self.lanes[lane]))):
+                self.moves_applied += 1
+                since_improvement = 0
+            else:
+                since_improvement += 1
+            
+            if self.progress_callback is not None and not self.moves_tried & 0x3FF:
+                self._report_progress()
+    
+    def _report_progress(self):
+        """Событие прогресса: число ходов и отходы текущего расписания"""
+        remaining = max(self.deadline - time.time(), 0.0)
+        self.progress_callback({
+            'phase': 'local_search',
+            'moves_tried': self.moves_tried,
+            'moves_applied': self.moves_applied,
+            'progress': 1 - remaining / self.time_limit_seconds if self.time_limit_seconds else 1.0,
+            'best_waste': self.total_waste
+        }, lambda: _schedule_items(self.compiled, self._plan()))
+    
+    def _try_relocate(self, lane: int, position: int) -> bool:
+        """Перемещение заказа на другую позицию своей или другой линии"""
+        sequence = self.lanes[lane]
+        order = sequence[position]
+        targets = self.eligible[self.order_process[order]]
+        if not targets:
+            return False
+        target = self.random.choice(targets)
+        
+        prev = sequence[position - 1] if position > 0 else -1
+        next_ = sequence[position + 1] if position + 1 < len(sequence) else -1
+        remove_waste = self._waste(prev, next_) - self._waste(prev, order) - self._waste(order, next_)
+        remove_time = (self._setup(lane, prev, next_) - self._setup(lane, prev, order)
+                       - self._setup(lane, order, next_) - self.processing[order][lane])
+        
+        # Позиция вставки - в последовательности линии после удаления заказа
+        target_sequence = self.lanes[target]
+        target_length = len(target_sequence) - (target == lane)
+        insert = self.random.randrange(target_length + 1)
+        if target == lane and insert == position:
+            return False
+        
+        def at(index):
+            if target == lane and index >= position:
+                index += 1
+            return target_sequence[index]
+        
+        before = at(insert - 1) if insert > 0 else -1
+        after = at(insert) if insert < target_length else -1
+        insert_waste = self._waste(before, order) + self._waste(order, after) - self._waste(before, after)
+        insert_time = (self._setup(target, before, order) + self._setup(target, order, after)
+                       - self._setup(target, before, after) + self.processing[order][target])
+        
+        # Удаление заказа не увеличивает окончание линии - проверяется только линия вставки
+        delta_waste = remove_waste + insert_waste
+        if not self._improves(delta_waste, remove_time + insert_time):
+            return False
+        if self.finish[target] + insert_time + (remove_time if target == lane else 0) > self.finish_limit:
+            return False
+        
+        if target != lane:
+            on_time = (self._fits(lane, position, [], position + 1, remove_time)
+                       and self._fits(target, insert, [order], insert, insert_time))
+        elif insert < position:
+            on_time = self._fits(lane, insert, [order] + sequence[insert:position], position + 1,
+                                 remove_time + insert_time)
+        else:
+            # Позиция insert - после удаления заказа: он встает сразу за sequence[insert]
+            on_time = self._fits(lane, position, sequence[position + 1:insert + 1] + [order], insert + 1,
+                                 remove_time + insert_time)
+        if not on_time:
+            return False
+        
+        sequence.pop(position)
+        target_sequence.insert(insert, order)
+        self._rebuild(lane)
+        if target != lane:
+            self._rebuild(target)
+        self.total_waste += delta_waste
+        return True
+    
+    def _try_swap(self, lane: int, position: int) -> bool:
+        """Обмен заказа с заказом того же процесса на любой линии"""
+        sequence = self.lanes[lane]
+        order = sequence[position]
+        process = self.order_process[order]
+        if self.lane_process[lane] != process:
+            return False
+        other_lane = self.random.choice(self.eligible[process])
+        other_sequence = self.lanes[other_lane]
+        if not other_sequence:
+            return False
+        other_position = self.random.randrange(len(other_sequence))
+        other = other_sequence[other_position]
+        if other == order or self.order_process[other] != process:
+            return False
+        
+        if other_lane == lane and abs(other_position - position) == 1:
+            # Соседние заказы: переход между ними меняет направление
+            first, second = min(position, other_position), max(position, other_position)
+            a, b = sequence[first], sequence[second]
+            prev = sequence[first - 1] if first > 0 else -1
+            next_ = sequence[second + 1] if second + 1 < len(sequence) else -1
+            delta_waste = (self._waste(prev, b) + self._waste(b, a) + self._waste(a, next_)
+                           - self._waste(prev, a) - self._waste(a, b) - self._waste(b, next_))
+            delta_time = (self._setup(lane, prev, b) + self._setup(lane, b, a) + self._setup(lane, a, next_)
+                          - self._setup(lane, prev, a) - self._setup(lane, a, b) - self._setup(lane, b, next_))
+            deltas = {lane: delta_time}
+        else:
+            delta_waste, time_a = self._replace_delta(lane, position, other)
+            other_waste, time_b = self._replace_delta(other_lane, other_position, order)
+            delta_waste += other_waste
+            deltas = {lane: time_a}
+            deltas[other_lane] = deltas.get(other_lane, 0) + time_b
+        
+        if not self._improves(delta_waste, sum(deltas.values())):
+            return False
+        if any(self.finish[changed] + delta > self.finish_limit for changed, delta in deltas.items()):
+            return False
+        
+        if other_lane != lane:
+            on_time = (self._fits(lane, position, [other], position + 1, deltas[lane])
+                       and self._fits(other_lane, other_position, [order], other_position + 1, deltas[other_lane]))
+        else:
+            first, last = min(position, other_position), max(position, other_position)
+            on_time = self._fits(lane, first, [sequence[last]] + sequence[first + 1:last] + [sequence[first]],
+                                 last + 1, deltas[lane])
+        if not on_time:
+            return False
+        
+        sequence[position], other_sequence[other_position] = other, order
+        for changed in deltas:
+            self._rebuild(changed)
+        self.total_waste += delta_waste
+        return True
+    
+    def _replace_delta(self, lane: int, position: int, order: int) -> Tuple[float, int]:
+        """Изменение отходов и окончания линии при замене заказа на позиции"""
+        sequence = self.lanes[lane]
+        old = sequence[position]
+        prev = sequence[position - 1] if position > 0 else -1
+        next_ = sequence[position + 1] if position + 1 < len(sequence) else -1
+        delta_waste = (self._waste(prev, order) + self._waste(order, next_)
+                       - self._waste(prev, old) - self._waste(old, next_))
+        delta_time = (self._setup(lane, prev, order) + self._setup(lane, order, next_)
+                      - self._setup(lane, prev, old) - self._setup(lane, old, next_)
+                      + self.processing[order][lane] - self.processing[old][lane])
+        return delta_waste, delta_time
+    
+    def _try_two_opt(self, lane: int, position: int) -> bool:
+        """Разворот участка линии между двумя позициями"""
+        sequence = self.lanes[lane]
+        if len(sequence) < 2:
+            return False
+        other_position = self.random.randrange(len(sequence))
+        first, last = min(position, other_position), max(position, other_position)
+        if first == last:
+            return False
+        
+        forward_waste, backward_waste, forward_setup, backward_setup = self.prefix[lane]
+        a, b = sequence[first], sequence[last]
+        prev = sequence[first - 1] if first > 0 else -1
+        next_ = sequence[last + 1] if last + 1 < len(sequence) else -1
+        
+        # Внутренние переходы участка после разворота - обратные переходы исходного
+        delta_waste = (self._waste(prev, b) + self._waste(a, next_)
+                       + backward_waste[last] - backward_waste[first]
+                       - self._waste(prev, a) - self._waste(b, next_)
+                       - forward_waste[last] + forward_waste[first])
+        delta_time = (self._setup(lane, prev, b) + self._setup(lane, a, next_)
+                      + backward_setup[last] - backward_setup[first]
+                      - self._setup(lane, prev, a) - self._setup(lane, b, next_)
+                      - forward_setup[last] + forward_setup[first])
+        
+        if not self._improves(delta_waste, delta_time):
+            return False
+        if self.finish[lane] + delta_time > self.finish_limit:
+            return False
+        
+        if not self._fits(lane, first, sequence[first:last + 1][::-1], last + 1, delta_time):
+            return False
+        
+        sequence[first:last + 1] = sequence[first:last + 1][::-1]
+        self._rebuild(lane)
+        self.total_waste += delta_waste
+        return True
+    
+    def _plan(self) -> List[Tuple[int, int, int, int, int, int]]:
+        """План в минутах: заказы линии выполняются подряд с начала планирования"""
+        plan = []
+        for lane, sequence in self.lanes.items():
+            end = 0
+            prev = -1
+            for order in sequence:
+                setup_time = self._setup(lane, prev, order)
+                start = end + setup_time
+                end = start + self.processing[order][lane]
+                plan.append((order, lane, start, end, setup_time, self.processing[order][lane]))
+                prev = order
+        plan.sort(key=lambda item: (item[2], item[1]))
+        return plan
+
+
+class IncrementalOptimizer(LocalSearchOptimizer):
+    """Инкрементальная переоптимизация от текущего расписания
+
+    Заказ текущего расписания остается на своей линии в прежнем порядке, если не
+    изменились ни он сам, ни оборудование, ни время производства. Изменение заказа
+    определяется по отпечаткам order_fingerprints, сохраненным вместе с расписанием;
+    без них заказ считается неизмененным, пока не изменилось время производства.
+    Новые и измененные заказы вставляются в позицию с наименьшим приростом отходов
+    (затем времени), после чего короткий локальный поиск улучшает расписание.
+    """
+    
+    def __init__(self, warm_start: List[ScheduleItem], order_fingerprints: Optional[Dict[int, str]] = None,
+                 time_limit_seconds=0.5, stagnation_moves=20000, seed=None, stop_signal=None):
+        super().__init__(time_limit_seconds, stagnation_moves, seed, stop_signal)
+        self.warm_start = warm_start
+        self.order_fingerprints = order_fingerprints  # id заказа -> order_fingerprint при построении расписания
+        self.orders_kept = 0
+        self.orders_inserted = 0
+    
+    def optimize(self, task: OptimizationTask) -> OptimizationResult:
+        """Дополнение текущего расписания новыми заказами"""
+        start_time = time.time()
+        timer = PhaseTimer()
+        with timer.phase('compile'):
+            compiled = task.compile()
+        
+        with timer.phase('insertion'):
+            kept = self._valid_warm_start(compiled, task)
+            self._init_lanes(compiled, kept)
+            # Новые заказы вставляются в пределах горизонта планирования
+            self.finish_limit = max(compiled.planning_horizon_hours * 60, self.finish_limit)
+            
+            kept_orders = {compiled.order_index[item.order_id] for item in kept}
+            self.orders_kept = len(kept_orders)
+            self.orders_inserted = 0
+            for order in compiled.dispatch_order.tolist():
+                if order not in kept_orders and self._insert(order):
+                    self.orders_inserted += 1
+        
+        with timer.phase('local_search'):
+            self._set_limits()
+            self.deadline = start_time + self.time_limit_seconds
+            self._search()
+        
+        with timer.phase('result'):
+            result = _plan_result(compiled, self._plan(), self.total_waste, start_time)
+        return _instrument(result, timer, self.orders_inserted + self.moves_tried)
+    
+    def _valid_warm_start(self, compiled: CompiledTask, task: OptimizationTask) -> List[ScheduleItem]:
+        """Элементы текущего расписания, которые можно сохранить без изменений"""
+        kept = []
+        seen = set()
+        for item in self.warm_start:
+            order = compiled.order_index.get(item.order_id)
+            equipment = compiled.equipment_index.get(item.equipment_id)
+            if order is None or equipment is None or order in seen:
+                continue
+            if not compiled.equipment_available[equipment]:
+                continue
+            if compiled.equipment_process[equipment] != compiled.matrices.order_process[order]:
+                continue
+            # Изменение объема или производительности меняет время производства - заказ планируется заново
+            if item.processing_time_minutes != compiled.processing_minutes[order, equipment]:
+                continue
+            # Цвет, материал, калибр, срок и другие поля заказа меняют переходы и очередность
+            if (self.order_fingerprints is not None
+                    and self.order_fingerprints.get(item.order_id) != order_fingerprint(task.orders[order])):
+                continue
+            seen.add(order)
+            kept.append(item)
+        return kept
+    
+    def _insert(self, order: int) -> bool:
+        """Вставка заказа в самую дешевую позицию подходящих линий"""
+        best = None
+        for lane in self.eligible[self.order_process[order]]:
+            sequence = self.lanes[lane]
+            processing_minutes = self.processing[order][lane]
+            for position in range(len(sequence) + 1):
+                before = sequence[position - 1] if position > 0 else -1
+                after = sequence[position] if position < len(sequence) else -1
+                delta_waste = self._waste(before, order) + self._waste(order, after) - self._waste(before, after)
+                delta_time = (self._setup(lane, before, order) + self._setup(lane, order, after)
+                              - self._setup(lane, before, after) + processing_minutes)
+                # Позиции, не выводящие линию за горизонт, предпочтительнее
+                overflow = self.finish[lane] + delta_time > self.finish_limit
+                key = (overflow, delta_waste, delta_time)
+                if best is None or key < best[0]:
+                    best = (key, lane, position)
+        
+        if best is None:
+            return False
+        
+        (_, delta_waste, _), lane, position = best
+        self.lanes[lane].insert(position, order)
+        self._rebuild(lane)
+        self.total_waste += delta_waste
+        return True
+
+
+class RollingHorizonOptimizer:
+    """Планирование скользящим горизонтом по срокам поставки
+
+    Заказы со сроком в очередном окне window_days оптимизируются выбранным
+    алгоритмом вместе с заказами следующих lookahead_days дней. Затем заказы окна
+    фиксируются и продолжают уже зафиксированные последовательности линий:
+    последний заказ и момент освобождения линии переходят в следующее окно.
+    Размер решаемой задачи ограничен заказами окна с упреждением.
+    """
+    
+    def __init__(self, optimizer_factory: Callable[[], Any] = GreedyOptimizer, window_days=7, lookahead_days=7,
+                 stop_signal=None):
+        self.optimizer_factory = optimizer_factory  # новый оптимизатор для каждого окна
+        self.window_days = window_days
+        self.lookahead_days = lookahead_days
+        # SharedDeadline задания: после останова оставшиеся окна решаются жадно;
+        # прервать текущее окно может только его оптимизатор, созданный с тем же сигналом
+        self.stop_signal = stop_signal
+        self.windows = 0
+        self.progress_callback: Optional[ProgressCallback] = None
+    
+    def optimize(self, task: OptimizationTask) -> OptimizationResult:
+        """Последовательная оптимизация окон с фиксацией решений"""
+        start_time = time.time()
+        timer = PhaseTimer()
+        with timer.phase('compile'):
+            compiled = task.compile()
+        matrices = compiled.matrices
+        delivery_date = compiled.delivery_date
+        all_equipment = np.arange(compiled.n_equipment)
+        
+        # Состояние линий между окнами: последний заказ и момент освобождения, мин
+        lane_last = [-1] * compiled.n_equipment
+        lane_free = [0] * compiled.n_equipment
+        
+        plan = []
+        total_waste = 0.0
+        results = []
+        committed = np.zeros(compiled.n_orders, dtype=bool)
+        self.windows = 0
+        window_end = int(delivery_date.min()) if compiled.n_orders else 0
+        
+        while not committed.all():
+            window_end += self.window_days
+            in_window = ~committed & (delivery_date < window_end)
+            if not in_window.any():
+                continue
+            candidates = np.flatnonzero(~committed & (delivery_date < window_end + self.lookahead_days))
+            with timer.phase('decomposition'):
+                subtask = compiled.subset(candidates, all_equipment)
+            
+            if self.stop_signal is not None and self.stop_signal.reached():
+                optimizer = GreedyOptimizer()
+            else:
+                optimizer = self.optimizer_factory()
+            result = optimizer.optimize(subtask)
+            results.append(result)
+            self.windows += 1
+            
+            # Фиксируются только заказы окна, в порядке линий из решения окна
+            for item in sorted(result.schedule, key=lambda item: item.scheduled_start):
+                order = compiled.order_index[item.order_id]
+                if not in_window[order]:
+                    continue
+                equipment = compiled.equipment_index[item.equipment_id]
+                prev_order = lane_last[equipment]
+                
+                setup_time = matrices.setup_time(equipment, order, prev_order)
+                if prev_order >= 0:
+                    total_waste += compiled.quantity[order] * matrices.transition_factor(prev_order, order)
+                processing_minutes = int(compiled.processing_minutes[order, equipment])
+                start = lane_free[equipment] + setup_time
+                end = start + processing_minutes
+                
+                plan.append((order, equipment, start, end, setup_time, processing_minutes))
+                lane_last[equipment] = order
+                lane_free[equipment] = end
+            
+            # Заказы окна без подходящего оборудования остаются незапланированными
+            committed |= in_window
+            
+            if self.progress_callback is not None:
+                self.progress_callback({
+                    'phase': 'rolling_horizon',
+                    'window': self.windows,
+                    'committed_orders': int(committed.sum()),
+                    'progress': float(committed.mean()),
+                    'best_waste': total_waste
+                }, lambda: _schedule_items(compiled, plan))
+        
+        with timer.phase('result'):
+            combined = _plan_result(compiled, plan, total_waste, start_time)
+        for result in results:
+            timer.merge(result.phase_seconds)
+            combined.peak_memory_mb = max(combined.peak_memory_mb, result.peak_memory_mb)
+        combined.fitness_cache_hits = sum(result.fitness_cache_hits for result in results)
+        combined.fitness_cache_misses = sum(result.fitness_cache_misses for result in results)
+        combined.nodes_explored = sum(result.nodes_explored for result in results)
+        combined.nodes_pruned = sum(result.nodes_pruned for result in results)
+        combined.stop_reason = next(
+            (result.stop_reason for result in results if result.stop_reason != 'completed'), 'completed'
+        )
+        return _instrument(combined, timer, sum(result.evaluations for result in results))
 
 
 class BranchAndBoundOptimizer:
     """Алгоритм ветвей и границ для точной оптимизации малых задач"""
     
-    def __init__(self, max_nodes=10000):
+    def __init__(self, max_nodes=1000000, time_limit_seconds=None, stagnation_nodes=None, exact_max_orders=30,
+                 search='depth_first', max_open_nodes=100000, n_workers=1, stop_signal=None):
         self.max_nodes = max_nodes
+        self.exact_max_orders = exact_max_orders  # для больших задач - эвристика
+        self.time_limit_seconds = time_limit_seconds  # None - без ограничения времени
+        self.stagnation_nodes = stagnation_nodes  # останов без улучшения M узлов
+        self.search = search  # depth_first | best_first
+        self.max_open_nodes = max_open_nodes  # предел очереди узлов в режиме best_first
+        self.n_workers = n_workers  # > 1 - поддеревья решаются в пуле процессов
+        self.stop_signal = stop_signal  # SharedDeadline: отмена или стоп задания, в том числе из другого процесса
         self.nodes_explored = 0
+        self.nodes_pruned = 0
         self.best_solution = None
         self.best_value = float('inf')
+        self.solution_value = float('inf')  # отходы собственного best_solution
+        self.lower_bound = 0.0  # доказанная нижняя граница оптимума
+        self.optimality_gap = None
+        self.shared_incumbent = None  # (общие рекорды, счетчики узлов, свой слот) при параллельном поиске
         self.task = None  # Сохраняем ссылку на задачу
+        self.deadline = None
+        self.last_improvement = 0
+        self.stop_reason = 'completed'
+        self.progress_callback: Optional[ProgressCallback] = None
     
     def optimize(self, task: OptimizationTask) -> OptimizationResult:
-        """Оптимизация методом ветвей и границ"""
+        """Оптимизация методом ветвей и границ
+        
+        Типы процесса не влияют друг на друга (CompiledTask.components), поэтому
+        каждый решается отдельным поиском: глубина дерева - число заказов одного
+        типа, а не всей задачи. Лимиты узлов и времени общие для всех поисков.
+        """
         start_time = time.time()
+        self._start_search(start_time)
         self.task = task  # Сохраняем задачу для использования в методах
+        timer = PhaseTimer()
+        with timer.phase('compile'):
+            compiled = task.compile()
         
         # Для больших задач используем эвристику
-        if len(task.orders) > 20:
-            return self._heuristic_solve(task, start_time)
+        if compiled.n_orders > self.exact_max_orders:
+            return _instrument(self._heuristic_solve(task, start_time), timer, 0)
+        
+        with timer.phase('decomposition'):
+            components = compiled.components()
         
-        # Точное решение для малых задач
+        for orders, equipment in components:
+            subtask = compiled.subset(orders, equipment)
+            self.component = (orders.tolist(), equipment.tolist())
+            self._reset_incumbent()
+            
+            # Поиск ведется на едином состоянии, изменяемом на месте
+            with timer.phase('bound_tables'):
+                self._init_search(subtask)
+            with timer.phase('search'):
+                if self.n_workers > 1:
+                    self._search_parallel(subtask)
+                else:
+                    self._search()
+                # После досрочного останова остальные типы получают решение жадного спуска
+                if not self.best_solution:
+                    self._dive()
+            
+            if not self.best_solution:
+                # Fallback к эвристике
+                self.component = None
+                return _instrument(self._heuristic_solve(task, start_time), timer, 0)
+            
+            self.solved_plan.extend(self._component_plan())
+            self.solved_waste += self.solution_value
+            self.solved_bound += min(self.lower_bound, self.solution_value)
+        self.component = None
+        
+        gap = self.solved_waste - self.solved_bound
+        self.optimality_gap = max(gap, 0.0) / self.solved_waste if self.solved_waste > 0 else 0.0
+        
+        # При досрочном останове возвращается лучшее найденное решение
+        with timer.phase('result'):
+            result = self._create_result(self.solved_plan, task, start_time)
+        return _instrument(result, timer, self.nodes_explored)
+    
+    def _start_search(self, start_time: float):
+        """Сброс счетчиков и ограничений перед поиском"""
+        self.deadline = start_time + self.time_limit_seconds if self.time_limit_seconds else None
+        self.stop_reason = 'completed'
         self.nodes_explored = 0
+        self.nodes_pruned = 0
+        self.optimality_gap = None
+        self.component = None
+        self.solved_plan = []  # план решенных подзадач в индексах всей задачи
+        self.solved_waste = 0.0
+        self.solved_bound = 0.0
+        self._reset_incumbent()
+    
+    def _reset_incumbent(self):
+        """Сброс рекорда перед поиском очередной подзадачи"""
+        self.last_improvement = self.nodes_explored
         self.best_solution = None
         self.best_value = float('inf')
-        
-        # Начальное состояние
-        initial_state = {
-            'assigned_orders': [],
-            'remaining_orders': task.orders.copy(),
-            'equipment_schedules': {eq.id: [] for eq in task.equipment if eq.is_available},
-            'current_time': {eq.id: task.start_time for eq in task.equipment if eq.is_available}
-        }
-        
-        self._branch_and_bound(initial_state, task)
-        
-        if self.best_solution:
-            return self._create_result(self.best_solution, task, start_time)
-        else:
-            # Fallback к эвристике
-            return self._heuristic_solve(task, start_time)
+        self.solution_value = float('inf')
+        self.lower_bound = 0.0
     
-    def _branch_and_bound(self, state: dict, task: OptimizationTask):
-        """Рекурсивный метод ветвей и границ"""
-        self.nodes_explored += 1
+    def _component_plan(self) -> List[Tuple[int, int, int, int, int, int]]:
+        """План лучшего решения подзадачи в индексах всей задачи"""
+        plan = self._solution_plan(self.best_solution) if self.best_solution else []
+        if self.component is None:
+            return plan
+        orders, equipment = self.component
+        return [(orders[order], equipment[eq], start, end, setup, processing)
+                for order, eq, start, end, setup, processing in plan]
+    
+    def _init_search(self, compiled: CompiledTask):
+        """Начальное состояние поиска и таблицы задачи в виде списков Python"""
+        n_orders = compiled.n_orders
+        available_equipment = np.flatnonzero(compiled.equipment_available)
+        
+        # Заказы ветвятся по срочности: сначала самый ранний срок поставки
+        self.branch_order = sorted(range(n_orders), key=lambda i: compiled.delivery_date[i])
+        self.eligible = [compiled.eligible_for(i).tolist() for i in range(n_orders)]
+        self.quantity = compiled.quantity.tolist()
+        self.processing = compiled.processing_minutes.tolist()
+        self.waste_factors = compiled.matrices.waste_factors.tolist()
+        
+        # Время переналадки: [оборудование][предыдущий заказ + 1][заказ], 0 - линия пуста
+        equipment, prev, order = np.meshgrid(
+            np.arange(compiled.n_equipment), np.arange(-1, n_orders), np.arange(n_orders), indexing='ij'
+        )
+        self.setup = compiled.matrices.setup_times(equipment, order, prev).tolist() if n_orders else []
+        
+        self._init_bound(compiled)
+        
+        # Состояние: назначения в стеке, отмена - по стеку предыдущих значений
+        self.waste = 0.0
+        self.lane_last = {e: -1 for e in available_equipment.tolist()}  # последний заказ линии
+        self.lane_end = {e: 0 for e in available_equipment.tolist()}    # окончание, мин от начала
+        self.lane_process = compiled.equipment_process.tolist()
+        self.free_lanes = np.bincount(
+            compiled.equipment_process[available_equipment], minlength=len(PROCESS_CODES)
+        ).tolist()  # число пустых линий по типам процесса
+        self.assignments = []  # (заказ, оборудование, начало, окончание)
+        self.undo_stack = []
+    
+    def _init_bound(self, compiled: CompiledTask):
+        """Таблицы нижней границы отходов для нераспределенных заказов
+
+        Заказ попадает на линию своего процесса либо первым (без отходов), либо
+        после другого заказа того же процесса - не дешевле минимального входящего
+        коэффициента. Первыми могут стать не больше заказов, чем пустых линий,
+        поэтому без отходов считаются самые дорогие из них. Заказы ветвятся
+        в фиксированном порядке, так что нераспределенные заказы на глубине d -
+        это branch_order[d:], и префиксные суммы готовятся заранее.
+        """
+        n_orders = compiled.n_orders
+        order_process = compiled.matrices.order_process
+        
+        same_process = order_process[:, None] == order_process[None, :]
+        np.fill_diagonal(same_process, False)
+        incoming = np.where(same_process, compiled.matrices.waste_factors, np.inf).min(axis=0, initial=np.inf)
+        incoming_cost = compiled.quantity * np.where(np.isfinite(incoming), incoming, 0.0)
+        
+        # bound_prefix[d][c] - префиксные суммы входящих отходов заказов процесса c
+        # из branch_order[d:], отсортированных по убыванию
+        self.bound_prefix = []
+        for depth in range(n_orders + 1):
+            costs = [[] for _ in PROCESS_CODES]
+            for order in self.branch_order[depth:]:
+                costs[order_process[order]].append(float(incoming_cost[order]))
+            self.bound_prefix.append([
+                np.concatenate(([0.0], np.cumsum(sorted(process_costs, reverse=True)))).tolist()
+                for process_costs in costs
+            ])
+    
+    def _search(self):
+        """Поиск из текущего состояния выбранной стратегией"""
+        if self.search == 'best_first':
+            self._best_first()
+            return
         
+        # Прерванный поиск в глубину гарантирует только границу корня
+        self.lower_bound = self._calculate_lower_bound()
+        self._branch_and_bound()
+        if self.stop_reason == 'completed':
+            self.lower_bound = self.best_value
+    
+    def _within_limits(self) -> bool:
+        """Проверка ограничений поиска; при параллельном поиске - обмен рекордом"""
         if self.nodes_explored > self.max_nodes:
+            self.stop_reason = 'node_limit'
+            return False
+        if self.deadline is not None and time.time() >= self.deadline:
+            self.stop_reason = 'time_limit'
+            return False
+        if self.stagnation_nodes and self.nodes_explored - self.last_improvement > self.stagnation_nodes:
+            self.stop_reason = 'stagnation'
+            return False
+        if self.stop_signal is not None and not self.nodes_explored & 0xFF and self.stop_signal.reached():
+            self.stop_reason = 'time_limit'
+            return False
+        if self.shared_incumbent is not None and not self.nodes_explored & 0xFF:
+            values, nodes, slot = self.shared_incumbent
+            nodes[slot] = self.nodes_explored
+            if nodes.sum() > self.max_nodes:
+                self.stop_reason = 'node_limit'
+                return False
+            self.best_value = min(self.best_value, float(values.min()))
+        if self.progress_callback is not None and not self.nodes_explored & 0xFFF:
+            self._report_progress()
+        return True
+    
+    def _report_progress(self):
+        """Событие прогресса: узлы, рекорд и доказанная нижняя граница"""
+        self.progress_callback({
+            'phase': 'branch_bound',
+            'nodes_explored': self.nodes_explored,
+            'nodes_pruned': self.nodes_pruned,
+            'progress': min(self.nodes_explored / self.max_nodes, 1.0),
+            'best_waste': self.solved_waste + self.best_value if self.best_value < float('inf') else None,
+            'lower_bound': self.solved_bound + min(self.lower_bound, self.best_value)
+        }, self._best_schedule)
+    
+    def _best_schedule(self) -> List[ScheduleItem]:
+        """Расписание решенных подзадач и лучшего решения текущей"""
+        return _schedule_items(self.task.compile(), self.solved_plan + self._component_plan())
+    
+    def _record_solution(self):
+        """Сохранение рекорда, если текущее полное назначение лучше"""
+        if self.waste < self.best_value:
+            self.best_value = self.solution_value = self.waste
+            self.best_solution = list(self.assignments)
+            self.last_improvement = self.nodes_explored
+            if self.shared_incumbent is not None:
+                values, _, slot = self.shared_incumbent
+                values[slot] = self.waste
+    
+    def _candidates(self, order: int) -> List[int]:
+        """Оборудование для ветвления заказа, от самого дешевого перехода"""
+        # Пустые линии одного процесса равноценны по отходам - пробуем только первую из них.
+        # Начинаем с самого дешевого перехода: хорошее решение находится раньше и сильнее отсекает
+        candidates = []
+        empty_lane_seen = False
+        for equipment in self.eligible[order]:
+            if self.lane_last[equipment] < 0:
+                if empty_lane_seen:
+                    continue
+                empty_lane_seen = True
+            candidates.append(equipment)
+        candidates.sort(key=lambda e: self._transition_cost(order, e))
+        return candidates
+    
+    def _branch_and_bound(self):
+        """Рекурсивный метод ветвей и границ (поиск в глубину)
+        
+        Глубина рекурсии не превышает числа заказов (exact_max_orders).
+        """
+        self.nodes_explored += 1
+        if not self._within_limits():
             return
         
+        depth = len(self.assignments)
+        
         # Если все заказы назначены
-        if not state['remaining_orders']:
-            value = self._evaluate_state(state, task)
-            if value < self.best_value:
-                self.best_value = value
-                self.best_solution = state.copy()
+        if depth == len(self.branch_order):
+            self._record_solution()
             return
         
-        # Выбираем следующий заказ (самый срочный)
-        next_order = min(state['remaining_orders'], key=lambda o: o.delivery_date)
-        
-        # Пробуем назначить на каждое подходящее оборудование
-        suitable_equipment = [
-            eq for eq in task.equipment 
-            if eq.process_type == next_order.process_type and eq.is_available
-        ]
+        # Следующий заказ - самый срочный из оставшихся
+        next_order = self.branch_order[depth]
         
-        for equipment in suitable_equipment:
-            # Создаем новое состояние
-            new_state = self._create_new_state(state, next_order, equipment, task)
+        for equipment in self._candidates(next_order):
+            if self.stop_reason != 'completed':
+                break
+            
+            self._assign(next_order, equipment)
             
             # Проверяем границу
-            lower_bound = self._calculate_lower_bound(new_state, task)
+            lower_bound = self._calculate_lower_bound()
             if lower_bound < self.best_value:
-                self._branch_and_bound(new_state, task)
-    
-    def _create_new_state(self, state: dict, order: ProductionOrder, equipment: Equipment, task: OptimizationTask) -> dict:
-        """Создание нового состояния после назначения заказа"""
-        new_state = {
-            'assigned_orders': state['assigned_orders'] + [(order.id, equipment.id)],
-            'remaining_orders': [o for o in state['remaining_orders'] if o.id != order.id],
-            'equipment_schedules': {k: v.copy() for k, v in state['equipment_schedules'].items()},
-            'current_time': state['current_time'].copy()
-        }
-        
-        # Обновляем расписание оборудования
-        current_time = new_state['current_time'][equipment.id]
-        
-        # Рассчитываем время переналадки
-        prev_order = None
-        if new_state['equipment_schedules'][equipment.id]:
-            last_order_id = new_state['equipment_schedules'][equipment.id][-1][0]
-            prev_order = next(o for o in task.orders if o.id == last_order_id)
-        
-        setup_time = WasteCalculator.calculate_setup_time(order, equipment, prev_order)
-        
-        # Рассчитываем время производства
-        if equipment.capacity_per_hour and equipment.capacity_per_hour > 0:
-            processing_minutes = int((float(order.quantity_kg) / float(equipment.capacity_per_hour)) * 60)
-        else:
-            processing_minutes = 60
-        
-        start_time = current_time + timedelta(minutes=setup_time)
-        end_time = start_time + timedelta(minutes=processing_minutes)
-        
-        new_state['equipment_schedules'][equipment.id].append((order.id, start_time, end_time))
-        new_state['current_time'][equipment.id] = end_time
-        
-        return new_state
+                self._branch_and_bound()
+            else:
+                self.nodes_pruned += 1
+            
+            self._unassign()
     
-    def _calculate_lower_bound(self, state: dict, task: OptimizationTask) -> float:
-        """Расчет нижней границы для отсечения"""
-        # Простая нижняя граница - сумма минимальных отходов для оставшихся заказов
-        total_waste = 0.0
-        
-        # Отходы для уже назначенных заказов
-        for eq_id, schedule in state['equipment_schedules'].items():
-            prev_order = None
-            for order_id, start_time, end_time in schedule:
-                order = next(o for o in task.orders if o.id == order_id)
-                
-                if prev_order:
-                    waste_factor = WasteCalculator.calculate_transition_waste(prev_order, order)
-                    total_waste += float(order.quantity_kg) * waste_factor
-                
-                prev_order = order
-        
-        # Минимальные отходы для оставшихся заказов
-        for order in state['remaining_orders']:
-            total_waste += float(order.quantity_kg) * 0.01  # Минимальный уровень отходов
-        
-        return total_waste
+    def _dive(self):
+        """Жадный спуск до полного назначения: начальный рекорд для поиска по границе"""
+        depth = len(self.assignments)
+        while len(self.assignments) < len(self.branch_order):
+            candidates = self._candidates(self.branch_order[len(self.assignments)])
+            if not candidates:
+                break
+            self._assign(self.branch_order[len(self.assignments)], candidates[0])
+        if len(self.assignments) == len(self.branch_order):
+            self._record_solution()
+        while len(self.assignments) > depth:
+            self._unassign()
     
-    def _evaluate_state(self, state: dict, task: OptimizationTask) -> float:
-        """Оценка полного состояния"""
-        total_waste = 0.0
-        
-        for eq_id, schedule in state['equipment_schedules'].items():
-            prev_order = None
-            for order_id, start_time, end_time in schedule:
-                order = next(o for o in task.orders if o.id == order_id)
-                
-                if prev_order:
-                    waste_factor = WasteCalculator.calculate_transition_waste(prev_order, order)
-                    total_waste += float(order.quantity_kg) * waste_factor
-                
-                prev_order = order
-        
-        return total_waste
+    def _restore(self, path: Tuple[int, ...]):
+        """Переход состояния к узлу: path - оборудование заказов branch_order[:len(path)]"""
+        common = 0
+        limit = min(len(self.assignments), len(path))
+        while common < limit and self.assignments[common][1] == path[common]:
+            common += 1
+        while len(self.assignments) > common:
+            self._unassign()
+        for depth in range(common, len(path)):
+            self._assign(self.branch_order[depth], path[depth])
     
-    def _heuristic_solve(self, task: OptimizationTask, start_time: float) -> OptimizationResult:
-        """Эвристическое решение для больших задач"""
-        # Сортируем заказы по приоритету и срокам
-        sorted_orders = sorted(task.orders, key=lambda o: (o.priority, o.delivery_date))
-        
-        schedule = []
-        equipment_last_time = {eq.id: task.start_time for eq in task.equipment if eq.is_available}
-        
-        for order in sorted_orders:
-            # Найти подходящее оборудование
-            suitable_equipment = [
-                eq for eq in task.equipment 
-                if eq.process_type == order.process_type and eq.is_available
-            ]
-            
-            if not suitable_equipment:
-                continue
-            
-            # Выбираем оборудование с наименьшим временем окончания
-            best_equipment = min(suitable_equipment, key=lambda eq: equipment_last_time[eq.id])
-            
-            # Получаем предыдущий заказ
-            prev_orders = [s for s in schedule if s.equipment_id == best_equipment.id]
-            prev_order = None
-            if prev_orders:
-                last_item = max(prev_orders, key=lambda x: x.scheduled_end)
-                prev_order = next(o for o in sorted_orders if o.id == last_item.order_id)
+    def _path_bound(self, path: Tuple[int, ...]) -> float:
+        """Нижняя граница узла, заданного путем от корня"""
+        self._restore(path)
+        return self._calculate_lower_bound()
+    
+    def _expand(self, path: Tuple[int, ...]) -> List[Tuple[float, Tuple[int, ...]]]:
+        """Дочерние узлы с нижними границами; листья сразу обновляют рекорд"""
+        self._restore(path)
+        depth = len(path)
+        if depth == len(self.branch_order):
+            self._record_solution()
+            return []
+        
+        children = []
+        next_order = self.branch_order[depth]
+        for equipment in self._candidates(next_order):
+            self._assign(next_order, equipment)
+            lower_bound = self._calculate_lower_bound()
+            if lower_bound >= self.best_value:
+                self.nodes_pruned += 1
+            elif depth + 1 == len(self.branch_order):
+                self._record_solution()
+            else:
+                children.append((lower_bound, path + (equipment,)))
+            self._unassign()
+        return children
+    
+    def _best_first(self):
+        """Поиск по наименьшей нижней границе с ограниченной очередью узлов
+        
+        При переполнении очереди остаются max_open_nodes // 2 лучших узлов (лучевой поиск);
+        граница отброшенных учитывается в доказанной нижней границе. Поиск с отброшенными
+        узлами оптимум не доказывает и завершается с причиной beam_truncated.
+        """
+        self._dive()
+        
+        root = tuple(equipment for _, equipment, _, _ in self.assignments)
+        # Узел: (граница, -глубина, номер, путь) - при равной границе глубже первым
+        open_nodes = [(self._calculate_lower_bound(), -len(root), 0, root)]
+        counter = 1
+        dropped_bound = float('inf')
+        
+        while open_nodes:
+            if open_nodes[0][0] >= self.best_value:
+                # Ни один оставшийся узел не лучше рекорда
+                self.nodes_pruned += len(open_nodes)
+                open_nodes = []
+                break
             
-            # Рассчитываем времена
-            setup_time = WasteCalculator.calculate_setup_time(order, best_equipment, prev_order)
+            self.lower_bound = min(self.best_value, open_nodes[0][0], dropped_bound)
+            self.nodes_explored += 1
+            if not self._within_limits():
+                break
             
-            if best_equipment.capacity_per_hour and best_equipment.capacity_per_hour > 0:
-                processing_minutes = int((float(order.quantity_kg) / float(best_equipment.capacity_per_hour)) * 60)
-            else:
-                processing_minutes = 60
-            
-            scheduled_start = equipment_last_time[best_equipment.id] + timedelta(minutes=setup_time)
-            scheduled_end = scheduled_start + timedelta(minutes=processing_minutes)
-            
-            schedule_item = ScheduleItem(
-                order_id=order.id,
-                equipment_id=best_equipment.id,
-                scheduled_start=scheduled_start,
-                scheduled_end=scheduled_end,
-                setup_time_minutes=setup_time,
-                processing_time_minutes=processing_minutes
-            )
+            _, _, _, path = heapq.heappop(open_nodes)
+            for lower_bound, child in self._expand(path):
+                heapq.heappush(open_nodes, (lower_bound, -len(child), counter, child))
+                counter += 1
             
-            schedule.append(schedule_item)
-            equipment_last_time[best_equipment.id] = scheduled_end
-        
-        return self._create_result({'schedule': schedule}, task, start_time)
+            if len(open_nodes) > self.max_open_nodes:
+                keep = heapq.nsmallest(self.max_open_nodes // 2 + 1, open_nodes)
+                dropped_bound = min(dropped_bound, keep.pop()[0])
+                self.nodes_pruned += len(open_nodes) - len(keep)
+                open_nodes = keep  # отсортированный список - корректная куча
+                if self.stop_reason == 'completed':
+                    self.stop_reason = 'beam_truncated'
+        
+        self._restore(root)
+        frontier_bound = open_nodes[0][0] if open_nodes else float('inf')
+        self.lower_bound = min(self.best_value, frontier_bound, dropped_bound)
     
-    def _create_result(self, solution: dict, task: OptimizationTask, start_time: float) -> OptimizationResult:
-        """Создание результата оптимизации"""
-        if 'schedule' in solution:
-            schedule = solution['schedule']
-        else:
-            # Преобразуем из формата состояния
-            schedule = []
-            for eq_id, eq_schedule in solution['equipment_schedules'].items():
-                for order_id, start_time_dt, end_time_dt in eq_schedule:
-                    order = next(o for o in task.orders if o.id == order_id)
-                    equipment = next(eq for eq in task.equipment if eq.id == eq_id)
-                    
-                    processing_minutes = int((end_time_dt - start_time_dt).total_seconds() / 60)
-                    setup_time = 30  # Базовое время
-                    
-                    schedule_item = ScheduleItem(
-                        order_id=order_id,
-                        equipment_id=eq_id,
-                        scheduled_start=start_time_dt,
-                        scheduled_end=end_time_dt,
-                        setup_time_minutes=setup_time,
-                        processing_time_minutes=processing_minutes
-                    )
-                    schedule.append(schedule_item)
-        
-        # Расчет метрик
-        total_waste = 0.0
-        total_time = sum((item.scheduled_end - item.scheduled_start).total_seconds() / 3600 for item in schedule)
+    def _search_parallel(self, compiled: CompiledTask):
+        """Параллельный поиск: поддеревья верхних уровней решаются в пуле процессов
+        
+        Рекорд процессы передают друг другу через разделяемую память:
+        у каждого поддерева свой слот, для отсечения берется минимум по слотам.
+        """
+        from src.optimization.parallel import SharedIncumbent, SharedTaskPool, solve_subtree
+        
+        self._dive()
+        
+        # Фронт поиска в ширину, достаточный для загрузки всех процессов
+        frontier = [()]
+        target = 4 * self.n_workers
+        while frontier and len(frontier) < target:
+            self.nodes_explored += 1
+            frontier.extend(child for _, child in self._expand(frontier.pop(0)))
+        self._restore(())
+        
+        if not frontier:
+            self.lower_bound = self.best_value
+            return
         
-        # Группируем по оборудованию для расчета отходов
-        equipment_schedules = {}
-        for item in schedule:
-            if item.equipment_id not in equipment_schedules:
-                equipment_schedules[item.equipment_id] = []
-            equipment_schedules[item.equipment_id].append(item)
+        remaining_time = None
+        if self.deadline is not None:
+            remaining_time = max(self.deadline - time.time(), 1e-3)
+        params = {
+            'max_nodes': max(self.max_nodes - self.nodes_explored, 1),  # общий лимит всех поддеревьев
+            'time_limit_seconds': remaining_time,
+            'stagnation_nodes': self.stagnation_nodes,
+            'search': self.search,
+            'max_open_nodes': self.max_open_nodes
+        }
         
-        for eq_id, eq_schedule in equipment_schedules.items():
-            eq_schedule.sort(key=lambda x: x.scheduled_start)
+        # Поддеревья подключаются к stop_signal по имени
+        stop_name = self.stop_signal.name if self.stop_signal is not None else None
+        with SharedIncumbent(len(frontier), self.best_value) as incumbent, \
+                SharedTaskPool(compiled, min(self.n_workers, len(frontier))) as pool:
+            futures = [
+                pool.submit(solve_subtree, params, path, slot, incumbent.name, len(frontier), stop_name)
+                for slot, path in enumerate(frontier)
+            ]
             
-            prev_order = None
-            for item in eq_schedule:
-                order = next(o for o in task.orders if o.id == item.order_id)
-                
-                if prev_order:
-                    waste_factor = WasteCalculator.calculate_transition_waste(prev_order, order)
-                    total_waste += float(order.quantity_kg) * waste_factor
-                
-                prev_order = order
-        
-        # Загрузка оборудования
-        equipment_utilization = {}
-        for eq in task.equipment:
-            if eq.is_available:
-                eq_items = [item for item in schedule if item.equipment_id == eq.id]
-                if eq_items:
-                    working_time = sum(
-                        (item.scheduled_end - item.scheduled_start).total_seconds() / 3600
-                        for item in eq_items
-                    )
-                    equipment_utilization[eq.id] = min(working_time / task.planning_horizon_hours, 1.0)
-                else:
-                    equipment_utilization[eq.id] = 0.0
-        
-        # Makespan
-        if schedule:
-            makespan = max(item.scheduled_end for item in schedule) - task.start_time
-            makespan_hours = makespan.total_seconds() / 3600
+            # Поддеревья учитываются по мере завершения; граница нерешенных - граница их корней
+            pending_bounds = {future: self._path_bound(path) for future, path in zip(futures, frontier)}
+            self._restore(())
+            lower_bounds = []
+            for future in as_completed(futures):
+                solution_value, solution, nodes_explored, nodes_pruned, stop_reason, lower_bound = future.result()
+                del pending_bounds[future]
+                self.nodes_explored += nodes_explored
+                self.nodes_pruned += nodes_pruned
+                lower_bounds.append(lower_bound)
+                if solution is not None and solution_value < self.solution_value:
+                    self.best_value = self.solution_value = solution_value
+                    self.best_solution = solution
+                if self.stop_reason == 'completed':
+                    self.stop_reason = stop_reason
+                self.lower_bound = min(lower_bounds + list(pending_bounds.values()) + [self.best_value])
+                if self.progress_callback is not None:
+                    self._report_progress()
+    
+    def _assign(self, order: int, equipment: int):
+        """Назначение заказа на оборудование с записью в стек отмены"""
+        prev_order = self.lane_last[equipment]
+        prev_end = self.lane_end[equipment]
+        self.undo_stack.append((prev_order, prev_end, self.waste))
+        
+        # Время переналадки и производства
+        start = prev_end + self.setup[equipment][prev_order + 1][order]
+        end = start + self.processing[order][equipment]
+        
+        if prev_order >= 0:
+            self.waste += self.quantity[order] * self.waste_factors[prev_order][order]
         else:
-            makespan_hours = 0.0
-        
-        optimization_time = time.time() - start_time
+            self.free_lanes[self.lane_process[equipment]] -= 1
         
-        return OptimizationResult(
-            schedule=schedule,
-            total_waste_kg=Decimal(str(total_waste)),
-            total_processing_time_hours=Decimal(str(total_time)),
-            equipment_utilization=equipment_utilization,
-            waste_reduction_percentage=0.0,
-            makespan_hours=makespan_hours,
-            optimization_time_seconds=optimization_time
-        )
+        self.lane_last[equipment] = order
+        self.lane_end[equipment] = end
+        self.assignments.append((order, equipment, start, end))
+    
+    def _transition_cost(self, order: int, equipment: int) -> float:
+        """Отходы при назначении заказа на оборудование в текущем состоянии"""
+        prev_order = self.lane_last[equipment]
+        if prev_order < 0:
+            return 0.0
+        return self.quantity[order] * self.waste_factors[prev_order][order]
+    
+    def _unassign(self):
+        """Отмена последнего назначения"""
+        _, equipment, _, _ = self.assignments.pop()
+        prev_order, prev_end, self.waste = self.undo_stack.pop()
+        
+        if prev_order < 0:
+            self.free_lanes[self.lane_process[equipment]] += 1
+        self.lane_last[equipment] = prev_order
+        self.lane_end[equipment] = prev_end
+    
+    def _calculate_lower_bound(self) -> float:
+        """Расчет нижней границы для отсечения"""
+        # Отходы назначенных заказов (ведутся инкрементально) и оценка снизу для оставшихся
+        lower_bound = self.waste
+        for process, prefix in enumerate(self.bound_prefix[len(self.assignments)]):
+            n_remaining = len(prefix) - 1
+            lower_bound += prefix[n_remaining] - prefix[min(self.free_lanes[process], n_remaining)]
+        return lower_bound
+    
+    def _solution_plan(self, assignments: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int, int, int]]:
+        """План по стеку назначений: переналадка - промежуток после предыдущего заказа линии"""
+        lane_free = {}
+        plan = []
+        for order, equipment, start, end in assignments:
+            plan.append((order, equipment, start, end, start - lane_free.get(equipment, 0), end - start))
+            lane_free[equipment] = end
+        return plan
+    
+    def _heuristic_solve(self, task: OptimizationTask, start_time: float) -> OptimizationResult:
+        """Эвристическое решение для больших задач: жадный диспетчер"""
+        result = GreedyOptimizer().optimize(task)
+        result.optimization_time_seconds = time.time() - start_time
+        result.stop_reason = self.stop_reason
+        result.nodes_explored = self.nodes_explored
+        result.nodes_pruned = self.nodes_pruned
+        result.evaluations += self.nodes_explored
+        return result
+    
+    def _create_result(self, plan: List[Tuple[int, int, int, int, int, int]], task: OptimizationTask,
+                       start_time: float) -> OptimizationResult:
+        """Создание результата оптимизации"""
+        compiled = task.compile()
+        result = _plan_result(compiled, plan, _plan_waste(compiled, plan), start_time)
+        result.stop_reason = self.stop_reason
+        result.nodes_explored = self.nodes_explored
+        result.nodes_pruned = self.nodes_pruned
+        result.optimality_gap = self.optimality_gap
+        return result
 
 
 class HybridOptimizer:
-    """Гибридный оптимизатор, объединяющий генетический алгоритм и метод ветвей и границ"""
+    """Гибридный оптимизатор, объединяющий генетический алгоритм и метод ветвей и границ
     
-    def __init__(self, ga_params=None, bb_max_nodes=10000):
-        self.ga_params = ga_params or {}
+    Задача разбивается на независимые подзадачи по типам процесса; каждая решается
+    подходящим алгоритмом, при n_workers > 1 - параллельно в пуле процессов.
+    """
+    
+    def __init__(self, ga_params=None, bb_max_nodes=1000000, n_workers=1, time_limit_seconds=None,
+                 stagnation_generations=None, stagnation_nodes=None, exact_max_orders=25,
+                 bb_search='depth_first', bb_max_open_nodes=100000, stop_signal=None):
+        self.ga_params = dict(ga_params or {})
+        self.ga_params.setdefault('n_workers', n_workers)
+        self.ga_params.setdefault('time_limit_seconds', time_limit_seconds)
+        self.ga_params.setdefault('stagnation_generations', stagnation_generations)
+        self.bb_params = {
+            'max_nodes': bb_max_nodes,
+            'time_limit_seconds': time_limit_seconds,
+            'stagnation_nodes': stagnation_nodes,
+            'search': bb_search,
+            'max_open_nodes': bb_max_open_nodes
+        }
         self.bb_max_nodes = bb_max_nodes
-        
-        self.ga_optimizer = GeneticAlgorithmOptimizer(**self.ga_params)
-        self.bb_optimizer = BranchAndBoundOptimizer(max_nodes=bb_max_nodes)
+        self.n_workers = n_workers
+        self.time_limit_seconds = time_limit_seconds
+        self.exact_max_orders = exact_max_orders  # до этого числа заказов - точный алгоритм
+        # SharedDeadline задания: передается оптимизаторам подзадач, после останова
+        # еще не начатые подзадачи решаются жадно
+        self.stop_signal = stop_signal
+        self.progress_callback: Optional[ProgressCallback] = None
+        self.components = 0
     
     def optimize(self, task: OptimizationTask) -> OptimizationResult:
         """Гибридная оптимизация"""
         start_time = time.time()
-        
-        # Для малых задач используем точный алгоритм
-        if len(task.orders) <= 15:
-            result = self.bb_optimizer.optimize(task)
+        timer = PhaseTimer()
+        with timer.phase('compile'):
+            compiled = task.compile()
+        with timer.phase('decomposition'):
+            components = compiled.components()
+        self.components = len(components)
+        
+        if len(components) <= 1:
+            # Одна подзадача: алгоритм выбирается по размеру всей задачи
+            optimizer = self._select_optimizer(compiled.n_orders, self.n_workers, stop_signal=self.stop_signal)
+            result = self._solve_subtask(optimizer, compiled, [], compiled.n_orders)
         else:
-            # Для больших задач используем генетический алгоритм
-            result = self.ga_optimizer.optimize(task)
+            with timer.phase('decomposition'):
+                subtasks = [compiled.subset(orders, equipment) for orders, equipment in components]
+            if self.n_workers > 1:
+                results = self._solve_parallel(subtasks)
+            else:
+                results = self._solve_sequential(subtasks, start_time)
+            with timer.phase('merge'):
+                result = self._merge_results(results)
         
         # Корректируем время оптимизации
         result.optimization_time_seconds = time.time() - start_time
         
-        return result 
\ No newline at end of file
+        return _instrument(result, timer, 0)
+    
+    def _select_optimizer(self, n_orders: int, n_workers: int, time_limit_seconds=None, stop_signal=None):
+        """Точный алгоритм для малых задач, генетический - для больших"""
+        if n_orders <= self.exact_max_orders:
+            params = dict(self.bb_params, n_workers=n_workers, stop_signal=stop_signal)
+            optimizer_class = BranchAndBoundOptimizer
+        else:
+            params = dict(self.ga_params, n_workers=n_workers, stop_signal=stop_signal)
+            optimizer_class = GeneticAlgorithmOptimizer
+        if time_limit_seconds is not None:
+            params['time_limit_seconds'] = time_limit_seconds
+        return optimizer_class(**params)
+    
+    def _solve_sequential(self, subtasks: List[CompiledTask], start_time: float) -> List[OptimizationResult]:
+        """Последовательное решение подзадач
+        
+        Ограничение времени делится между подзадачами пропорционально числу заказов.
+        """
+        results = []
+        total_orders = orders_left = sum(subtask.n_orders for subtask in subtasks)
+        for subtask in subtasks:
+            time_limit = None
+            if self.time_limit_seconds is not None:
+                remaining = max(self.time_limit_seconds - (time.time() - start_time), 0.0)
+                time_limit = remaining * subtask.n_orders / orders_left
+            optimizer = self._select_optimizer(subtask.n_orders, self.n_workers, time_limit, self.stop_signal)
+            results.append(self._solve_subtask(optimizer, subtask, results, total_orders))
+            orders_left -= subtask.n_orders
+        return results
+    
+    def _solve_subtask(self, optimizer: Any, subtask: CompiledTask, finished: List[OptimizationResult],
+                       total_orders: int) -> OptimizationResult:
+        """Решение подзадачи с передачей прогресса; после останова - жадно"""
+        if self.stop_signal is not None and self.stop_signal.reached():
+            optimizer = GreedyOptimizer()
+        
+        if self.progress_callback is not None:
+            orders_done = sum(len(result.schedule) for result in finished)
+            waste_done = sum(float(result.total_waste_kg) for result in finished)
+            
+            # События подзадачи дополняются уже решенными подзадачами
+            def report(event: dict, best_schedule: Callable[[], List[ScheduleItem]]):
+                event = dict(event, component=len(finished) + 1, components=self.components)
+                event['progress'] = (orders_done + event.get('progress', 0.0) * subtask.n_orders) / total_orders
+                if event.get('best_waste') is not None:
+                    event['best_waste'] += waste_done
+                self.progress_callback(
+                    event, lambda: [item for result in finished for item in result.schedule] + best_schedule()
+                )
+            optimizer.progress_callback = report
+        
+        return optimizer.optimize(subtask)
+    
+    def _solve_parallel(self, subtasks: List[CompiledTask]) -> List[OptimizationResult]:
+        """Параллельное решение подзадач: каждая целиком в своем рабочем процессе
+        
+        Оптимизаторы подзадач подключаются к stop_signal в рабочем процессе по имени.
+        """
+        from src.optimization.parallel import solve_component
+        
+        # Крупные подзадачи запускаются первыми, чтобы малые не ждали их в очереди
+        queue = sorted(range(len(subtasks)), key=lambda i: -subtasks[i].n_orders)
+        workers = min(self.n_workers, len(subtasks))
+        stop_name = self.stop_signal.name if self.stop_signal is not None else None
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                i: executor.submit(solve_component, self._select_optimizer(subtasks[i].n_orders, 1), subtasks[i], stop_name)
+                for i in queue
+            }
+            
+            # Прогресс - по завершенным подзадачам
+            finished = []
+            for future in as_completed(futures.values()):
+                finished.append(future.result())
+                if self.progress_callback is not None:
+                    self.progress_callback({
+                        'phase': 'hybrid',
+                        'component': len(finished),
+                        'components': len(subtasks),
+                        'progress': len(finished) / len(subtasks),
+                        'best_waste': None
+                    }, lambda: [item for result in finished for item in result.schedule])
+            return [futures[i].result() for i in range(len(subtasks))]
+    
+    @staticmethod
+    def _merge_results(results: List[OptimizationResult]) -> OptimizationResult:
+        """Объединение решений независимых подзадач в одно расписание"""
+        schedule = [item for result in results for item in result.schedule]
+        schedule.sort(key=lambda item: (item.scheduled_start, item.equipment_id))
+        
+        equipment_utilization = {}
+        for result in results:
+            equipment_utilization.update(result.equipment_utilization)
+        
+        stop_reason = next(
+            (result.stop_reason for result in results if result.stop_reason != 'completed'), 'completed'
+        )
+        
+        # Разрыв оценен, только если все подзадачи решены точным алгоритмом
+        total_waste = sum((result.total_waste_kg for result in results), Decimal('0'))
+        optimality_gap = None
+        if all(result.optimality_gap is not None for result in results):
+            lower_bound = sum(float(result.total_waste_kg) * (1 - result.optimality_gap) for result in results)
+            optimality_gap = 1 - lower_bound / float(total_waste) if total_waste > 0 else 0.0
+        
+        # Время этапов суммируется по подзадачам (при параллельном решении - процессорное время)
+        phase_timer = PhaseTimer()
+        for result in results:
+            phase_timer.merge(result.phase_seconds)
+        
+        return OptimizationResult(
+            schedule=schedule,
+            total_waste_kg=total_waste,
+            total_processing_time_hours=sum(
+                (result.total_processing_time_hours for result in results), Decimal('0')
+            ),
+            equipment_utilization=equipment_utilization,
+            waste_reduction_percentage=0.0,
+            makespan_hours=max(result.makespan_hours for result in results),
+            optimization_time_seconds=sum(result.optimization_time_seconds for result in results),
+            fitness_cache_hits=sum(result.fitness_cache_hits for result in results),
+            fitness_cache_misses=sum(result.fitness_cache_misses for result in results),
+            stop_reason=stop_reason,
+            nodes_explored=sum(result.nodes_explored for result in results),
+            nodes_pruned=sum(result.nodes_pruned for result in results),
+            optimality_gap=optimality_gap,
+            phase_seconds=phase_timer.seconds,
+            evaluations=sum(result.evaluations for result in results),
+            # Подзадачи могли решаться в других процессах - берется наибольший пик
+            peak_memory_mb=max(result.peak_memory_mb for result in results)
+        )
@@ -0,0 +1,347 @@
+import random
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+from src.optimization.algorithms import (
+    BranchAndBoundOptimizer, CompiledTask, FitnessCache, GeneticAlgorithmOptimizer, TransitionMatrices
+)
+
+
+# Массивы скомпилированной задачи, передаваемые через разделяемую память
+_SHARED_ARRAYS = [
+    'order_ids', 'equipment_ids', 'quantity', 'priority', 'delivery_date',
+    'capacity', 'equipment_process', 'equipment_available', 'processing_minutes',
+    'dispatch_order'
+]
+_SHARED_MATRICES = ['order_class', 'order_process', 'class_factors', 'base_setup']
+_ALIGNMENT = 64
+
+
+class SharedCompiledTask:
+    """Скомпилированная задача в блоке разделяемой памяти
+
+    Массивы задачи копируются в один блок multiprocessing.shared_memory,
+    рабочим процессам передается только небольшой дескриптор.
+    """
+
+    def __init__(self, compiled: CompiledTask):
+        arrays = {name: getattr(compiled, name) for name in _SHARED_ARRAYS}
+        arrays.update({name: getattr(compiled.matrices, name) for name in _SHARED_MATRICES})
+
+        layout = []
+        offset = 0
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            layout.append((name, offset, array.shape, array.dtype.str))
+            offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+
+        for name, array_offset, shape, dtype in layout:
+            target = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=array_offset)
+            target[...] = arrays[name]
+
+        self.descriptor = {
+            'name': self.shm.name,
+            'layout': layout,
+            'eligible_by_process': [eligible.tolist() for eligible in compiled.eligible_by_process],
+            'fallback_equipment': compiled.fallback_equipment,
+            'start_time': compiled.start_time,
+            'planning_horizon_hours': compiled.planning_horizon_hours
+        }
+
+    @staticmethod
+    def attach(descriptor: dict) -> Tuple[CompiledTask, shared_memory.SharedMemory]:
+        """Восстановление задачи в рабочем процессе без копирования массивов"""
+        # Блоком владеет родительский процесс, он же удаляет его после завершения пула
+        shm = shared_memory.SharedMemory(name=descriptor['name'])
+
+        arrays = {
+            name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            for name, offset, shape, dtype in descriptor['layout']
+        }
+
+        order_ids = arrays['order_ids']
+        equipment_ids = arrays['equipment_ids']
+        matrices = TransitionMatrices(
+            order_index={int(order_id): i for i, order_id in enumerate(order_ids)},
+            equipment_index={int(eq_id): i for i, eq_id in enumerate(equipment_ids)},
+            **{name: arrays[name] for name in _SHARED_MATRICES}
+        )
+
+        compiled = CompiledTask(
+            eligible_by_process=[
+                np.array(eligible, dtype=np.int64) for eligible in descriptor['eligible_by_process']
+            ],
+            fallback_equipment=descriptor['fallback_equipment'],
+            matrices=matrices,
+            start_time=descriptor['start_time'],
+            planning_horizon_hours=descriptor['planning_horizon_hours'],
+            **{name: arrays[name] for name in _SHARED_ARRAYS}
+        )
+        return compiled, shm
+
+    def close(self):
+        """Освобождение блока разделяемой памяти"""
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+class SharedIncumbent:
+    """Рекорды и счетчики узлов поддеревьев метода ветвей и границ в разделяемой памяти
+
+    Каждое поддерево пишет только в свой слот, поэтому блокировки не нужны;
+    для отсечения процессы читают минимум рекордов, для лимита узлов - сумму счетчиков.
+    """
+
+    def __init__(self, n_slots: int, initial: float = float('inf')):
+        self.n_slots = n_slots
+        self.shm = shared_memory.SharedMemory(create=True, size=2 * n_slots * np.dtype(np.float64).itemsize)
+        block = np.ndarray(2 * n_slots, dtype=np.float64, buffer=self.shm.buf)
+        block[:n_slots] = initial
+        block[n_slots:] = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @staticmethod
+    def attach(name: str, n_slots: int) -> Tuple[np.ndarray, np.ndarray, shared_memory.SharedMemory]:
+        """Подключение к рекордам и счетчикам узлов в рабочем процессе"""
+        shm = shared_memory.SharedMemory(name=name)
+        block = np.ndarray(2 * n_slots, dtype=np.float64, buffer=shm.buf)
+        return block[:n_slots], block[n_slots:], shm
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+class SharedDeadline:
+    """Срок останова (time.time()) в разделяемой памяти - сигнал отмены или стопа
+
+    Блок создает задание при запуске и передает оптимизатору как stop_signal;
+    отмена и стоп записывают в него текущее время. Оптимизаторы проверяют срок
+    вместе со своим бюджетом времени, рабочие процессы подключаются к блоку
+    по имени. Бесконечность - срок не задан.
+    """
+
+    def __init__(self, deadline: Optional[float] = None, name: Optional[str] = None):
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=np.dtype(np.float64).itemsize)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.value = np.ndarray(1, dtype=np.float64, buffer=self.shm.buf)
+        if self.owner:
+            self.set(deadline)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedDeadline':
+        """Подключение к сроку в рабочем процессе"""
+        return cls(name=name)
+
+    def set(self, deadline: Optional[float]):
+        # Останов может прийти из другого потока уже после закрытия блока
+        if self.shm is not None:
+            self.value[0] = deadline if deadline is not None else np.inf
+
+    def reached(self) -> bool:
+        return time.time() >= self.value[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Отключение от блока; владелец - создавший его процесс - также удаляет его"""
+        shm, self.shm = self.shm, None
+        if shm is not None:
+            del self.value
+            shm.close()
+            if self.owner:
+                shm.unlink()
+
+
+# Состояние рабочего процесса: задача подключается один раз при старте
+_worker_task: Optional[CompiledTask] = None
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+_worker_fitness_cache: Optional[FitnessCache] = None
+
+
+def _init_worker(descriptor: dict):
+    global _worker_task, _worker_shm
+    _worker_task, _worker_shm = SharedCompiledTask.attach(descriptor)
+
+
+def _evaluate_chunk(genomes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return _worker_task.evaluate_genomes(genomes)
+
+
+def _attach_stop_signal(name: Optional[str]):
+    """Подключение к stop_signal родительского процесса; без имени - None"""
+    return SharedDeadline.attach(name) if name is not None else nullcontext()
+
+
+class SharedTaskPool:
+    """Пул процессов с задачей, переданной через разделяемую память
+
+    Используется как контекстный менеджер на время одного запуска оптимизации:
+    задача передается рабочим процессам один раз при их старте.
+    """
+
+    def __init__(self, compiled: CompiledTask, workers: int):
+        self.compiled = compiled
+        self.workers = workers
+        self.shared_task = None
+        self.executor = None
+
+    def __enter__(self):
+        self.shared_task = SharedCompiledTask(self.compiled)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.shared_task.descriptor,)
+        )
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        if self.shared_task is not None:
+            self.shared_task.close()
+            self.shared_task = None
+
+    def submit(self, fn, *args) -> Future:
+        return self.executor.submit(fn, *args)
+
+
+class ParallelEvaluator(SharedTaskPool):
+    """Пакетная оценка популяции в пуле процессов
+
+    По процессам распределяются только строки матрицы геномов.
+    """
+
+    def evaluate_genomes(self, genomes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Оценка популяции: строки распределяются между рабочими процессами"""
+        genomes = np.asarray(genomes)
+        if self.executor is None or len(genomes) < 2 * self.workers:
+            return self.compiled.evaluate_genomes(genomes)
+
+        # Геномы передаются компактно: индексы оборудования помещаются в int32
+        chunks = np.array_split(genomes.astype(np.int32, copy=False), self.workers)
+        results = list(self.executor.map(_evaluate_chunk, chunks))
+
+        total_waste = np.concatenate([waste for waste, _ in results])
+        total_time = np.concatenate([processing_time for _, processing_time in results])
+        return total_waste, total_time
+
+
+def evolve_island(genomes: np.ndarray, fitness: np.ndarray, params: dict, seed: int,
+                  stop_name: Optional[str]) -> Tuple[np.ndarray, np.ndarray, Tuple[int, int, int], str]:
+    """Эволюция популяции одного острова в рабочем процессе
+
+    Популяция передается матрицей геномов с уже вычисленной приспособленностью,
+    возвращается в том же виде после params['generations'] поколений вместе
+    с числом попаданий и промахов кэша приспособленности, числом оценок за эпоху
+    и причиной останова. Эпоха прерывается после текущего поколения, если
+    наступил срок stop_signal родительского процесса (stop_name).
+    """
+    global _worker_fitness_cache
+
+    random.seed(seed)
+    optimizer = GeneticAlgorithmOptimizer(**params)
+    optimizer._register_operators(_worker_task)
+    optimizer._start_budget(time.time())
+
+    # Кэш живет в процессе между эпохами и общий для его островов: задача одна
+    if optimizer.fitness_cache_size:
+        if _worker_fitness_cache is None:
+            _worker_fitness_cache = FitnessCache(optimizer.fitness_cache_size)
+        optimizer.fitness_cache = _worker_fitness_cache
+
+    cache = optimizer.fitness_cache
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+
+    population = optimizer.population_from_genomes(genomes, fitness)
+    with _attach_stop_signal(stop_name) as optimizer.stop_signal:
+        population, _ = optimizer._evolve(population, _worker_task, optimizer._create_stats())
+    optimizer.stop_signal = None
+
+    # Лучшее решение эпохи возвращается на остров вместо худшего индивидуума
+    best = optimizer.hall_of_fame[0]
+    if best not in population:
+        worst = min(range(len(population)), key=lambda i: population[i].fitness)
+        population[worst] = best
+
+    genomes, fitness = optimizer.population_to_genomes(population)
+
+    if cache is not None:
+        hits, misses = cache.hits - hits, cache.misses - misses
+    return genomes, fitness, (hits, misses, optimizer.evaluations), optimizer.stop_reason
+
+
+def solve_subtree(params: dict, prefix: Tuple[int, ...], slot: int, incumbent_name: str, n_slots: int,
+                  stop_name: Optional[str]) -> tuple:
+    """Метод ветвей и границ в поддереве с заданными первыми назначениями
+
+    Возвращает отходы и назначения собственного лучшего решения (None - не найдено),
+    число просмотренных и отсеченных узлов, причину останова и нижнюю границу поддерева.
+    """
+    optimizer = BranchAndBoundOptimizer(**params)
+    optimizer._start_search(time.time())
+    optimizer._init_search(_worker_task)
+
+    values, nodes, shm = SharedIncumbent.attach(incumbent_name, n_slots)
+    stop_signal = SharedDeadline.attach(stop_name) if stop_name is not None else None
+    try:
+        optimizer.shared_incumbent = (values, nodes, slot)
+        optimizer.stop_signal = stop_signal
+        optimizer.best_value = float(values.min())
+        optimizer._restore(prefix)
+        optimizer._search()
+        return (
+            optimizer.solution_value, optimizer.best_solution, optimizer.nodes_explored,
+            optimizer.nodes_pruned, optimizer.stop_reason, optimizer.lower_bound
+        )
+    finally:
+        optimizer.shared_incumbent = None
+        optimizer.stop_signal = None
+        del values, nodes
+        shm.close()
+        if stop_signal is not None:
+            stop_signal.close()
+
+
+def solve_component(optimizer, subtask: CompiledTask, stop_name: Optional[str]):
+    """Решение подзадачи гибридного оптимизатора в рабочем процессе со stop_signal родительского"""
+    with _attach_stop_signal(stop_name) as optimizer.stop_signal:
+        try:
+            return optimizer.optimize(subtask)
+        finally:
+            optimizer.stop_signal = None
@@ -0,0 +1,111 @@
+import hashlib
+import sys
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.models.production import Equipment, OrderStatus, ProcessType, ProductionOrder
+
+
+# Поля записей: их же выбирают проекционные запросы и учитывает отпечаток задачи в кэше
+ORDER_FIELDS = (
+    'id', 'process_type', 'material_id', 'quantity_kg', 'thickness_mm',
+    'color', 'caliber', 'delivery_date', 'priority'
+)
+EQUIPMENT_FIELDS = ('id', 'process_type', 'capacity_per_hour', 'setup_time_minutes', 'is_available')
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Одна копия строки на все заказы с этим значением"""
+    return sys.intern(value) if value is not None else None
+
+
+def _float(value) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+class OrderRecord:
+    """Заказ в оптимизаторе: только нужные поля, числа - float, без связи с сессией ORM
+
+    Совместим с ProductionOrder по чтению полей, которые использует оптимизатор;
+    сериализуется pickle без состояния SQLAlchemy.
+    """
+    __slots__ = ORDER_FIELDS
+
+    def __init__(self, id: int, process_type: ProcessType, material_id: Optional[int], quantity_kg: float,
+                 thickness_mm: Optional[float], color: Optional[str], caliber: Optional[str],
+                 delivery_date: date, priority: Optional[int]):
+        self.id = id
+        self.process_type = process_type
+        self.material_id = material_id
+        self.quantity_kg = quantity_kg
+        self.thickness_mm = thickness_mm
+        self.color = _intern(color)
+        self.caliber = _intern(caliber)
+        self.delivery_date = delivery_date
+        self.priority = priority
+
+    @classmethod
+    def from_order(cls, order) -> 'OrderRecord':
+        """Запись по заказу ORM или строке проекционного запроса"""
+        return cls(
+            order.id, order.process_type, order.material_id, float(order.quantity_kg),
+            _float(order.thickness_mm), order.color, order.caliber, order.delivery_date, order.priority
+        )
+
+    def __repr__(self):
+        return f"OrderRecord(id={self.id}, process_type={self.process_type.value})"
+
+
+class EquipmentRecord:
+    """Оборудование в оптимизаторе без связи с сессией ORM"""
+    __slots__ = EQUIPMENT_FIELDS
+
+    def __init__(self, id: int, process_type: ProcessType, capacity_per_hour: Optional[float],
+                 setup_time_minutes: Optional[int], is_available: bool = True):
+        self.id = id
+        self.process_type = process_type
+        self.capacity_per_hour = capacity_per_hour
+        self.setup_time_minutes = setup_time_minutes
+        self.is_available = is_available
+
+    @classmethod
+    def from_equipment(cls, eq) -> 'EquipmentRecord':
+        """Запись по оборудованию ORM или строке проекционного запроса"""
+        return cls(
+            eq.id, eq.process_type, _float(eq.capacity_per_hour), eq.setup_time_minutes, bool(eq.is_available)
+        )
+
+    def __repr__(self):
+        return f"EquipmentRecord(id={self.id}, process_type={self.process_type.value})"
+
+
+def order_fingerprint(order) -> str:
+    """Хэш полей заказа, от которых зависит расписание (ORDER_FIELDS)
+
+    Сохраняется вместе с расписанием: инкрементальная переоптимизация
+    планирует заново заказы, у которых отпечаток изменился.
+    """
+    record = OrderRecord.from_order(order)
+    return hashlib.sha256(repr(tuple(getattr(record, name) for name in ORDER_FIELDS)).encode()).hexdigest()
+
+
+def load_planning_data(db: Session) -> Tuple[List[OrderRecord], List[EquipmentRecord]]:
+    """Заказы к планированию и доступное оборудование для оптимизатора
+
+    Проекционные запросы выбирают только нужные столбцы: ORM-объекты не создаются,
+    в identity map сессии ничего не попадает, и записи не зависят от сессии.
+    Порядок - по id, как у отпечатка задачи в кэше результатов.
+    """
+    orders = [
+        OrderRecord.from_order(row)
+        for row in db.query(*(getattr(ProductionOrder, name) for name in ORDER_FIELDS))
+        .filter(ProductionOrder.status == OrderStatus.PLANNED).order_by(ProductionOrder.id)
+    ]
+    equipment = [
+        EquipmentRecord.from_equipment(row)
+        for row in db.query(*(getattr(Equipment, name) for name in EQUIPMENT_FIELDS))
+        .filter(Equipment.is_available == True).order_by(Equipment.id)
+    ]
+    return orders, equipment
@@ -1,13 +1,13 @@
 #!/usr/bin/env python3
 """
-Тестирование исправленных алгоритмов оптимизации
+Тестирование алгоритмов оптимизации
 """
 
 import sys
 import os
 sys.path.append('.')
 
-from src.optimization.algorithms_fixed import *
+from src.optimization.algorithms import *
 from src.models.production import *
 from datetime import datetime, timedelta
 from decimal import Decimal
@@ -85,6 +85,65 @@ def test_waste_calculator():
     
     return True
 
+def test_transition_matrices():
+    """Тестирование предвычисленных матриц переходов"""
+    print("\n=== Тестирование TransitionMatrices ===")
+    
+    orders, equipment = create_test_data()
+    matrices = WasteCalculator.build_matrices(orders, equipment)
+    
+    # Матрица должна совпадать с попарным расчетом
+    waste_factors = matrices.waste_factors
+    for i, order1 in enumerate(orders):
+        for j, order2 in enumerate(orders):
+            expected = WasteCalculator.calculate_transition_waste(order1, order2)
+            assert waste_factors[i, j] == expected, f"Расхождение коэффициента ({i}, {j})"
+    
+    for e, eq in enumerate(equipment):
+        for j, order in enumerate(orders):
+            assert matrices.setup_time(e, j) == WasteCalculator.calculate_setup_time(order, eq)
+            for i, prev_order in enumerate(orders):
+                expected = WasteCalculator.calculate_setup_time(order, eq, prev_order)
+                assert matrices.setup_time(e, j, i) == expected, f"Расхождение переналадки ({e}, {i}, {j})"
+    
+    print(f"Классов перехода: {matrices.class_factors.shape[0]} для {len(orders)} заказов")
+    return True
+
+def test_compiled_task():
+    """Тестирование скомпилированной задачи"""
+    print("\n=== Тестирование CompiledTask ===")
+    
+    orders, equipment = create_test_data()
+    task = OptimizationTask(
+        orders=orders,
+        equipment=equipment,
+        start_time=datetime.now(),
+        planning_horizon_hours=168
+    )
+    compiled = task.compile()
+    
+    assert task.compile() is compiled, "Задача компилируется повторно"
+    
+    for i, order in enumerate(orders):
+        assert compiled.order_index[order.id] == i
+        assert compiled.order_ids[i] == order.id
+        
+        # Подходящее оборудование совпадает по типу процесса
+        eligible = [equipment[e].id for e in compiled.eligible_for(i)]
+        expected = [eq.id for eq in equipment if eq.process_type == order.process_type and eq.is_available]
+        assert eligible == expected, f"Неверный список оборудования для заказа {order.id}"
+        
+        for e, eq in enumerate(equipment):
+            expected_minutes = int((float(order.quantity_kg) / float(eq.capacity_per_hour)) * 60)
+            assert compiled.processing_minutes[i, e] == expected_minutes
+    
+    # Порядок запуска - по приоритету и сроку поставки
+    dispatch = [orders[i].id for i in compiled.dispatch_order]
+    expected_dispatch = [o.id for o in sorted(orders, key=lambda o: (o.priority, o.delivery_date))]
+    assert dispatch == expected_dispatch, "Неверный порядок запуска заказов"
+    
+    return True
+
 def test_genetic_algorithm():
     """Тестирование генетического алгоритма"""
     print("\n=== Тестирование GeneticAlgorithmOptimizer ===")
@@ -133,6 +192,469 @@ def test_genetic_algorithm():
         traceback.print_exc()
         return False
 
+def test_batch_evaluation():
+    """Тестирование пакетной оценки популяции"""
+    print("\n=== Тестирование пакетной оценки ===")
+    
+    orders, equipment = create_test_data()
+    task = OptimizationTask(
+        orders=orders,
+        equipment=equipment,
+        start_time=datetime.now(),
+        planning_horizon_hours=168
+    )
+    
+    optimizer = GeneticAlgorithmOptimizer(population_size=10, generations=5)
+    optimizer._setup_deap()
+    population = [optimizer.create_individual(task) for _ in range(10)]
+    
+    total_waste, total_time = task.compile().evaluate_genomes(population)
+    
+    # Пакетная оценка совпадает с оценкой по расписанию
+    for i, individual in enumerate(population):
+        waste, processing_time = optimizer.evaluate_individual(individual, task)
+        assert abs(total_waste[i] - waste) < 1e-6, f"Расхождение отходов у индивидуума {i}"
+        assert abs(total_time[i] - processing_time) < 1e-6, f"Расхождение времени у индивидуума {i}"
+    
+    return True
+
+def test_fitness_cache():
+    """Тестирование кэша приспособленности"""
+    print("\n=== Тестирование FitnessCache ===")
+    
+    cache = FitnessCache(max_size=2)
+    genomes = np.array([[0, 1, 2], [0, 1, 2], [2, 1, 0], [1, 1, 1]])
+    keys = cache.genome_keys(genomes)
+    assert keys[0] == keys[1] and keys[0] != keys[2], "Некорректные ключи геномов"
+    
+    # Вытесняется давно не использованная запись
+    cache.put(keys[0], (1.0, 1.0))
+    cache.put(keys[2], (2.0, 2.0))
+    assert cache.get(keys[0]) == (1.0, 1.0)
+    cache.put(keys[3], (3.0, 3.0))
+    assert cache.get(keys[2]) is None, "Не вытеснена давно не использованная запись"
+    assert cache.get(keys[0]) == (1.0, 1.0), "Вытеснена недавно использованная запись"
+    assert (cache.hits, cache.misses) == (2, 1), "Некорректные счетчики кэша"
+    
+    orders, equipment = create_test_data()
+    task = OptimizationTask(
+        orders=orders,
+        equipment=equipment,
+        start_time=datetime.now(),
+        planning_horizon_hours=168
+    )
+    
+    # Кэш не меняет ход поиска, только исключает повторные оценки
+    random.seed(7)
+    cached = GeneticAlgorithmOptimizer(population_size=20, generations=10).optimize(task)
+    random.seed(7)
+    uncached = GeneticAlgorithmOptimizer(population_size=20, generations=10, fitness_cache_size=0).optimize(task)
+    
+    print(f"Попаданий: {cached.fitness_cache_hits}, промахов: {cached.fitness_cache_misses}")
+    
+    assert cached.total_waste_kg == uncached.total_waste_kg, "Кэш изменил результат оптимизации"
+    assert cached.fitness_cache_hits > 0, "Нет попаданий в кэш"
+    assert uncached.fitness_cache_hits == uncached.fitness_cache_misses == 0
+    
+    return True
+
+def test_parallel_evaluation():
+    """Тестирование параллельной оценки в пуле процессов"""
+    print("\n=== Тестирование ParallelEvaluator ===")
+    
+    from src.optimization.parallel import ParallelEvaluator
+    
+    orders, equipment = create_test_data()
+    task = OptimizationTask(
+        orders=orders,
+        equipment=equipment,
+        start_time=datetime.now(),
+        planning_horizon_hours=168
+    )
+    compiled = task.compile()
+    
+    optimizer = GeneticAlgorithmOptimizer(population_size=10, generations=5)
+    optimizer._setup_deap()
+    population = [optimizer.create_individual(task) for _ in range(20)]
+    
+    expected_waste, expected_time = compiled.evaluate_genomes(population)
+    with ParallelEvaluator(compiled, workers=2) as evaluator:
+        total_waste, total_time = evaluator.evaluate_genomes(population)
+    
+    assert np.allclose(total_waste, expected_waste), "Расхождение отходов при параллельной оценке"
+    assert np.allclose(total_time, expected_time), "Расхождение времени при параллельной оценке"
+    
+    # Оптимизатор в параллельном режиме планирует все заказы
+    result = GeneticAlgorithmOptimizer(population_size=20, generations=5, n_workers=2).optimize(task)
+    assert len(result.schedule) == len(orders), "Не все заказы запланированы"
+    
+    return True
+
+def test_island_genetic_algorithm():
+    """Тестирование островной модели генетического алгоритма"""
+    print("\n=== Тестирование IslandGeneticOptimizer ===")
+    
+    orders, equipment = create_test_data()
+    task = OptimizationTask(
+        orders=orders,
+        equipment=equipment,
+        start_time=datetime.now(),
+        planning_horizon_hours=168
+    )
+    
+    optimizer = IslandGeneticOptimizer(
+        population_size=10,
+        generations=6,
+        n_islands=2,
+        migration_interval=3,
+        migration_size=1
+    )
+    result = optimizer.optimize(task)
+    
+    print(f"Общие отходы: {result.total_waste_kg:.2f} кг")
+    print(f"Время выполнения: {result.optimization_time_seconds:.2f} сек")
+    
+    assert len(result.schedule) == len(orders), "Не все заказы запланированы"
+    assert result.total_waste_kg >= 0, "Отрицательные отходы"
+    
+    # Миграция по кольцу: лучшие особи острова замещают худших на следующем
+    genomes = [np.full((3, 2), i, dtype=np.int32) for i in range(2)]
+    fitness = [np.array([[1.0, 0.0], [3.0, 0.0], [2.0, 0.0]]) for _ in range(2)]
+    migrated = optimizer._migrate(list(zip(genomes, fitness)))
+    assert migrated[1][0][1].tolist() == [0, 0], "Мигрант не попал на следующий остров"
+    assert migrated[1][1][1].tolist() == [1.0, 0.0], "Приспособленность мигранта не перенесена"
+    assert migrated[0][0][1].tolist() == [1, 1], "Миграция не замкнута в кольцо"
+    
+    return True
+
+def test_array_genetic_algorithm():
+    """Тестирование генетического алгоритма на матрице геномов"""
+    print("\n=== Тестирование ArrayGeneticOptimizer ===")
+    
+    orders, equipment = create_test_data()
+    task = OptimizationTask(
+        orders=orders,
+        equipment=equipment,
+        start_time=datetime.now(),
+        planning_horizon_hours=168
+    )
+    compiled = task.compile()
+    
+    optimizer = ArrayGeneticOptimizer(population_size=21, generations=8, seed=5)
+    events = []
+    optimizer.progress_callback = lambda event, best_schedule: events.append(event)
+    result = optimizer.optimize(task)
+    print(f"Общие отходы: {result.total_waste_kg:.2f} кг, оценок: {result.evaluations}")
+    
+    assert len(result.schedule) == len(orders), "Не все заказы запланированы"
+    assert optimizer.best_genome.dtype == np.int32
+    for order, gene in enumerate(optimizer.best_genome.tolist()):
+        assert gene in compiled.eligible_for(order).tolist(), "Ген вне допустимого оборудования"
+    assert abs(float(result.total_waste_kg) - optimizer.best_fitness[0]) < 1e-6
+    assert [event['generation'] for event in events] == list(range(9))
+    assert min(event['min_waste'] for event in events) >= optimizer.best_fitness[0] - 1e-9
+    assert result.evaluations == result.fitness_cache_hits + result.fitness_cache_misses
+    
+    # Одинаковое зерно - одинаковый результат; без кэша - те же решения
+    repeat = ArrayGeneticOptimizer(population_size=21, generations=8, seed=5, fitness_cache_size=0).optimize(task)
+    assert repeat.total_waste_kg == result.total_waste_kg
+    
+    # Турнир выбирает лучшего из участников, сравнивая отходы, затем время
+    fitness = np.array([[3.0, 1.0], [1.0, 5.0], [1.0, 2.0], [2.0, 0.0]])
+    optimizer.tournament_size = 50
+    optimizer.rng = np.random.default_rng(0)
+    assert optimizer._tournament(fitness).tolist() == [2, 2, 2, 2]
+    
+    return True
+
+def test_lane_reuse():
+    """Тестирование оценки с пересчетом только изменившихся линий"""
+    print("\n=== Тестирование пересчета по линиям ===")
+    
+    orders, equipment = create_test_data()
+    task = OptimizationTask(
+        orders=orders,
+        equipment=equipment,
+        start_time=datetime.now(),
+        planning_horizon_hours=168
+    )
+    compiled = task.compile()
+    
+    # Сумма стоимостей линий совпадает с пакетной оценкой генома
+    optimizer = ArrayGeneticOptimizer(seed=3)
+    optimizer.rng = np.random.default_rng(3)
+    optimizer._init_genes(compiled)
+    genomes = optimizer._random_genes(np.arange(compiled.n_orders), (12, compiled.n_orders))
+    genomes[0, 0] = -1
+    total_waste, total_time = compiled.evaluate_genomes(genomes)
+    lane_waste, lane_minutes = compiled.lane_costs(genomes)
+    assert np.allclose(lane_waste.sum(axis=1), total_waste)
+    assert np.allclose(lane_minutes.sum(axis=1) / 60, total_time)
+    
+    # Маска линий: отмеченные считаются так же, остальные - нули
+    mask = np.random.default_rng(0).random(lane_waste.shape) < 0.5
+    masked_waste, masked_minutes = compiled.lane_costs(genomes, mask)
+    assert np.allclose(masked_waste, np.where(mask, lane_waste, 0))
+    assert np.allclose(masked_minutes, np.where(mask, lane_minutes, 0))
+    
+    # Унаследованные и пересчитанные линии дают ту же приспособленность поколений, с кэшем и без
+    for cache_size in (0, 10000):
+        optimizer = ArrayGeneticOptimizer(population_size=30, generations=15, seed=4,
+                                          fitness_cache_size=cache_size, reuse_lanes=True)
+        update_best = optimizer._update_best
+        
+        def check_population(genomes, fitness):
+            total_waste, total_time = compiled.evaluate_genomes(genomes)
+            assert np.allclose(fitness[:, 0], total_waste), "Расхождение отходов при пересчете по линиям"
+            assert np.allclose(fitness[:, 1], total_time), "Расхождение времени при пересчете по линиям"
+            return update_best(genomes, fitness)
+        
+        optimizer._update_best = check_population
+        result = optimizer.optimize(task)
+        batch = ArrayGeneticOptimizer(population_size=30, generations=15, seed=4,
+                                      fitness_cache_size=cache_size, reuse_lanes=False).optimize(task)
+        assert abs(float(result.total_waste_kg) - float(batch.total_waste_kg)) < 1e-6
+    
+    return True
+
+def test_beam_truncation():
+    """Усечение очереди поиска по границе не выдается за доказанный оптимум"""
+    print("\n=== Тестирование усечения очереди BranchAndBoundOptimizer ===")
+    
+    equipment = [
+        Equipment(
+            id=i + 1, name=f'Линия-{i + 1}', process_type=process_type,
+            capacity_per_hour=Decimal(str(80 + 10 * i)), setup_time_minutes=20 + 5 * i, is_available=True
+        )
+        for i, process_type in enumerate([ProcessType.EXTRUSION] * 2 + [ProcessType.RINGING] * 2)
+    ]
+    
+    truncated = 0
+    for seed in range(20):
+        rnd = random.Random(seed)
+        orders = [
+            ProductionOrder(
+                id=i + 1, order_number=f'ORD-{i + 1:03d}', product_type=ProductType.SHELL,
+                process_type=rnd.choice([ProcessType.EXTRUSION, ProcessType.RINGING]),
+                material_id=rnd.randint(1, 4), quantity_kg=Decimal(str(rnd.randint(50, 800))),
+                color=rnd.choice(['красный', 'синий', 'белый']), caliber=f'D{rnd.randint(50, 300)}',
+                order_date=datetime.now().date(),
+                delivery_date=(datetime.now() + timedelta(days=rnd.randint(1, 20))).date(),
+                priority=rnd.randint(1, 5)
+            )
+            for i in range(12)
+        ]
+        task = OptimizationTask(orders=orders, equipment=equipment, start_time=datetime.now())
+        
+        exact = BranchAndBoundOptimizer().optimize(task)
+        beam = BranchAndBoundOptimizer(search='best_first', max_open_nodes=4).optimize(task)
+        if beam.stop_reason == 'beam_truncated':
+            truncated += 1
+        else:
+            # Без усечения поиск по границе доказывает оптимум
+            assert beam.stop_reason == 'completed' and beam.optimality_gap == 0.0
+            assert abs(float(beam.total_waste_kg) - float(exact.total_waste_kg)) < 1e-6
+    
+    print(f"Усечено запусков: {truncated} из 20")
+    assert truncated > 0, "Очередь ни разу не переполнилась"
+    
+    return True
+
+def test_concurrent_optimizers():
+    """Тестирование одновременных запусков генетического алгоритма в потоках"""
+    print("\n=== Тестирование одновременных запусков ===")
+    import pickle
+    from concurrent.futures import ThreadPoolExecutor
+    from deap import creator
+    
+    orders, equipment = create_test_data()
+    
+    def run(n_orders):
+        task = OptimizationTask(orders=orders[:n_orders], equipment=equipment, start_time=datetime.now())
+        return GeneticAlgorithmOptimizer(population_size=20, generations=15).optimize(task)
+    
+    sizes = [1, 2, 3, 4] * 2
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(run, sizes))
+    
+    for n_orders, result in zip(sizes, results):
+        assert len(result.schedule) == n_orders, "Запуски смешали популяции"
+    assert not hasattr(creator, 'Individual'), "Глобальные типы deap.creator не создаются"
+    
+    # Индивидуумы и оптимизатор передаются в другие процессы
+    individual = GenomeIndividual([0, 1, 2])
+    individual.fitness.values = (1.0, 2.0)
+    restored = pickle.loads(pickle.dumps(individual))
+    assert restored == individual and restored.fitness.values == (1.0, 2.0)
+    pickle.dumps(GeneticAlgorithmOptimizer())
+    
+    return True
+
+def test_branch_and_bound_optimality():
+    """Проверка точности метода ветвей и границ полным перебором"""
+    print("\n=== Тестирование оптимальности BranchAndBoundOptimizer ===")
+    
+    orders, equipment = create_test_data()
+    equipment = equipment + [
+        Equipment(
+            id=4, name='Экструдер-2', process_type=ProcessType.EXTRUSION,
+            capacity_per_hour=Decimal('120'), setup_time_minutes=25, is_available=True
+        ),
+        Equipment(
+            id=5, name='Кольцеватель-2', process_type=ProcessType.RINGING,
+            capacity_per_hour=Decimal('90'), setup_time_minutes=15, is_available=True
+        )
+    ]
+    
+    colors = ['красный', 'синий', 'белый']
+    for i in range(6):
+        orders.append(ProductionOrder(
+            id=i + 20, order_number=f'ORD-{i + 20:03d}', product_type=ProductType.SHELL,
+            process_type=ProcessType.EXTRUSION if i % 2 else ProcessType.RINGING,
+            material_id=(i % 2) + 1, quantity_kg=Decimal(str(150 + 70 * i)),
+            color=colors[i % 3], caliber=f'D{60 + 40 * i}',
+            order_date=datetime.now().date(),
+            delivery_date=(datetime.now() + timedelta(days=i % 4 + 2)).date(), priority=1
+        ))
+    
+    task = OptimizationTask(
+        orders=orders,
+        equipment=equipment,
+        start_time=datetime.now(),
+        planning_horizon_hours=168
+    )
+    
+    optimizer = BranchAndBoundOptimizer()
+    result = optimizer.optimize(task)
+    
+    # Полный перебор назначений в том же порядке ветвления
+    search = BranchAndBoundOptimizer()
+    search._init_search(task.compile())
+    best = [float('inf')]
+    
+    def enumerate_assignments(depth):
+        if depth == len(search.branch_order):
+            best[0] = min(best[0], search.waste)
+            return
+        order = search.branch_order[depth]
+        for equipment_index in search.eligible[order]:
+            search._assign(order, equipment_index)
+            enumerate_assignments(depth + 1)
+            search._unassign()
+    
+    enumerate_assignments(0)
+    
+    print(f"Ветви и границы: {float(result.total_waste_kg):.2f} кг, перебор: {best[0]:.2f} кг, "
+          f"узлов: {optimizer.nodes_explored}")
+    
+    assert result.stop_reason == 'completed'
+    assert abs(float(result.total_waste_kg) - best[0]) < 1e-6, "Метод ветвей и границ не нашел оптимум"
+    assert result.optimality_gap == 0.0 and result.nodes_explored == optimizer.nodes_explored
+    
+    # Поиск по границе и параллельный поиск по поддеревьям находят тот же оптимум
+    for params in ({'search': 'best_first'}, {'n_workers': 2}, {'search': 'best_first', 'n_workers': 2}):
+        other = BranchAndBoundOptimizer(**params).optimize(task)
+        print(f"{params}: {float(other.total_waste_kg):.2f} кг, узлов: {other.nodes_explored}, "
+              f"отсечено: {other.nodes_pruned}")
+        assert other.stop_reason == 'completed' and other.optimality_gap == 0.0
+        assert abs(float(other.total_waste_kg) - best[0]) < 1e-6, f"Оптимум не найден: {params}"
+    
+    # Усеченная очередь узлов не теряет допустимость, разрыв остается корректным
+    beam = BranchAndBoundOptimizer(search='best_first', max_open_nodes=2).optimize(task)
+    assert len(beam.schedule) == len(orders)
+    assert float(beam.total_waste_kg) >= best[0] - 1e-6
+    assert 0.0 <= beam.optimality_gap <= 1.0
+    
+    return True
+
+def test_anytime_stop():
+    """Тестирование ограничения времени и останова по застою"""
+    print("\n=== Тестирование досрочного останова ===")
+    
+    orders, equipment = create_test_data()
+    task = OptimizationTask(
+        orders=orders,
+        equipment=equipment,
+        start_time=datetime.now(),
+        planning_horizon_hours=168
+    )
+    
+    result = GeneticAlgorithmOptimizer(population_size=20, generations=10000, time_limit_seconds=0.5).optimize(task)
+    print(f"ГА: {result.stop_reason}, {result.optimization_time_seconds:.2f} сек")
+    assert result.stop_reason in ('time_limit', 'stagnation'), "ГА не остановлен по лимиту"
+    assert result.optimization_time_seconds < 5, "Лимит времени не соблюден"
+    assert len(result.schedule) == len(orders), "Не все заказы запланированы"
+    
+    result = GeneticAlgorithmOptimizer(population_size=20, generations=10000, stagnation_generations=5).optimize(task)
+    assert result.stop_reason == 'stagnation', "ГА не остановлен по застою"
+    
+    # Метод ветвей и границ возвращает лучшее найденное решение
+    result = BranchAndBoundOptimizer(max_nodes=10000, stagnation_nodes=1).optimize(task)
+    print(f"Ветви и границы: {result.stop_reason}")
+    assert result.stop_reason == 'stagnation', "Метод ветвей и границ не остановлен по застою"
+    assert len(result.schedule) == len(orders), "Не все заказы запланированы"
+    
+    result = BranchAndBoundOptimizer(max_nodes=10000).optimize(task)
+    assert result.stop_reason == 'completed'
+    
+    return True
+
+def test_parallel_stop():
+    """Досрочный останов доходит до рабочих процессов"""
+    print("\n=== Тестирование останова параллельных оптимизаторов ===")
+    import threading
+    from src.optimization.parallel import SharedDeadline
+    
+    equipment = [
+        Equipment(
+            id=i + 1, name=f'Линия-{i + 1}', process_type=process_type,
+            capacity_per_hour=Decimal(str(80 + 10 * i)), setup_time_minutes=20 + 5 * i, is_available=True
+        )
+        for i, process_type in enumerate([ProcessType.EXTRUSION] * 3 + [ProcessType.RINGING] * 3)
+    ]
+    
+    rnd = random.Random(7)
+    orders = [
+        ProductionOrder(
+            id=i + 1, order_number=f'ORD-{i + 1:03d}', product_type=ProductType.SHELL,
+            process_type=ProcessType.EXTRUSION if i < 28 else ProcessType.RINGING,
+            material_id=rnd.randint(1, 4), quantity_kg=Decimal(str(rnd.randint(50, 800))),
+            color=rnd.choice(['красный', 'синий', 'белый']), caliber=f'D{rnd.randint(50, 300)}',
+            order_date=datetime.now().date(),
+            delivery_date=(datetime.now() + timedelta(days=rnd.randint(1, 20))).date(),
+            priority=rnd.randint(1, 5)
+        )
+        for i in range(56)
+    ]
+    
+    stop_signal = SharedDeadline()
+    cases = [
+        # Одна эпоха на весь запуск: без передачи останова острова работали бы до конца
+        (IslandGeneticOptimizer(population_size=20, generations=10 ** 6, n_islands=2,
+                                migration_interval=10 ** 6, stop_signal=stop_signal), orders),
+        (BranchAndBoundOptimizer(max_nodes=10 ** 9, n_workers=2, stop_signal=stop_signal), orders[:28]),
+        (HybridOptimizer(ga_params={'population_size': 20, 'generations': 10 ** 6},
+                         n_workers=2, exact_max_orders=5, stop_signal=stop_signal), orders),
+    ]
+    for optimizer, task_orders in cases:
+        task = OptimizationTask(orders=task_orders, equipment=equipment, start_time=datetime.now())
+        # Так останавливает задание очередь заданий (OptimizationJobQueue.stop)
+        stop_signal.set(None)
+        timer = threading.Timer(1.0, lambda: stop_signal.set(time.time()))
+        timer.start()
+        start = time.time()
+        result = optimizer.optimize(task)
+        elapsed = time.time() - start
+        timer.cancel()
+        print(f"{type(optimizer).__name__}: {result.stop_reason}, {elapsed:.2f} сек")
+        
+        assert elapsed < 5, f"{type(optimizer).__name__}: рабочие процессы не остановлены"
+        assert result.stop_reason == 'time_limit'
+        assert len(result.schedule) == len(task_orders), "Не все заказы запланированы"
+    stop_signal.close()
+    
+    return True
+
 def test_branch_and_bound():
     """Тестирование алгоритма ветвей и границ"""
     print("\n=== Тестирование BranchAndBoundOptimizer ===")
@@ -163,6 +685,10 @@ def test_branch_and_bound():
         assert len(result.schedule) == len(small_orders), "Не все заказы запланированы"
         assert result.total_waste_kg >= 0, "Отрицательные отходы"
         
+        # После обхода дерева все назначения отменены
+        assert not optimizer.assignments and not optimizer.undo_stack, "Стек назначений не пуст"
+        assert all(last == -1 for last in optimizer.lane_last.values()), "Не восстановлены линии"
+        
         return True
         
     except Exception as e:
@@ -170,6 +696,602 @@ def test_branch_and_bound():
         traceback.print_exc()
         return False
 
+def test_greedy_optimizer():
+    """Тестирование жадного диспетчера"""
+    print("\n=== Тестирование GreedyOptimizer ===")
+    
+    equipment = [
+        Equipment(
+            id=i + 1, name=f'Линия-{i + 1}', process_type=process_type,
+            capacity_per_hour=Decimal(str(60 + 20 * i)), setup_time_minutes=15 + 5 * i, is_available=True
+        )
+        for i, process_type in enumerate([ProcessType.EXTRUSION] * 3 + [ProcessType.RINGING] * 2)
+    ]
+    
+    rnd = random.Random(7)
+    orders = []
+    for i in range(3000):
+        process_type = rnd.choice([ProcessType.EXTRUSION, ProcessType.RINGING])
+        orders.append(ProductionOrder(
+            id=i + 1, order_number=f'ORD-{i + 1:05d}', product_type=ProductType.SHELL,
+            process_type=process_type, material_id=rnd.randint(1, 5),
+            quantity_kg=Decimal(str(rnd.randint(50, 1500))), color=rnd.choice(['красный', 'синий', 'белый']),
+            caliber=f'D{rnd.randint(50, 300)}', order_date=datetime.now().date(),
+            delivery_date=(datetime.now() + timedelta(days=rnd.randint(1, 30))).date(),
+            priority=rnd.randint(1, 5)
+        ))
+    
+    task = OptimizationTask(
+        orders=orders,
+        equipment=equipment,
+        start_time=datetime.now(),
+        planning_horizon_hours=168
+    )
+    
+    plain = GreedyOptimizer(waste_aware=False).optimize(task)
+    result = GreedyOptimizer().optimize(task)
+    print(f"Заказов: {len(result.schedule)}, отходы: {float(plain.total_waste_kg):.1f} -> "
+          f"{float(result.total_waste_kg):.1f} кг, время: {result.optimization_time_seconds:.2f} сек")
+    
+    assert len(result.schedule) == len(orders), "Не все заказы запланированы"
+    
+    # Отходы и переналадки совпадают с пересчетом по расписанию, линии не перекрываются
+    compiled = task.compile()
+    process_by_equipment = {eq.id: eq.process_type for eq in equipment}
+    process_by_order = {order.id: order.process_type for order in orders}
+    lanes = {}
+    for item in result.schedule:
+        assert process_by_equipment[item.equipment_id] == process_by_order[item.order_id], "Нарушен тип процесса"
+        lanes.setdefault(item.equipment_id, []).append(item)
+    
+    total_waste = 0.0
+    for equipment_id, items in lanes.items():
+        equipment_index = compiled.equipment_index[equipment_id]
+        prev_order, prev_end = -1, task.start_time
+        for item in sorted(items, key=lambda item: item.scheduled_start):
+            order = compiled.order_index[item.order_id]
+            assert item.scheduled_start >= prev_end, "Перекрытие заказов на линии"
+            assert item.setup_time_minutes == compiled.matrices.setup_time(equipment_index, order, prev_order)
+            if prev_order >= 0:
+                total_waste += compiled.quantity[order] * compiled.matrices.transition_factor(prev_order, order)
+            prev_order, prev_end = order, item.scheduled_end
+    
+    assert abs(total_waste - float(result.total_waste_kg)) < 1e-3, "Отходы не совпадают с расписанием"
+    assert result.total_waste_kg <= plain.total_waste_kg, "Учет отходов ухудшил расписание"
+    
+    return True
+
+def test_local_search():
+    """Тестирование улучшения расписания локальным поиском"""
+    print("\n=== Тестирование LocalSearchOptimizer ===")
+    
+    equipment = [
+        Equipment(
+            id=i + 1, name=f'Линия-{i + 1}', process_type=process_type,
+            capacity_per_hour=Decimal(str(80 + 10 * i)), setup_time_minutes=20 + 5 * i, is_available=True
+        )
+        for i, process_type in enumerate([ProcessType.EXTRUSION] * 2 + [ProcessType.RINGING] * 2)
+    ]
+    
+    rnd = random.Random(11)
+    orders = [
+        ProductionOrder(
+            id=i + 1, order_number=f'ORD-{i + 1:03d}', product_type=ProductType.SHELL,
+            process_type=rnd.choice([ProcessType.EXTRUSION, ProcessType.RINGING]),
+            material_id=rnd.randint(1, 4), quantity_kg=Decimal(str(rnd.randint(50, 800))),
+            color=rnd.choice(['красный', 'синий', 'белый']), caliber=f'D{rnd.randint(50, 300)}',
+            order_date=datetime.now().date(),
+            delivery_date=(datetime.now() + timedelta(days=rnd.randint(1, 20))).date(),
+            priority=rnd.randint(1, 5)
+        )
+        for i in range(80)
+    ]
+    
+    task = OptimizationTask(
+        orders=orders,
+        equipment=equipment,
+        start_time=datetime.now(),
+        planning_horizon_hours=720
+    )
+    
+    initial = GreedyOptimizer(waste_aware=False).optimize(task)
+    optimizer = LocalSearchOptimizer(time_limit_seconds=2, seed=1)
+    result = optimizer.improve(task, initial)
+    print(f"Отходы: {float(initial.total_waste_kg):.1f} -> {float(result.total_waste_kg):.1f} кг, "
+          f"ходов: {optimizer.moves_tried}, принято: {optimizer.moves_applied}")
+    
+    assert len(result.schedule) == len(orders), "Потеряны заказы"
+    assert result.total_waste_kg < initial.total_waste_kg, "Локальный поиск не улучшил расписание"
+    
+    # Отходы, посчитанные по приращениям, совпадают с пересчетом готового расписания
+    compiled = task.compile()
+    process_by_equipment = {eq.id: eq.process_type for eq in equipment}
+    lanes = {}
+    for item in result.schedule:
+        order = compiled.order_index[item.order_id]
+        assert process_by_equipment[item.equipment_id] == orders[order].process_type, "Нарушен тип процесса"
+        lanes.setdefault(item.equipment_id, []).append(item)
+    
+    total_waste = 0.0
+    for items in lanes.values():
+        items.sort(key=lambda item: item.scheduled_start)
+        for prev_item, item in zip(items, items[1:]):
+            assert item.scheduled_start >= prev_item.scheduled_end, "Перекрытие заказов на линии"
+            prev_order = compiled.order_index[prev_item.order_id]
+            order = compiled.order_index[item.order_id]
+            total_waste += compiled.quantity[order] * compiled.matrices.transition_factor(prev_order, order)
+    assert abs(total_waste - float(result.total_waste_kg)) < 1e-3, "Приращения отходов посчитаны неверно"
+    
+    # Ходы не увеличивают makespan и не сдвигают заказы за срок поставки
+    assert result.makespan_hours <= initial.makespan_hours, "Локальный поиск увеличил makespan"
+    initial_end = {item.order_id: item.scheduled_end for item in initial.schedule}
+    due = {order.id: datetime.combine(order.delivery_date + timedelta(days=1), datetime.min.time()) for order in orders}
+    late = 0
+    for item in result.schedule:
+        assert item.scheduled_end <= max(due[item.order_id], initial_end[item.order_id]), \
+            f"Заказ {item.order_id} сдвинут за срок поставки"
+        late += item.scheduled_end > due[item.order_id]
+    print(f"Makespan: {initial.makespan_hours:.1f} -> {result.makespan_hours:.1f} ч, просрочено заказов: {late}")
+    
+    # Прерванный по времени локальный поиск сообщает свою причину останова
+    cut = LocalSearchOptimizer(time_limit_seconds=0.01, stagnation_moves=None, seed=1).improve(task, initial)
+    assert initial.stop_reason == 'completed' and cut.stop_reason == 'time_limit'
+    
+    return True
+
+def test_incremental_optimizer():
+    """Тестирование инкрементальной переоптимизации"""
+    print("\n=== Тестирование IncrementalOptimizer ===")
+    from src.optimization.records import order_fingerprint
+    
+    equipment = [
+        Equipment(
+            id=i + 1, name=f'Линия-{i + 1}', process_type=process_type,
+            capacity_per_hour=Decimal(str(80 + 10 * i)), setup_time_minutes=20 + 5 * i, is_available=True
+        )
+        for i, process_type in enumerate([ProcessType.EXTRUSION] * 2 + [ProcessType.RINGING] * 2)
+    ]
+    
+    rnd = random.Random(5)
+    orders = [
+        ProductionOrder(
+            id=i + 1, order_number=f'ORD-{i + 1:03d}', product_type=ProductType.SHELL,
+            process_type=rnd.choice([ProcessType.EXTRUSION, ProcessType.RINGING]),
+            material_id=rnd.randint(1, 4), quantity_kg=Decimal(str(rnd.randint(50, 800))),
+            color=rnd.choice(['красный', 'синий', 'белый']), caliber=f'D{rnd.randint(50, 300)}',
+            order_date=datetime.now().date(),
+            delivery_date=(datetime.now() + timedelta(days=rnd.randint(1, 20))).date(),
+            priority=rnd.randint(1, 5)
+        )
+        for i in range(60)
+    ]
+    start_time = datetime.now()
+    
+    current = GreedyOptimizer().optimize(OptimizationTask(
+        orders=orders[:50], equipment=equipment, start_time=start_time, planning_horizon_hours=720
+    ))
+    
+    fingerprints = {order.id: order_fingerprint(order) for order in orders[:50]}
+    
+    # Поступили 10 новых заказов, у запланированных изменились объем и цвет
+    orders[0].quantity_kg = orders[0].quantity_kg * 2
+    orders[1].color = 'зеленый'
+    task = OptimizationTask(orders=orders, equipment=equipment, start_time=start_time, planning_horizon_hours=720)
+    
+    # Без отпечатков изменение цвета не обнаруживается - меняется только время производства
+    optimizer = IncrementalOptimizer(current.schedule, time_limit_seconds=0)
+    optimizer.optimize(task)
+    assert optimizer.orders_kept == 49 and optimizer.orders_inserted == 11
+    
+    optimizer = IncrementalOptimizer(current.schedule, fingerprints, time_limit_seconds=0)
+    result = optimizer.optimize(task)
+    print(f"Сохранено: {optimizer.orders_kept}, вставлено: {optimizer.orders_inserted}, "
+          f"отходы: {float(result.total_waste_kg):.1f} кг")
+    
+    assert optimizer.orders_kept == 48 and optimizer.orders_inserted == 12, "Заказ с новым цветом не перепланирован"
+    assert len(result.schedule) == len(orders), "Не все заказы запланированы"
+    
+    # Без прохода улучшения сохраненные заказы остаются на своих линиях в прежнем порядке
+    def lane_sequences(schedule, order_ids):
+        lanes = {}
+        for item in sorted(schedule, key=lambda item: item.scheduled_start):
+            if item.order_id in order_ids:
+                lanes.setdefault(item.equipment_id, []).append(item.order_id)
+        return lanes
+    
+    kept_ids = {order.id for order in orders[2:50]}
+    assert lane_sequences(result.schedule, kept_ids) == lane_sequences(current.schedule, kept_ids), \
+        "Текущее расписание изменено"
+    
+    # С проходом улучшения отходы не растут
+    improved = IncrementalOptimizer(current.schedule, fingerprints, time_limit_seconds=0.5, seed=1).optimize(task)
+    assert improved.total_waste_kg <= result.total_waste_kg + Decimal('0.001')
+    
+    return True
+
+def test_rolling_horizon():
+    """Тестирование скользящего горизонта планирования"""
+    print("\n=== Тестирование RollingHorizonOptimizer ===")
+    
+    equipment = [
+        Equipment(
+            id=i + 1, name=f'Линия-{i + 1}', process_type=process_type,
+            capacity_per_hour=Decimal(str(80 + 10 * i)), setup_time_minutes=20 + 5 * i, is_available=True
+        )
+        for i, process_type in enumerate([ProcessType.EXTRUSION] * 2 + [ProcessType.RINGING] * 2)
+    ]
+    
+    rnd = random.Random(3)
+    orders = [
+        ProductionOrder(
+            id=i + 1, order_number=f'ORD-{i + 1:03d}', product_type=ProductType.SHELL,
+            process_type=rnd.choice([ProcessType.EXTRUSION, ProcessType.RINGING]),
+            material_id=rnd.randint(1, 4), quantity_kg=Decimal(str(rnd.randint(50, 800))),
+            color=rnd.choice(['красный', 'синий', 'белый']), caliber=f'D{rnd.randint(50, 300)}',
+            order_date=datetime.now().date(),
+            delivery_date=(datetime.now() + timedelta(days=rnd.randint(1, 60))).date(),
+            priority=rnd.randint(1, 5)
+        )
+        for i in range(200)
+    ]
+    
+    task = OptimizationTask(
+        orders=orders,
+        equipment=equipment,
+        start_time=datetime.now(),
+        planning_horizon_hours=24 * 90
+    )
+    
+    optimizer = RollingHorizonOptimizer(lambda: LocalSearchOptimizer(time_limit_seconds=0.1, seed=1), window_days=14)
+    result = optimizer.optimize(task)
+    print(f"Окон: {optimizer.windows}, заказов: {len(result.schedule)}, отходы: {float(result.total_waste_kg):.1f} кг")
+    
+    assert optimizer.windows >= 4, "Заказы не разбиты на окна"
+    assert len(result.schedule) == len(orders), "Не все заказы запланированы"
+    
+    # Зафиксированные окна идут на линиях по порядку сроков, состояние линий переходит между окнами
+    compiled = task.compile()
+    delivery_by_order = {order.id: order.delivery_date.toordinal() for order in orders}
+    first_delivery = min(delivery_by_order.values())
+    lanes = {}
+    for item in result.schedule:
+        lanes.setdefault(item.equipment_id, []).append(item)
+    
+    total_waste = 0.0
+    for items in lanes.values():
+        items.sort(key=lambda item: item.scheduled_start)
+        windows = [(delivery_by_order[item.order_id] - first_delivery) // 14 for item in items]
+        assert windows == sorted(windows), "Нарушен порядок окон на линии"
+        for prev_item, item in zip(items, items[1:]):
+            assert item.scheduled_start >= prev_item.scheduled_end, "Перекрытие заказов на линии"
+            prev_order = compiled.order_index[prev_item.order_id]
+            order = compiled.order_index[item.order_id]
+            total_waste += compiled.quantity[order] * compiled.matrices.transition_factor(prev_order, order)
+    assert abs(total_waste - float(result.total_waste_kg)) < 1e-3, "Отходы на стыках окон посчитаны неверно"
+    
+    return True
+
+def test_job_queue():
+    """Тестирование фоновой очереди заданий оптимизации"""
+    print("\n=== Тестирование OptimizationJobQueue ===")
+    import time
+    from src.api.jobs import OptimizationJobQueue, QueueFullError, COMPLETED, CANCELLED, FAILED
+    
+    orders, equipment = create_test_data()
+    task = OptimizationTask(
+        orders=orders,
+        equipment=equipment,
+        start_time=datetime.now(),
+        planning_horizon_hours=168
+    )
+    
+    def run_search(job):
+        # Подготовка до запуска оптимизатора: отмена в этот момент не должна теряться
+        time.sleep(0.2)
+        optimizer = LocalSearchOptimizer(
+            time_limit_seconds=30, stagnation_moves=10 ** 9, seed=1, stop_signal=job.stop_signal
+        )
+        return optimizer.optimize(task)
+    
+    def run_failing(job):
+        raise ValueError("нет данных")
+    
+    queue = OptimizationJobQueue(workers=1, max_depth=2)
+    try:
+        running = queue.submit(run_search)
+        queued = queue.submit(run_search)
+        try:
+            queue.submit(run_search)
+            assert False, "Переполнение очереди не обнаружено"
+        except QueueFullError:
+            pass
+        
+        # Отмена задания в очереди и выполняющегося задания
+        assert queue.cancel(queued.job_id).status == CANCELLED
+        while running.stop_signal is None:
+            time.sleep(0.01)
+        started = time.time()
+        assert queue.cancel(running.job_id).status == CANCELLED
+        running.future.result(timeout=10)
+        print(f"Отмена выполняющегося задания: {time.time() - started:.3f}с")
+        assert time.time() - started < 5, "Задание не остановлено по отмене"
+        assert running.result is None and running.finished_at is not None
+        
+        failing = queue.submit(run_failing)
+        failing.future.result(timeout=10)
+        assert failing.status == FAILED and "нет данных" in failing.error
+        
+        quick = queue.submit(lambda job: GreedyOptimizer().optimize(task))
+        quick.future.result(timeout=10)
+        assert quick.status == COMPLETED and len(quick.result.schedule) == len(orders)
+        assert queue.get(quick.job_id) is quick
+        assert queue.get('unknown') is None
+    finally:
+        queue.shutdown()
+    
+    return True
+
+def test_result_cache():
+    """Тестирование кэша результатов оптимизации"""
+    print("\n=== Тестирование OptimizationResultCache ===")
+    from src.api.cache import OptimizationResultCache, task_fingerprint
+    
+    orders, equipment = create_test_data()
+    params = {'algorithm': 'greedy'}
+    key = task_fingerprint(orders, equipment, params)
+    
+    # Отпечаток не зависит от порядка строк и меняется вместе с данными и параметрами
+    assert task_fingerprint(orders[::-1], equipment[::-1], params) == key
+    assert task_fingerprint(orders, equipment, {'algorithm': 'genetic'}) != key
+    orders[0].quantity_kg += 1
+    assert task_fingerprint(orders, equipment, params) != key
+    orders[0].quantity_kg -= 1
+    orders[2].caliber = 'D120'
+    assert task_fingerprint(orders, equipment, params) != key, "Калибр влияет на отходы"
+    orders[2].caliber = 'D100'
+    orders[0].thickness_mm = Decimal('0.05')
+    assert task_fingerprint(orders, equipment, params) != key, "Толщина влияет на отходы"
+    orders[0].thickness_mm = None
+    assert task_fingerprint(orders, equipment, params) == key
+    
+    start_time = datetime.now()
+    task = OptimizationTask(orders=orders, equipment=equipment, start_time=start_time, planning_horizon_hours=168)
+    result = GreedyOptimizer().optimize(task)
+    
+    cache = OptimizationResultCache(max_size=2)
+    assert cache.get(key, start_time) is None
+    cache.put(key, start_time, result, cache.generation)
+    
+    # Попадание сдвигает расписание к новому моменту начала
+    later = start_time + timedelta(hours=3)
+    cached = cache.get(key, later)
+    assert cached.total_waste_kg == result.total_waste_kg
+    for item, cached_item in zip(result.schedule, cached.schedule):
+        assert cached_item.scheduled_start - item.scheduled_start == timedelta(hours=3)
+    assert result.schedule[0].scheduled_start < cached.schedule[0].scheduled_start, "Исходный результат изменен"
+    
+    # Результат задания, начатого до сброса, не сохраняется
+    generation = cache.generation
+    cache.invalidate()
+    assert cache.get(key, later) is None
+    cache.put(key, start_time, result, generation)
+    assert cache.get(key, later) is None
+    
+    stats = cache.stats()
+    print(f"Кэш: {stats}")
+    assert stats['hits'] == 1 and stats['misses'] == 3 and stats['size'] == 0
+    
+    return True
+
+def test_progress_events():
+    """Тестирование событий прогресса оптимизаторов"""
+    print("\n=== Тестирование событий прогресса ===")
+    
+    orders, equipment = create_test_data()
+    task = OptimizationTask(
+        orders=orders,
+        equipment=equipment,
+        start_time=datetime.now(),
+        planning_horizon_hours=168
+    )
+    
+    def collect(optimizer):
+        events = []
+        def report(event, best_schedule):
+            events.append(dict(event, n_scheduled=len(best_schedule())))
+        optimizer.progress_callback = report
+        return optimizer.optimize(task), events
+    
+    # Генетический алгоритм: событие на каждое поколение, лучшие отходы не растут
+    result, events = collect(GeneticAlgorithmOptimizer(population_size=20, generations=10))
+    print(f"GA: {len(events)} событий, последнее: {events[-1]['best_waste']:.2f}")
+    assert [event['generation'] for event in events] == list(range(11))
+    assert all(a['best_waste'] >= b['best_waste'] for a, b in zip(events, events[1:]))
+    assert events[-1]['best_waste'] == float(result.total_waste_kg)
+    assert all(event['n_scheduled'] == len(orders) for event in events)
+    
+    # Метод ветвей и границ: рекорд не ниже доказанной границы
+    equipment = [
+        Equipment(
+            id=i + 1, name=f'Линия-{i + 1}', process_type=ProcessType.EXTRUSION,
+            capacity_per_hour=Decimal(str(80 + 10 * i)), setup_time_minutes=20, is_available=True
+        )
+        for i in range(3)
+    ]
+    rnd = random.Random(5)
+    orders = [
+        ProductionOrder(
+            id=i + 1, order_number=f'ORD-{i + 1:03d}', product_type=ProductType.SHELL,
+            process_type=ProcessType.EXTRUSION, material_id=rnd.randint(1, 3),
+            quantity_kg=Decimal(str(rnd.randint(50, 800))), color=rnd.choice(['красный', 'синий', 'белый']),
+            caliber='D100', order_date=datetime.now().date(),
+            delivery_date=(datetime.now() + timedelta(days=rnd.randint(1, 10))).date(), priority=1
+        )
+        for i in range(20)
+    ]
+    task = OptimizationTask(orders=orders, equipment=equipment, start_time=datetime.now(), planning_horizon_hours=168)
+    result, events = collect(BranchAndBoundOptimizer(max_nodes=100000))
+    assert events, "Нет событий прогресса метода ветвей и границ"
+    print(f"B&B: {len(events)} событий, узлов: {result.nodes_explored}")
+    for event in events:
+        assert event['phase'] == 'branch_bound'
+        if event['best_waste'] is not None:
+            assert event['lower_bound'] <= event['best_waste'] + 1e-9
+    
+    assert events[-1]['best_waste'] >= float(result.total_waste_kg) - 1e-6
+    
+    # Досрочный останов по событию: возвращается лучшее найденное решение
+    optimizer = GeneticAlgorithmOptimizer(population_size=20, generations=1000)
+    def stop_early(event, best_schedule):
+        if event['generation'] == 5:
+            optimizer.deadline = time.time()
+    optimizer.progress_callback = stop_early
+    result = optimizer.optimize(task)
+    assert result.stop_reason == 'time_limit' and len(result.schedule) == len(orders)
+    
+    return True
+
+def test_instrumentation():
+    """Тестирование инструментирования этапов оптимизации"""
+    print("\n=== Тестирование инструментирования ===")
+    from src.api.metrics import OptimizationMetrics
+    
+    orders, equipment = create_test_data()
+    task = OptimizationTask(
+        orders=orders,
+        equipment=equipment,
+        start_time=datetime.now(),
+        planning_horizon_hours=168
+    )
+    
+    result = GeneticAlgorithmOptimizer(population_size=20, generations=5).optimize(task)
+    print(f"Этапы GA: {', '.join(f'{name}={seconds:.4f}' for name, seconds in result.phase_seconds.items())}")
+    for phase in ('evaluate', 'selection', 'variation', 'decode', 'result'):
+        assert phase in result.phase_seconds, f"Нет времени этапа {phase}"
+    assert sum(result.phase_seconds.values()) <= result.optimization_time_seconds + 1e-3
+    # Каждая запрошенная оценка - попадание или промах кэша приспособленности
+    assert result.evaluations == result.fitness_cache_hits + result.fitness_cache_misses
+    assert result.evaluations_per_second > 0
+    
+    bb_result = BranchAndBoundOptimizer().optimize(task)
+    assert bb_result.evaluations == bb_result.nodes_explored and 'search' in bb_result.phase_seconds
+    
+    # Локальный поиск сохраняет этапы исходного оптимизатора
+    improved = LocalSearchOptimizer(time_limit_seconds=0.05, seed=1).improve(task, result)
+    assert 'evaluate' in improved.phase_seconds and 'local_search' in improved.phase_seconds
+    assert improved.evaluations > result.evaluations
+    
+    # Пиковая память - прирост за запуск, а не пик предыдущих запусков процесса
+    ballast = np.ones(64 * 1024 * 1024 // 8)
+    del ballast
+    light = GreedyOptimizer().optimize(task)
+    print(f"Пиковая память жадного запуска после 64 МБ балласта: {light.peak_memory_mb:.1f} МБ")
+    assert 0 <= light.peak_memory_mb < 32, "В результат попал пик предыдущих запусков"
+    
+    metrics = OptimizationMetrics()
+    metrics.record('genetic', result)
+    metrics.record('genetic', result)
+    text = metrics.render()
+    assert 'optimization_runs_total{algorithm="genetic",stop_reason="completed"} 2' in text
+    assert f'optimization_evaluations_total{{algorithm="genetic"}} {2 * result.evaluations}' in text
+    
+    return True
+
+def test_planning_records():
+    """Тестирование записей заказов и оборудования для оптимизатора"""
+    print("\n=== Тестирование записей оптимизатора ===")
+    import pickle
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from src.optimization.records import EquipmentRecord, OrderRecord, load_planning_data
+    
+    orders, equipment = create_test_data()
+    start = datetime(2025, 1, 6, 8, 0)
+    order_records = [OrderRecord.from_order(order) for order in orders]
+    equipment_records = [EquipmentRecord.from_equipment(eq) for eq in equipment]
+    assert not hasattr(order_records[0], '__dict__'), "Записи без __dict__"
+    assert isinstance(order_records[0].quantity_kg, float)
+    
+    # Расписание по записям совпадает с расписанием по ORM-объектам
+    orm_result = GreedyOptimizer().optimize(OptimizationTask(orders=orders, equipment=equipment, start_time=start))
+    record_task = OptimizationTask(orders=order_records, equipment=equipment_records, start_time=start)
+    record_result = GreedyOptimizer().optimize(record_task)
+    assert [(item.order_id, item.equipment_id, item.scheduled_start) for item in orm_result.schedule] == \
+        [(item.order_id, item.equipment_id, item.scheduled_start) for item in record_result.schedule]
+    assert abs(float(orm_result.total_waste_kg) - float(record_result.total_waste_kg)) < 1e-6
+    
+    restored = pickle.loads(pickle.dumps(order_records))
+    assert [(o.id, o.color, o.thickness_mm) for o in restored] == [(o.id, o.color, o.thickness_mm) for o in order_records]
+    
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        for eq in equipment:
+            db.add(eq)
+        for order in orders:
+            order.status = OrderStatus.PLANNED
+            db.add(order)
+        db.commit()
+        db.expunge_all()
+        
+        loaded_orders, loaded_equipment = load_planning_data(db)
+        assert [o.id for o in loaded_orders] == sorted(o.id for o in order_records)
+        assert len(loaded_equipment) == sum(eq.is_available for eq in equipment_records)
+        assert all(isinstance(o, OrderRecord) for o in loaded_orders)
+        assert len(db.identity_map) == 0, "Проекционный запрос не создает ORM-объекты"
+    finally:
+        db.close()
+    
+    # База прежней схемы: расписание без order_fingerprint дополняется при запуске API
+    from sqlalchemy import text
+    from src.database.connection import upgrade_schema
+    engine = create_engine('sqlite://')
+    with engine.begin() as connection:
+        connection.execute(text(
+            'CREATE TABLE production_schedules (id INTEGER PRIMARY KEY, order_id INTEGER, equipment_id INTEGER, '
+            'scheduled_start TIMESTAMP NOT NULL, scheduled_end TIMESTAMP NOT NULL, setup_time_minutes INTEGER, '
+            'processing_time_minutes INTEGER, created_at TIMESTAMP, updated_at TIMESTAMP)'
+        ))
+    upgrade_schema(engine)
+    upgrade_schema(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        db.add(ProductionSchedule(order_id=1, equipment_id=1, scheduled_start=start, scheduled_end=start,
+                                  order_fingerprint='0' * 64))
+        db.commit()
+        assert [row.order_fingerprint for row in db.query(ProductionSchedule).all()] == ['0' * 64]
+    finally:
+        db.close()
+    
+    return True
+
+def test_benchmark():
+    """Тестирование бенчмарка масштабируемости"""
+    print("\n=== Тестирование бенчмарка ===")
+    from src.benchmarks.scaling import compare_results, generate_instance, run_benchmark
+    
+    orders, equipment = generate_instance(30, seed=3)
+    same_orders, _ = generate_instance(30, seed=3)
+    assert len(orders) == 30 and len(equipment) == 15
+    assert [(o.process_type, o.quantity_kg, o.color) for o in orders] == \
+        [(o.process_type, o.quantity_kg, o.color) for o in same_orders], "Экземпляр зависит только от seed"
+    assert len({order.id for order in orders}) == 30
+    
+    report = run_benchmark(sizes=[10], engines=['bb', 'hybrid'], time_limit=5, isolate=False)
+    assert [(case['engine'], case['orders']) for case in report['results']] == [('bb', 10), ('hybrid', 10)]
+    for case in report['results']:
+        assert case['scheduled_orders'] > 0 and case['evaluations'] > 0
+    
+    assert compare_results(report, report) == []
+    baseline = {'results': [dict(case, total_waste_kg=case['total_waste_kg'] / 2, peak_memory_mb=1e6)
+                            for case in report['results']]}
+    regressions = compare_results(report, baseline)
+    print(f"Регрессий относительно искаженной базы: {len(regressions)}")
+    assert {(r['engine'], r['metric']) for r in regressions} == {('bb', 'total_waste_kg'), ('hybrid', 'total_waste_kg')}
+    
+    return True
+
 def test_hybrid_optimizer():
     """Тестирование гибридного оптимизатора"""
     print("\n=== Тестирование HybridOptimizer ===")
@@ -199,6 +1321,20 @@ def test_hybrid_optimizer():
         assert len(result.schedule) == len(orders), "Не все заказы запланированы"
         assert result.total_waste_kg >= 0, "Отрицательные отходы"
         
+        # Задача разбивается по типам процесса, заказ остается на оборудовании своего типа
+        compiled = task.compile()
+        assert len(compiled.components()) == len({order.process_type for order in orders})
+        process_by_equipment = {eq.id: eq.process_type for eq in equipment}
+        for item in result.schedule:
+            order = next(order for order in orders if order.id == item.order_id)
+            assert process_by_equipment[item.equipment_id] == order.process_type, "Нарушен тип процесса"
+        
+        # Параллельное решение подзадач дает тот же результат точного алгоритма
+        parallel = HybridOptimizer(bb_max_nodes=1000, n_workers=2).optimize(task)
+        print(f"Параллельно: {parallel.total_waste_kg} кг")
+        assert parallel.total_waste_kg == result.total_waste_kg, "Результаты подзадач не совпадают"
+        assert len(parallel.schedule) == len(orders)
+        
         return True
         
     except Exception as e:
@@ -206,6 +1342,40 @@ def test_hybrid_optimizer():
         traceback.print_exc()
         return False
 
+def test_integer_plan():
+    """Тестирование планов в минутах от начала планирования"""
+    print("\n=== Тестирование планов в минутах ===")
+    
+    orders, equipment = create_test_data()
+    start = datetime(2025, 1, 6, 8, 0)
+    task = OptimizationTask(orders=orders, equipment=equipment, start_time=start, planning_horizon_hours=168)
+    compiled = task.compile()
+    
+    ga = GeneticAlgorithmOptimizer(population_size=10, generations=3)
+    individual = [int(compiled.eligible_for(i)[0]) for i in range(compiled.n_orders)]
+    plan = ga.decode_plan(individual, task)
+    schedule = ga.decode_individual(individual, task)
+    assert all(isinstance(value, int) for step in plan for value in step), "План - только целые числа"
+    for (order, eq, begin, end, setup_time, processing_minutes), item in zip(plan, schedule):
+        assert item.order_id == int(compiled.order_ids[order])
+        assert item.scheduled_start == start + timedelta(minutes=begin)
+        assert item.scheduled_end == start + timedelta(minutes=end)
+        assert end - begin == processing_minutes == item.processing_time_minutes
+    
+    waste, total_time = ga.evaluate_individual(individual, task)
+    assert abs(total_time - sum(item.processing_time_minutes for item in schedule) / 60) < 1e-9
+    
+    # Переналадка в решении метода ветвей и границ - промежуток перед заказом на линии
+    result = BranchAndBoundOptimizer().optimize(task)
+    lane_free = {}
+    for item in sorted(result.schedule, key=lambda item: item.scheduled_start):
+        free = lane_free.get(item.equipment_id, start)
+        assert item.scheduled_start - free == timedelta(minutes=item.setup_time_minutes)
+        lane_free[item.equipment_id] = item.scheduled_end
+    print(f"Отходы GA-плана: {waste:.2f} кг, B&B: {result.total_waste_kg} кг")
+    
+    return True
+
 def test_schedule_validation():
     """Тестирование валидации расписания"""
     print("\n=== Тестирование валидации расписания ===")
@@ -341,9 +1511,33 @@ def main():
     
     tests = [
         ("Калькулятор отходов", test_waste_calculator),
+        ("Матрицы переходов", test_transition_matrices),
+        ("Скомпилированная задача", test_compiled_task),
         ("Генетический алгоритм", test_genetic_algorithm),
+        ("Пакетная оценка", test_batch_evaluation),
+        ("Кэш приспособленности", test_fitness_cache),
+        ("Параллельная оценка", test_parallel_evaluation),
+        ("Островной генетический алгоритм", test_island_genetic_algorithm),
+        ("Матричный генетический алгоритм", test_array_genetic_algorithm),
+        ("Пересчет по линиям", test_lane_reuse),
+        ("Одновременные запуски", test_concurrent_optimizers),
+        ("Усечение очереди ветвей и границ", test_beam_truncation),
         ("Алгоритм ветвей и границ", test_branch_and_bound),
+        ("Оптимальность ветвей и границ", test_branch_and_bound_optimality),
+        ("Досрочный останов", test_anytime_stop),
+        ("Останов параллельных оптимизаторов", test_parallel_stop),
+        ("Жадный диспетчер", test_greedy_optimizer),
+        ("Локальный поиск", test_local_search),
+        ("Инкрементальная переоптимизация", test_incremental_optimizer),
+        ("Скользящий горизонт", test_rolling_horizon),
+        ("Очередь заданий", test_job_queue),
+        ("Кэш результатов", test_result_cache),
+        ("События прогресса", test_progress_events),
+        ("Инструментирование", test_instrumentation),
+        ("Записи оптимизатора", test_planning_records),
+        ("Бенчмарк", test_benchmark),
         ("Гибридный оптимизатор", test_hybrid_optimizer),
+        ("Планы в минутах", test_integer_plan),
         ("Валидация расписания", test_schedule_validation),
         ("Производительность", test_performance),
     ]